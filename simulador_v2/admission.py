@@ -0,0 +1,318 @@
+import math
+from bisect import bisect_right
+from collections import namedtuple
+
+from schedulability import baruah_bound, busy_period, qpa_test, response_time
+
+Admission = namedtuple("Admission", ["admitted", "reason", "wcrt"])
+Admission.__doc__ = """Resposta de try_add.
+
+reason explica a recusa (None se admitida); wcrt é o pior tempo de
+resposta da nova tarefa sob RM (None em EDF).
+"""
+
+
+def _demand_at_deadline(task, higher):
+    """C + sum(ceil(D/T_j) C_j) das mais prioritárias; None se D > T.
+
+    Com D <= T, um valor <= D basta para a tarefa cumprir o deadline (o
+    menor ponto fixo da análise de tempo de resposta fica antes de D).
+    """
+    deadline = task.deadline
+    if deadline > task.period_time:
+        return None
+    return task.computation_time + sum(-(-deadline // other.period_time) * other.computation_time
+                                       for other in higher)
+
+
+class AdmissionController:
+    """Controle de admissão online de tarefas periódicas em um processador RM ou EDF.
+
+    O conjunto admitido é sempre escalonável (liberação síncrona, offsets
+    ignorados, como em schedulability.analyze); o construtor recusa um
+    conjunto inicial que não seja.
+
+    RM: as tarefas ficam em ordem de período (e de admissão, nos empates).
+    O simulador desempata períodos iguais pela ordem de liberação dos jobs,
+    então, como em schedulability.rm_response_time, as tarefas de mesmo
+    período interferem umas nas outras. Para cada tarefa fica em cache a
+    demanda das que interferem nela até o seu deadline, que uma admissão ou
+    remoção atualiza em O(1): se ela continua <= D, a tarefa segue
+    escalonável sem análise. Só quando não continua roda a análise de tempo
+    de resposta, a partir da conclusão do primeiro job em cache (que só
+    cresce com admissões). Uma nova tarefa só afeta as de período maior ou
+    igual ao dela, e a primeira que perderia o deadline encerra a decisão.
+    Os tempos de resposta que ficam desatualizados são recalculados sob
+    demanda em response_times().
+
+    EDF: utilização e densidade de cada tarefa ficam em cache. U <= 1
+    decide sozinho quando nenhuma tarefa tem D < T; senão vem o limitante
+    de densidade e, por fim, o QPA até o limite de Baruah (com U = 1, até o
+    período ocupado síncrono, que parte do valor em cache).
+    """
+
+    def __init__(self, tasks, scheduler: str = "RM"):
+        if scheduler not in ("RM", "EDF"):
+            raise ValueError(f"Controle de admissão só existe para RM e EDF, não {scheduler}.")
+        self.scheduler = scheduler
+        self.tasks = []
+        self.keys = []
+        self.u = []
+        self.density = []
+        self.demand = []
+        self.wcrt = []
+        self.first = []
+        self.by_id = {}
+        self.admitted = 0
+        self.busy = None
+        self.constrained = 0
+        for task in tasks:
+            self._insert(task)
+        if scheduler == "RM":
+            for k, task in enumerate(self.tasks):
+                self.demand[k] = _demand_at_deadline(task, self._interference(k)[0])
+            missed = [f"T{task.id}" for task, r in zip(self.tasks, self._response_times()) if r > task.deadline]
+            if missed:
+                raise ValueError(f"Conjunto inicial não escalonável por RM: {', '.join(missed)} perdem o deadline.")
+        else:
+            feasible, self.busy = self._edf_feasible(self.tasks, self.utilization, math.fsum(self.density),
+                                                     self.constrained)
+            if not feasible:
+                raise ValueError("Conjunto inicial não escalonável por EDF.")
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self.by_id
+
+    @property
+    def utilization(self):
+        return math.fsum(self.u)
+
+    def _interference(self, k: int):
+        """(tarefas que interferem na k-ésima, utilização delas): as de período menor ou igual."""
+        end = bisect_right(self.keys, (self.tasks[k].period_time, math.inf))
+        return self.tasks[:k] + self.tasks[k + 1:end], math.fsum(self.u[:k] + self.u[k + 1:end])
+
+    def _response_times(self):
+        tasks, wcrt = self.tasks, self.wcrt
+        for k, r in enumerate(wcrt):
+            if r is None:
+                wcrt[k], self.first[k] = response_time(tasks[k], *self._interference(k), self.first[k])
+        return wcrt
+
+    def response_times(self):
+        """{task_id: pior tempo de resposta} (só RM), recalculando os desatualizados."""
+        return {task.id: r for task, r in zip(self.tasks, self._response_times())}
+
+    def _key(self, task):
+        # Nos empates de período a ordem de admissão só fixa a posição; a
+        # interferência é mútua (ver _interference)
+        if self.scheduler == "RM":
+            return (task.period_time, self.admitted)
+        return (self.admitted,)
+
+    def _insert(self, task, demand: int = None, wcrt: float = None, first: int = 0):
+        if task.id in self.by_id:
+            raise ValueError(f"Tarefa {task.id} já admitida.")
+        key = self._key(task)
+        self.admitted += 1
+        position = bisect_right(self.keys, key)
+        for column, value in ((self.keys, key), (self.tasks, task),
+                              (self.u, task.computation_time / task.period_time),
+                              (self.density, task.computation_time / min(task.deadline, task.period_time)),
+                              (self.demand, demand), (self.wcrt, wcrt), (self.first, first)):
+            column.insert(position, value)
+        self.by_id[task.id] = task
+        self.constrained += task.deadline < task.period_time
+        return position
+
+    def _edf_feasible(self, tasks, u: float, density: float, constrained: int):
+        """(veredito EDF, limite inferior do período ocupado síncrono de tasks).
+
+        u e density são a utilização e a densidade de tasks, e constrained o
+        número de tarefas com D < T. self.busy é um limite inferior do
+        período ocupado do conjunto admitido e, portanto, de qualquer
+        conjunto que o contenha; com U < 1 o limite de Baruah basta e o
+        período ocupado nem é calculado.
+        """
+        if u > 1:
+            return False, self.busy
+        if not constrained or density <= 1:
+            return True, self.busy
+        if u < 1:
+            return qpa_test(tasks, math.ceil(baruah_bound(tasks, u))), self.busy
+        busy = busy_period(tasks, self.busy)
+        return qpa_test(tasks, busy), busy
+
+    def try_add(self, task):
+        """Admite a tarefa se o conjunto continuar escalonável; senão nada muda."""
+        if task.id in self.by_id:
+            raise ValueError(f"Tarefa {task.id} já admitida.")
+        if self.scheduler == "EDF":
+            return self._try_add_edf(task)
+
+        tasks = self.tasks
+        computation, period = task.computation_time, task.period_time
+        # As de período igual ficam antes da nova, mas também sofrem interferência dela
+        start = bisect_right(self.keys, (period, -1))
+        position = bisect_right(self.keys, (period, self.admitted))
+        higher = tasks[:position]
+        wcrt, first = response_time(task, higher, math.fsum(self.u[:position]))
+        if wcrt > task.deadline:
+            return Admission(False, f"T{task.id} perderia o deadline (R = {wcrt} > D = {task.deadline})", wcrt)
+
+        # Só as de período >= o da nova mudam; os novos valores só entram se todas passarem
+        updates = []
+        for k in range(start, len(tasks)):
+            other = tasks[k]
+            demand = self.demand[k]
+            if demand is not None:
+                demand += -(-other.deadline // period) * computation
+                if demand <= other.deadline:
+                    updates.append((demand, None, self.first[k]))
+                    continue
+            interference, u = self._interference(k)
+            r, w = response_time(other, interference + [task], u + computation / period, self.first[k])
+            if r > other.deadline:
+                return Admission(False, f"T{other.id} perderia o deadline (R = {r} > D = {other.deadline})", wcrt)
+            updates.append((demand, r, w))
+
+        self._insert(task, _demand_at_deadline(task, higher), wcrt, first)
+        for k, (demand, r, w) in enumerate(updates, start=start):
+            if k >= position:
+                k += 1
+            self.demand[k], self.wcrt[k], self.first[k] = demand, r, w
+        return Admission(True, None, wcrt)
+
+    def _try_add_edf(self, task):
+        u = math.fsum(self.u + [task.computation_time / task.period_time])
+        if u > 1:
+            return Admission(False, f"utilização {u:.4f} > 1", None)
+        density = math.fsum(self.density + [task.computation_time / min(task.deadline, task.period_time)])
+        feasible, busy = self._edf_feasible(self.tasks + [task], u, density,
+                                            self.constrained + (task.deadline < task.period_time))
+        if not feasible:
+            return Admission(False, "a demanda de processador excederia o tempo disponível (QPA)", None)
+        self.busy = busy
+        self._insert(task)
+        return Admission(True, None, None)
+
+    def remove(self, task_id):
+        """Remove e devolve a tarefa; as menos prioritárias só podem ficar mais folgadas."""
+        if task_id not in self.by_id:
+            raise ValueError(f"Tarefa {task_id} não está admitida.")
+        task = self.by_id.pop(task_id)
+        position = self.tasks.index(task)
+        # As de período igual que ficam antes também perdem a interferência dela
+        start = bisect_right(self.keys, (task.period_time, -1))
+        for column in (self.tasks, self.keys, self.u, self.density, self.demand, self.wcrt, self.first):
+            del column[position]
+        self.constrained -= task.deadline < task.period_time
+        self.busy = None
+        if self.scheduler == "RM":
+            computation, period = task.computation_time, task.period_time
+            for k in range(start, len(self.tasks)):
+                if self.demand[k] is not None:
+                    self.demand[k] -= -(-self.tasks[k].deadline // period) * computation
+                self.wcrt[k], self.first[k] = None, 0
+        return task
+
+
+def load_test(tasks, scheduler: str, requests: int, rng, utilization: float = 0.02,
+              period_range=(1000, 100_000)):
+    """Mede a latência de try_add/remove com o controlador semeado por tasks.
+
+    Cada requisição tenta admitir uma tarefa nova (utilização uniforme até
+    utilization, período log-uniforme) ou, com metade da chance quando há
+    tarefas admitidas por ela, remove uma delas. Retorna um dicionário com
+    as contagens e os percentis de latência em microssegundos.
+    """
+    from time import perf_counter
+
+    from main import Task
+
+    controller = AdmissionController(tasks, scheduler)
+    next_id = max((task.id for task in tasks), default=-1) + 1
+    added = []
+    latencies = {"try_add": [], "remove": []}
+    admitted = 0
+    for _ in range(requests):
+        if added and rng.random() < 0.5:
+            task_id = added.pop(rng.randrange(len(added)))
+            start = perf_counter()
+            controller.remove(task_id)
+            latencies["remove"].append(perf_counter() - start)
+            continue
+        period = round(math.exp(rng.uniform(math.log(period_range[0]), math.log(period_range[1]))))
+        computation = max(1, round(rng.uniform(0, utilization) * period))
+        deadline = rng.randint(min(computation, period), period) if rng.random() < 0.5 else period
+        task = Task(next_id, 0, computation, period, 1, deadline)
+        next_id += 1
+        start = perf_counter()
+        decision = controller.try_add(task)
+        latencies["try_add"].append(perf_counter() - start)
+        if decision.admitted:
+            admitted += 1
+            added.append(task.id)
+
+    def percentiles(values):
+        if not values:
+            return None
+        values = sorted(values)
+        pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1e6
+        return {"p50": pick(0.5), "p99": pick(0.99), "max": values[-1] * 1e6}
+
+    return {
+        "scheduler": scheduler,
+        "initial_tasks": len(tasks),
+        "final_tasks": len(controller),
+        "requests": requests,
+        "admitted": admitted,
+        "rejected": len(latencies["try_add"]) - admitted,
+        "removed": len(latencies["remove"]),
+        "try_add_us": percentiles(latencies["try_add"]),
+        "remove_us": percentiles(latencies["remove"]),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import random
+
+    from main import Task, read_tasks_from_json
+    from workload import generate_task_set
+
+    parser = argparse.ArgumentParser(description="Teste de carga do controle de admissão RM/EDF.")
+    parser.add_argument("input", nargs="?", help="conjunto inicial (padrão: sintético, ver --tasks)")
+    parser.add_argument("-s", "--scheduler", choices=["RM", "EDF"], default=None)
+    parser.add_argument("--tasks", type=int, default=200, help="tarefas do conjunto sintético inicial")
+    parser.add_argument("--utilization", type=float, default=0.5, help="utilização do conjunto sintético inicial")
+    parser.add_argument("--periods", type=int, nargs=2, default=[1000, 100_000], metavar=("MIN", "MAX"),
+                        help="faixa de períodos do conjunto inicial e das tarefas novas")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="resultado em JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.input:
+        _, file_scheduler, tasks = read_tasks_from_json(args.input)
+        scheduler = args.scheduler or file_scheduler
+    else:
+        scheduler = args.scheduler or "RM"
+        raw = generate_task_set(args.tasks, args.utilization, rng, period_range=tuple(args.periods))
+        tasks = [Task(i, **t) for i, t in enumerate(raw)]
+    result = load_test(tasks, scheduler, args.requests, rng, period_range=tuple(args.periods))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['requests']} requisições ({scheduler}, {result['initial_tasks']} -> "
+              f"{result['final_tasks']} tarefas): {result['admitted']} admitidas, "
+              f"{result['rejected']} recusadas, {result['removed']} remoções")
+        for op in ("try_add", "remove"):
+            data = result[f"{op}_us"]
+            if data:
+                print(f"{op}: p50 {data['p50']:.1f} µs, p99 {data['p99']:.1f} µs, máx {data['max']:.1f} µs")
@@ -0,0 +1,290 @@
+import heapq
+from array import array
+from collections import deque
+
+from execution_trace import ExecutionTrace
+
+NOT_STARTED = -1
+
+
+class RunState:
+    """Estado de uma execução FCFS/SJF/RR/SRTF, separado das tarefas (que são imutáveis).
+
+    Como em JobTable, cada coluna array('q') é indexada pela posição da
+    tarefa em tasks: start (NOT_STARTED até a primeira execução), finish (0
+    enquanto não termina), remaining e waiting. executed guarda as posições
+    das tarefas concluídas, em ordem de conclusão. Assim o mesmo conjunto de
+    tarefas serve a várias execuções sem cópias.
+    """
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        zeros = array('q', bytes(8 * len(tasks)))
+        self.start = array('q', [NOT_STARTED]) * len(tasks)
+        self.finish = array('q', zeros)
+        self.remaining = array('q', (task.computation_time for task in tasks))
+        self.waiting = array('q', zeros)
+        self.executed = array('q')
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def completed_tasks(self):
+        """Tarefas concluídas, em ordem de conclusão."""
+        return [self.tasks[i] for i in self.executed]
+
+
+class ArrivalCursor:
+    """Percorre as tarefas em ordem de offset, entregando as que já chegaram."""
+
+    def __init__(self, tasks, metrics=None, probe=None):
+        self.tasks = tasks
+        self.metrics = metrics
+        self.probe = probe
+        self.order = sorted(range(len(tasks)), key=lambda i: tasks[i].offset)
+        self.pos = 0
+
+    def next_arrival(self):
+        if self.pos < len(self.order):
+            return self.tasks[self.order[self.pos]].offset
+        return None
+
+    def idle_until(self, sim_time: int):
+        next_arrival = self.next_arrival()
+        if next_arrival is None:
+            return sim_time
+        return min(next_arrival, sim_time)
+
+    def pop_arrived(self, time: int, input_order: bool = False):
+        """Retorna as posições das tarefas com offset <= time ainda não entregues.
+
+        Por padrão o lote vem em ordem de offset; com input_order=True vem na
+        ordem do arquivo de entrada.
+        """
+        start = self.pos
+        while self.pos < len(self.order) and self.tasks[self.order[self.pos]].offset <= time:
+            self.pos += 1
+        batch = self.order[start:self.pos]
+        if input_order:
+            batch.sort()
+        if self.metrics:
+            for i in batch:
+                self.metrics.job_released(self.tasks[i].id)
+        if self.probe:
+            for i in batch:
+                task = self.tasks[i]
+                self.probe.job_released(task.offset, task.id, task.id)
+            self.probe.lap("release")
+        return batch
+
+
+class AperiodicSimulation:
+    """Base de FCFS/SJF/RR/SRTF: cada tarefa é um único job, liberado no offset.
+
+    Como PeriodicSimulation, pode ser avançada por partes: advance(t1)
+    seguido de advance(t2) produz o mesmo escalonamento que advance(t2).
+    close() devolve (sequence, RunState). As filas guardam posições em
+    tasks, e as tarefas não são alteradas. metrics e probe são os mesmos de
+    PeriodicSimulation; com record=False o trace não é guardado.
+    """
+
+    def __init__(self, tasks, metrics=None, probe=None, record: bool = True):
+        self.tasks = tasks
+        self.metrics = metrics
+        self.probe = probe
+        self.record = record
+        self.arrivals = ArrivalCursor(tasks, metrics, probe)
+        self.sequence = ExecutionTrace()
+        self.state = RunState(tasks)
+        self.time = 0
+
+    def _run(self, start: int, end: int, task, queue_length: int):
+        if self.probe:
+            self.probe.job_running(start, end, task.id, task.id, queue_length)
+        if self.record:
+            self.sequence.append(start, end, task.id, task.id)
+        if self.probe:
+            self.probe.lap("trace")
+
+    def _idle(self, start: int, end: int):
+        if self.probe:
+            self.probe.cpu_idle(start, end)
+        if self.record:
+            self.sequence.idle(start, end)
+        if self.probe:
+            self.probe.lap("trace")
+
+    def _complete(self, i: int, time: int, waiting: int):
+        task, state = self.tasks[i], self.state
+        state.finish[i] = time
+        state.waiting[i] = waiting
+        state.executed.append(i)
+        if self.metrics:
+            self.metrics.job_completed(task.id, task.offset, time, task.computation_time)
+        if self.probe:
+            self.probe.job_completed(time, task.id, task.id)
+
+    def advance(self, until: int):
+        if self.probe:
+            self.probe.start()
+        self.time = self._advance(self.time, until)
+
+    def close(self):
+        return self.sequence, self.state
+
+
+class FCFSSimulation(AperiodicSimulation):
+    def __init__(self, tasks, metrics=None, probe=None, record: bool = True):
+        super().__init__(tasks, metrics, probe, record)
+        self.ready_queue = deque()
+
+    def _advance(self, time: int, until: int):
+        tasks, arrivals, ready_queue, probe = self.tasks, self.arrivals, self.ready_queue, self.probe
+        while time < until:
+            ready_queue.extend(arrivals.pop_arrived(time))
+
+            if ready_queue:
+                i = ready_queue.popleft()
+                task = tasks[i]
+                self.state.start[i] = time
+                self._run(time, time + task.computation_time, task, len(ready_queue) + 1)
+                self._complete(i, time + task.computation_time, time - task.offset)
+                time += task.computation_time
+            else:
+                idle_until = arrivals.idle_until(until)
+                self._idle(time, idle_until)
+                time = idle_until
+            if probe:
+                probe.lap("complete")
+        return time
+
+
+class SJFSimulation(AperiodicSimulation):
+    def __init__(self, tasks, metrics=None, probe=None, record: bool = True):
+        super().__init__(tasks, metrics, probe, record)
+        # Heap de (computation_time, ordem de chegada, posição da tarefa)
+        self.ready_queue = []
+        self.arrived = 0
+
+    def _advance(self, time: int, until: int):
+        tasks, arrivals, ready_queue, probe = self.tasks, self.arrivals, self.ready_queue, self.probe
+        while time < until:
+            for i in arrivals.pop_arrived(time, input_order=True):
+                heapq.heappush(ready_queue, (tasks[i].computation_time, self.arrived, i))
+                self.arrived += 1
+
+            if ready_queue:
+                i = heapq.heappop(ready_queue)[2]
+                task = tasks[i]
+                self.state.start[i] = time
+                self._run(time, time + task.computation_time, task, len(ready_queue) + 1)
+                self._complete(i, time + task.computation_time, time - task.offset)
+                time += task.computation_time
+            else:
+                idle_until = arrivals.idle_until(until)
+                self._idle(time, idle_until)
+                time = idle_until
+            if probe:
+                probe.lap("complete")
+        return time
+
+
+class RRSimulation(AperiodicSimulation):
+    """Round robin; ao fim de cada advance a fila de prontos é esvaziada mesmo após until."""
+
+    def __init__(self, tasks, metrics=None, probe=None, record: bool = True):
+        invalid = [task.id for task in tasks if task.quantum <= 0]
+        if invalid:
+            raise ValueError(f"RR exige quantum positivo; tarefas inválidas: {invalid}")
+        super().__init__(tasks, metrics, probe, record)
+        self.ready_queue = deque()
+
+    def _advance(self, time: int, until: int):
+        tasks, arrivals, ready_queue, probe = self.tasks, self.arrivals, self.ready_queue, self.probe
+        state = self.state
+        remaining = state.remaining
+        while time < until or ready_queue:
+            ready_queue.extend(arrivals.pop_arrived(time, input_order=True))
+
+            if ready_queue:
+                i = ready_queue.popleft()
+                current = tasks[i]
+
+                if state.start[i] == NOT_STARTED:
+                    state.start[i] = time
+
+                exec_time = min(current.quantum, remaining[i])
+                self._run(time, time + exec_time, current, len(ready_queue) + 1)
+                time += exec_time
+                remaining[i] -= exec_time
+
+                ready_queue.extend(arrivals.pop_arrived(time, input_order=True))
+
+                if remaining[i] > 0:
+                    ready_queue.append(i)
+                else:
+                    self._complete(i, time, time - current.offset - current.computation_time)
+            else:
+                idle_until = arrivals.idle_until(until)
+                self._idle(time, idle_until)
+                time = idle_until
+            if probe:
+                probe.lap("complete")
+        return time
+
+
+class SRTFSimulation(AperiodicSimulation):
+    def __init__(self, tasks, metrics=None, probe=None, record: bool = True):
+        super().__init__(tasks, metrics, probe, record)
+        # Heap de (restante, ordem de entrada na fila, posição da tarefa). Tarefas
+        # na fila não executam, então suas chaves nunca ficam desatualizadas.
+        self.ready_queue = []
+        self.queued = 0
+        self.current = None
+
+    def _advance(self, time: int, until: int):
+        tasks, arrivals, ready_queue, probe = self.tasks, self.arrivals, self.ready_queue, self.probe
+        state = self.state
+        remaining = state.remaining
+        current = self.current
+        while time < until:
+            for i in arrivals.pop_arrived(time, input_order=True):
+                heapq.heappush(ready_queue, (remaining[i], self.queued, i))
+                self.queued += 1
+
+            if current is not None and remaining[current] == 0:
+                task = tasks[current]
+                self._complete(current, time, time - task.offset - task.computation_time)
+                current = None
+
+            # Preempção só acontece em chegadas ou conclusões; em empate a tarefa
+            # da fila vence a que está executando.
+            if ready_queue and (current is None or ready_queue[0][0] <= remaining[current]):
+                if current is not None:
+                    heapq.heappush(ready_queue, (remaining[current], self.queued, current))
+                    self.queued += 1
+                current = heapq.heappop(ready_queue)[2]
+
+            if current is not None:
+                if state.start[current] == NOT_STARTED:
+                    state.start[current] = time
+
+                next_event = time + remaining[current]
+                next_arrival = arrivals.next_arrival()
+                if next_arrival is not None:
+                    next_event = min(next_event, next_arrival)
+                end = min(next_event, until)
+                remaining[current] -= end - time
+                self._run(time, end, tasks[current], len(ready_queue) + 1)
+                time = end
+            else:
+                idle_until = arrivals.idle_until(until)
+                self._idle(time, idle_until)
+                time = idle_until
+            if probe:
+                probe.lap("complete")
+        self.current = current
+        return time
+
+
+ENGINES = {"FCFS": FCFSSimulation, "SJF": SJFSimulation, "RR": RRSimulation, "SRTF": SRTFSimulation}
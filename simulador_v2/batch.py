@@ -0,0 +1,198 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from main import SIMULATORS, Task, read_tasks_from_json
+from result_cache import ResultCache, run_cached
+from task_loader import NDJSON_EXTENSIONS, Scenario, iter_scenarios
+
+COLUMNS = [
+    "scenario", "scheduler", "simulation_time", "tasks_number",
+    "TAT_avg_system", "WT_avg_system", "CPU_utilization",
+    "Most_Waiting_Task", "Least_Waiting_Task",
+    "TAT_per_task", "WT_per_task", "TAT_avg_per_task", "WT_avg_per_task",
+    "deadline_misses", "deadline_total", "misses_per_task", "error",
+]
+
+
+def list_scenarios(source: str):
+    """Cenários de um diretório (todos os .json) ou de um manifesto.
+
+    O manifesto é um arquivo texto com um caminho por linha, relativo ao
+    próprio manifesto; linhas vazias e iniciadas por '#' são ignoradas.
+    """
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, name) for name in os.listdir(source) if name.endswith(".json"))
+    base = os.path.dirname(source)
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith("#")]
+
+
+_caches = {}
+
+
+def worker_cache(directory: str):
+    """ResultCache do processo para o diretório dado (um por processo, reaproveitado entre blocos)."""
+    if directory not in _caches:
+        _caches[directory] = ResultCache(directory)
+    return _caches[directory]
+
+
+def run_scenario(path: str, schedulers=None, extrapolate: bool = False, cache: ResultCache = None):
+    """Simula um cenário em cada escalonador pedido e devolve uma linha por execução.
+
+    Sem schedulers, usa o scheduler_name do próprio arquivo. Nada é impresso;
+    erros viram a coluna "error" da linha correspondente. Com cache, execuções
+    já feitas (inclusive com horizonte maior) não são simuladas de novo.
+    """
+    try:
+        sim_time, file_scheduler, tasks = read_tasks_from_json(path)
+    except (OSError, ValueError, KeyError) as e:
+        return [{"scenario": path, "error": str(e)}]
+    return run_task_set(path, sim_time, file_scheduler, tasks, schedulers, extrapolate, cache)
+
+
+def run_loaded(scenario: Scenario, schedulers=None, extrapolate: bool = False, cache: ResultCache = None):
+    """Como run_scenario, para um cenário já lido por task_loader.iter_scenarios."""
+    if scenario.error:
+        return [{"scenario": scenario.name, "error": scenario.error}]
+    return run_task_set(scenario.name, scenario.simulation_time, scenario.scheduler,
+                     scenario.columns.tasks(Task), schedulers, extrapolate, cache)
+
+
+def run_task_set(name: str, sim_time: int, file_scheduler: str, tasks, schedulers=None, extrapolate: bool = False,
+                 cache: ResultCache = None):
+    rows = []
+    for scheduler in schedulers or [file_scheduler]:
+        row = {"scenario": name, "scheduler": scheduler,
+               "simulation_time": sim_time, "tasks_number": len(tasks)}
+        try:
+            result = run_cached(sim_time, tasks, scheduler, extrapolate, cache)
+            row.update(result["metrics"])
+            summary = result["deadlines"]
+            if summary is not None:
+                row["deadline_misses"] = sum(data["misses"] for data in summary.values())
+                row["deadline_total"] = sum(data["total"] for data in summary.values())
+                row["misses_per_task"] = {tid: data["misses"] for tid, data in summary.items()}
+        except (ValueError, ZeroDivisionError) as e:
+            row["error"] = str(e)
+        rows.append(row)
+    return rows
+
+
+def run_chunk(items, schedulers=None, extrapolate: bool = False, cache_dir: str = None):
+    """items são caminhos de arquivo ou Scenarios já lidos (entrada NDJSON)."""
+    cache = worker_cache(cache_dir) if cache_dir else None
+    rows = []
+    for item in items:
+        if isinstance(item, Scenario):
+            rows.extend(run_loaded(item, schedulers, extrapolate, cache))
+        else:
+            rows.extend(run_scenario(item, schedulers, extrapolate, cache))
+    return rows
+
+
+def iter_chunks(source: str, chunk_size: int):
+    """Blocos de até chunk_size cenários, gerados sob demanda.
+
+    Um arquivo .ndjson/.jsonl é lido cenário a cenário e os blocos levam as
+    tarefas em colunas compactas; diretórios e manifestos levam caminhos.
+    """
+    if source.endswith(NDJSON_EXTENSIONS):
+        items = iter_scenarios(source, strict=False)
+    else:
+        items = iter(list_scenarios(source))
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow({
+            key: json.dumps(value) if isinstance(value, (dict, list)) else value
+            for key, value in row.items()
+        })
+
+
+class _NdjsonWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, row):
+        self.f.write(json.dumps(row) + "\n")
+
+
+def run_batch(source: str, output: str, schedulers=None, workers: int = None,
+              chunk_size: int = 16, fmt: str = None, extrapolate: bool = False, cache_dir: str = None):
+    """Distribui os cenários entre processos e grava os resultados à medida que chegam.
+
+    Os cenários são agrupados em blocos de chunk_size; no máximo dois blocos
+    por processo ficam pendentes, então a memória não cresce com o número de
+    cenários. A ordem das linhas no arquivo é a ordem de conclusão.
+    cache_dir ativa o cache de resultados em disco (ver result_cache),
+    compartilhado entre os processos e entre execuções do lote.
+    Retorna o número de linhas gravadas.
+    """
+    chunks = iter_chunks(source, chunk_size)
+    fmt = fmt or ("ndjson" if output.endswith((".ndjson", ".jsonl")) else "csv")
+    workers = workers or os.cpu_count() or 1
+
+    written = 0
+    with open(output, "w", newline="") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = _NdjsonWriter(f) if fmt == "ndjson" else _CsvWriter(f)
+        pending = set()
+        exhausted = False
+        while not exhausted or pending:
+            while not exhausted and len(pending) < 2 * workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(run_chunk, chunk, schedulers, extrapolate, cache_dir))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for row in future.result():
+                    writer.write(row)
+                    written += 1
+            f.flush()
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula vários cenários em paralelo e grava as métricas em um único arquivo.")
+    parser.add_argument("source", help="diretório com arquivos .json, manifesto com um caminho por linha "
+                                       "ou arquivo .ndjson com vários cenários")
+    parser.add_argument("-o", "--output", default="resultados.csv", help="arquivo de saída (.csv ou .ndjson)")
+    parser.add_argument("--schedulers", default=None,
+                        help="lista separada por vírgulas, ou 'all'; por padrão usa o scheduler_name de cada arquivo")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos")
+    parser.add_argument("--chunk-size", type=int, default=16, help="cenários por unidade de trabalho")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--hyperperiod", action="store_true", help="extrapola RM/EDF pelo hiperperíodo")
+    parser.add_argument("--cache", default=None, metavar="DIR",
+                        help="diretório do cache de resultados; cenários repetidos não são simulados de novo")
+    args = parser.parse_args()
+
+    if args.schedulers == "all":
+        selected = list(SIMULATORS)
+    elif args.schedulers:
+        selected = args.schedulers.split(",")
+    else:
+        selected = None
+
+    total = run_batch(args.source, args.output, selected, args.workers,
+                      args.chunk_size, args.format, args.hyperperiod, args.cache)
+    print(f"{total} execuções gravadas em {args.output}")
@@ -0,0 +1,179 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from main import REALTIME_SCHEDULERS, SIMULATORS, Task
+from workload import generate_task_set
+
+SIZES = [10, 100, 1000]
+HORIZONS = [10_000, 100_000]
+QUICK_SIZES = [10, 100]
+QUICK_HORIZONS = [1_000, 10_000]
+
+
+def build_tasks(scheduler: str, n: int, horizon: int, seed: int):
+    """Conjunto sintético com utilização 0.7.
+
+    Nos escalonadores não-tempo-real cada tarefa é um único job, então as
+    chegadas são espalhadas pelo horizonte.
+    """
+    rng = random.Random(seed)
+    raw = generate_task_set(n, 0.7, rng, period_range=(10, 1000), granularity=10, quantum=2)
+    if scheduler not in REALTIME_SCHEDULERS:
+        for t in raw:
+            t["offset"] = rng.randrange(horizon)
+    return [Task(i, **t) for i, t in enumerate(raw)]
+
+
+def measure(scheduler: str, n: int, horizon: int, seed: int = 0, repeat: int = 3):
+    """Mede uma configuração (rodar em um processo próprio para o pico de RSS valer)."""
+    best = math.inf
+    jobs = 0
+    for _ in range(repeat):
+        tasks = build_tasks(scheduler, n, horizon, seed)
+        start = time.perf_counter()
+        _, result = SIMULATORS[scheduler](horizon, tasks)
+        best = min(best, time.perf_counter() - start)
+        jobs = len(result)
+    rss_kb = None
+    if resource is not None:
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            rss_kb //= 1024
+    return {
+        "scheduler": scheduler,
+        "tasks": n,
+        "horizon": horizon,
+        "seconds": best,
+        "ticks_per_sec": horizon / best if best else math.inf,
+        "jobs_per_sec": jobs / best if best else math.inf,
+        "jobs": jobs,
+        "peak_rss_kb": rss_kb,
+    }
+
+
+def measure_startup(input_path: str, schedulers, runs: int = 5):
+    """Tempo de parede (melhor de runs) de `python main.py <input> --no-plot --quiet`.
+
+    Inclui a partida do interpretador e os imports: é o custo que domina
+    execuções pequenas em lote. "python" é só o interpretador, como referência.
+    """
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    commands = {"python": [sys.executable, "-c", "pass"]}
+    for scheduler in schedulers:
+        commands[scheduler] = [sys.executable, main_py, input_path, "-s", scheduler, "--no-plot", "--quiet"]
+    results = {}
+    for name, command in commands.items():
+        best = math.inf
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, check=True)
+            best = min(best, time.perf_counter() - start)
+        results[name] = best
+    return results
+
+
+def scaling_exponent(points):
+    """Inclinação da reta de mínimos quadrados em log-log: tempo ~ tamanho^k."""
+    points = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+def run_benchmark(schedulers, sizes, horizons, seed: int = 0, repeat: int = 3):
+    # Um processo novo por medição: o pico de RSS de uma não contamina a outra
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        for scheduler in schedulers:
+            for horizon in horizons:
+                for n in sizes:
+                    results.append(pool.submit(measure, scheduler, n, horizon, seed, repeat).result())
+    return results
+
+
+def print_report(results, baseline=None, tolerance: float = 1.3):
+    """Imprime a tabela e as inclinações; retorna o número de regressões."""
+    previous = {}
+    if baseline:
+        previous = {(r["scheduler"], r["tasks"], r["horizon"]): r for r in baseline}
+
+    print(f"{'escalonador':<8} {'n':>6} {'horizonte':>10} {'tempo (s)':>10} {'ticks/s':>12} {'jobs/s':>10} {'RSS (KB)':>10}  baseline")
+    regressions = 0
+    for r in results:
+        line = (f"{r['scheduler']:<8} {r['tasks']:>6} {r['horizon']:>10} {r['seconds']:>10.4f} "
+                f"{r['ticks_per_sec']:>12.0f} {r['jobs_per_sec']:>10.0f} {str(r['peak_rss_kb']):>10}")
+        old = previous.get((r["scheduler"], r["tasks"], r["horizon"]))
+        if old:
+            ratio = r["seconds"] / old["seconds"] if old["seconds"] else 1
+            line += f"  {ratio:.2f}x"
+            if ratio > tolerance:
+                line += " REGRESSÃO"
+                regressions += 1
+        print(line)
+
+    print("\nExpoentes de escala (tempo ~ tamanho^k):")
+    for scheduler in dict.fromkeys(r["scheduler"] for r in results):
+        rows = [r for r in results if r["scheduler"] == scheduler]
+        largest_horizon = max(r["horizon"] for r in rows)
+        largest_n = max(r["tasks"] for r in rows)
+        k_n = scaling_exponent([(r["tasks"], r["seconds"]) for r in rows if r["horizon"] == largest_horizon])
+        k_h = scaling_exponent([(r["horizon"], r["seconds"]) for r in rows if r["tasks"] == largest_n])
+        fmt = lambda k: "-" if k is None else f"{k:.2f}"
+        print(f"{scheduler:<8} em n: {fmt(k_n)}   no horizonte: {fmt(k_h)}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a vazão dos simuladores em uma grade de tamanhos.")
+    parser.add_argument("--schedulers", default=",".join(SIMULATORS), help="lista separada por vírgulas")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None, help="números de tarefas")
+    parser.add_argument("--horizons", type=int, nargs="+", default=None, help="valores de simulation_time")
+    parser.add_argument("--quick", action="store_true", help="grade reduzida")
+    parser.add_argument("--repeat", type=int, default=3, help="repetições por medição (vale a melhor)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="compara com resultados gravados antes")
+    parser.add_argument("--save-baseline", help="grava os resultados para comparações futuras")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="razão de tempo acima da qual há regressão")
+    parser.add_argument("--startup", metavar="INPUT", help="mede só a partida a frio de main.py com este arquivo")
+    args = parser.parse_args()
+
+    if args.startup:
+        for name, seconds in measure_startup(args.startup, args.schedulers.split(","), args.repeat).items():
+            print(f"{name:<8} {seconds * 1000:8.1f} ms")
+        sys.exit()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    horizons = args.horizons or (QUICK_HORIZONS if args.quick else HORIZONS)
+    results = run_benchmark(args.schedulers.split(","), sizes, horizons, args.seed, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = print_report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print(f"\n{regressions} regressão(ões) acima de {args.tolerance:.2f}x")
+        sys.exit(1)
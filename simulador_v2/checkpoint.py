@@ -0,0 +1,194 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+from job_table import count_releases
+from online_metrics import OnlineMetrics, RunningStats, _TaskAggregate
+from periodic_engine import PRIORITIES, PeriodicSimulation
+
+MAGIC = b"SIMCKPT1"
+TASK_FIELDS = ("id", "offset", "computation_time", "period_time", "quantum", "deadline")
+_LENGTH = struct.Struct("<Q")
+
+
+def start_simulation(sim_time: int, tasks, scheduler: str, metrics=None, record: bool = True):
+    """Simula RM/EDF até sim_time e devolve a simulação, pronta para save_state/resume."""
+    if scheduler not in PRIORITIES:
+        raise ValueError("Checkpoint só implementado para RM e EDF.")
+    sim = PeriodicSimulation(tasks, PRIORITIES[scheduler], count_releases(tasks, sim_time), metrics, record)
+    sim.advance(sim_time)
+    return sim
+
+
+def resume(state, new_sim_time: int):
+    """Continua uma simulação (ou um checkpoint gravado) até new_sim_time.
+
+    O resultado, (sequence, jobs), é idêntico ao de simular direto até
+    new_sim_time. A simulação continua reaproveitável para novas extensões.
+    """
+    sim = load_state(state) if isinstance(state, str) else state
+    if new_sim_time < sim.time:
+        raise ValueError(f"O checkpoint já está em t={sim.time}, além de {new_sim_time}.")
+    sim.advance(new_sim_time)
+    return sim.close()
+
+
+def _scheduler_name(priority):
+    for name, function in PRIORITIES.items():
+        if function is priority:
+            return name
+    raise ValueError("Checkpoint só implementado para RM e EDF.")
+
+
+def _stats_state(stats: RunningStats):
+    sketch = stats.sketch
+    return {
+        "count": stats.count, "mean": stats.mean, "m2": stats.m2, "min": stats.min, "max": stats.max,
+        "sketch": {"zeros": sketch.zeros, "count": sketch.count, "buckets": sorted(sketch.buckets.items())},
+    }
+
+
+def _restore_stats(stats: RunningStats, state):
+    stats.count, stats.mean, stats.m2 = state["count"], state["mean"], state["m2"]
+    stats.min, stats.max = state["min"], state["max"]
+    sketch = stats.sketch
+    sketch.zeros, sketch.count = state["sketch"]["zeros"], state["sketch"]["count"]
+    sketch.buckets = {index: count for index, count in state["sketch"]["buckets"]}
+
+
+def _metrics_state(metrics: OnlineMetrics):
+    """Campos de OnlineMetrics em JSON: contadores, momentos de Welford e baldes dos sketches."""
+    return {
+        "starvation_threshold": metrics.starvation_threshold,
+        "accuracy": metrics.accuracy,
+        "busy_time": metrics.busy_time,
+        "last_finish": metrics.last_finish,
+        "response": _stats_state(metrics.response),
+        "waiting": _stats_state(metrics.waiting),
+        # Lista de pares para manter a ordem e o tipo dos ids
+        "per_task": [
+            [task_id, {
+                "released": aggregate.released, "completed": aggregate.completed,
+                "misses": aggregate.misses, "starved": aggregate.starved,
+                "response": _stats_state(aggregate.response), "waiting": _stats_state(aggregate.waiting),
+            }]
+            for task_id, aggregate in metrics.per_task.items()
+        ],
+    }
+
+
+def _restore_metrics(state):
+    metrics = OnlineMetrics(state["starvation_threshold"], state["accuracy"])
+    metrics.busy_time, metrics.last_finish = state["busy_time"], state["last_finish"]
+    _restore_stats(metrics.response, state["response"])
+    _restore_stats(metrics.waiting, state["waiting"])
+    for task_id, entry in state["per_task"]:
+        aggregate = metrics.per_task[task_id] = _TaskAggregate(metrics.accuracy)
+        aggregate.released, aggregate.completed = entry["released"], entry["completed"]
+        aggregate.misses, aggregate.starved = entry["misses"], entry["starved"]
+        _restore_stats(aggregate.response, entry["response"])
+        _restore_stats(aggregate.waiting, entry["waiting"])
+    return metrics
+
+
+def save_state(sim: PeriodicSimulation, path: str):
+    """Grava o estado completo da simulação em um arquivo binário compactado.
+
+    Formato: MAGIC seguido de um bloco zlib com um cabeçalho JSON (tarefas,
+    relógio, contadores) e as colunas int64 do trace, da tabela de jobs e
+    das filas, cada uma precedida do tamanho em bytes. As métricas online,
+    se houver, vão em JSON na última seção (ver _metrics_state).
+    """
+    jobs, sequence = sim.jobs, sim.sequence
+    if jobs.extrapolation:
+        raise ValueError("Execuções extrapoladas por hiperperíodo não podem ser gravadas.")
+    size = jobs.size
+    order = jobs.order[:sim.closed_at] if sim.closed_at is not None else jobs.order
+    header = {
+        "scheduler": _scheduler_name(sim.priority),
+        "tasks": [{field: getattr(task, field) for field in TASK_FIELDS} for task in sim.tasks],
+        "time": sim.time,
+        "record": sim.record,
+        "size": size,
+        "released": jobs.released,
+        "recycle": jobs.recycle,
+        "byteorder": sys.byteorder,
+    }
+    sections = [
+        json.dumps(header).encode(),
+        sequence.starts, sequence.ends, sequence.task_ids, sequence.jobs,
+        jobs.task_index[:size], jobs.release[:size], jobs.deadline[:size],
+        jobs.remaining[:size], jobs.finish[:size], bytes(jobs.completed[:size]),
+        order, jobs.free,
+        array('q', [value for entry in sim.ready for value in entry]),
+        array('q', [value for entry in sim.releases for value in entry]),
+        json.dumps(_metrics_state(sim.metrics)).encode() if sim.metrics else b"",
+    ]
+    payload = bytearray()
+    for section in sections:
+        data = section.tobytes() if isinstance(section, array) else section
+        payload += _LENGTH.pack(len(data)) + data
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(zlib.compress(bytes(payload), 1))
+
+
+def _read_sections(path: str):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} não é um checkpoint do simulador.")
+        payload = zlib.decompress(f.read())
+    sections = []
+    pos = 0
+    while pos < len(payload):
+        (length,) = _LENGTH.unpack_from(payload, pos)
+        pos += _LENGTH.size
+        sections.append(payload[pos:pos + length])
+        pos += length
+    return sections
+
+
+def load_state(path: str, tasks=None):
+    """Reconstrói a simulação gravada por save_state.
+
+    Sem tasks, as tarefas são recriadas a partir do checkpoint; com tasks,
+    a lista dada (na mesma ordem) é usada.
+    """
+    raw_header, *columns, raw_metrics = _read_sections(path)
+    header = json.loads(raw_header)
+
+    def int64(data):
+        values = array('q')
+        values.frombytes(data)
+        if header["byteorder"] != sys.byteorder:
+            values.byteswap()
+        return values
+
+    if tasks is None:
+        from main import Task
+        tasks = [Task(**fields) for fields in header["tasks"]]
+    metrics = _restore_metrics(json.loads(raw_metrics)) if raw_metrics else None
+    sim = PeriodicSimulation(tasks, PRIORITIES[header["scheduler"]], 0, metrics, header["record"])
+    sim.time = header["time"]
+
+    (starts, ends, task_ids, trace_jobs, task_index, release, deadline, remaining, finish,
+     completed, order, free, ready, releases) = columns
+    sequence = sim.sequence
+    sequence.starts, sequence.ends = int64(starts), int64(ends)
+    sequence.task_ids, sequence.jobs = int64(task_ids), int64(trace_jobs)
+
+    jobs = sim.jobs
+    jobs.task_index, jobs.release, jobs.deadline = int64(task_index), int64(release), int64(deadline)
+    jobs.remaining, jobs.finish = int64(remaining), int64(finish)
+    jobs.completed = bytearray(completed)
+    jobs.order, jobs.free = int64(order), int64(free)
+    jobs.size, jobs.released, jobs.recycle = header["size"], header["released"], header["recycle"]
+
+    # Os heaps foram gravados na ordem interna, então continuam válidos
+    ready = int64(ready)
+    sim.ready = [tuple(ready[k:k + 3]) for k in range(0, len(ready), 3)]
+    releases = int64(releases)
+    sim.releases = [tuple(releases[k:k + 2]) for k in range(0, len(releases), 2)]
+    return sim
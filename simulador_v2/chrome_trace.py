@@ -0,0 +1,147 @@
+import gzip
+
+from execution_trace import IDLE
+from stream import create_engine
+
+IDLE_TRACK = 0
+
+
+class ChromeTraceWriter:
+    """Grava uma simulação em Chrome Trace Event JSON à medida que ela acontece.
+
+    Implementa a interface de probe dos simuladores (ver
+    instrumentation.Probe): cada fatia executada vira um evento "X" na
+    trilha da tarefa (fatias contíguas do mesmo job são unidas), liberações
+    e deadlines viram eventos instantâneos na mesma trilha, e a ociosidade
+    tem uma trilha própria. Um deadline perdido é marcado no instante da
+    conclusão atrasada, ou no próprio deadline se o job não terminou até o
+    fim da simulação.
+
+    Nada é acumulado além da fatia corrente e do deadline de cada job
+    pendente, então a memória não depende do horizonte. Uma unidade de
+    tempo da simulação vira time_scale µs. O arquivo abre no Perfetto
+    (ui.perfetto.dev) e no chrome://tracing.
+    """
+
+    def __init__(self, f, tasks, title: str = "simulação", time_scale: int = 1):
+        self.f = f
+        self.scale = time_scale
+        self.tracks = {task.id: k + 1 for k, task in enumerate(tasks)}
+        self.relative_deadline = {task.id: task.deadline for task in tasks}
+        # job -> (task_id, deadline absoluto) dos jobs liberados e não concluídos
+        self.pending = {}
+        self.slice = None
+        self.events = 0
+        f.write('{"traceEvents": [\n')
+        f.write(f'{{"name": "process_name", "ph": "M", "pid": 1, "args": {{"name": "{title}"}}}}')
+        self._metadata(IDLE_TRACK, "ociosa")
+        for task in tasks:
+            self._metadata(self.tracks[task.id], f"T{task.id}")
+
+    def _metadata(self, tid, name):
+        self.f.write(f',\n{{"name": "thread_name", "ph": "M", "pid": 1, "tid": {tid}, "args": {{"name": "{name}"}}}}'
+                     f',\n{{"name": "thread_sort_index", "ph": "M", "pid": 1, "tid": {tid}, '
+                     f'"args": {{"sort_index": {tid}}}}}')
+
+    def _instant(self, name, time, task_id, args):
+        self.events += 1
+        self.f.write(f',\n{{"name": "{name}", "ph": "i", "s": "t", "ts": {time * self.scale}, "pid": 1, '
+                     f'"tid": {self.tracks[task_id]}, "args": {{{args}}}}}')
+
+    def _flush(self):
+        start, end, task_id, job = self.slice
+        self.events += 1
+        if task_id == IDLE:
+            self.f.write(f',\n{{"name": "ociosa", "ph": "X", "ts": {start * self.scale}, '
+                         f'"dur": {(end - start) * self.scale}, "pid": 1, "tid": {IDLE_TRACK}}}')
+        else:
+            self.f.write(f',\n{{"name": "T{task_id}", "ph": "X", "ts": {start * self.scale}, '
+                         f'"dur": {(end - start) * self.scale}, "pid": 1, "tid": {self.tracks[task_id]}, '
+                         f'"args": {{"job": {job}}}}}')
+
+    def _run(self, start, end, task_id, job):
+        current = self.slice
+        if current is not None and current[1] == start and current[2] == task_id and current[3] == job:
+            current[1] = end
+            return
+        if current is not None:
+            self._flush()
+        self.slice = [start, end, task_id, job]
+
+    # Interface de probe
+
+    def start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def job_released(self, time, task_id, job):
+        deadline = time + self.relative_deadline[task_id]
+        self.pending[job] = (task_id, deadline)
+        self._instant("liberação", time, task_id, f'"job": {job}, "deadline": {deadline}')
+        self._instant("deadline", deadline, task_id, f'"job": {job}')
+
+    def job_running(self, start, end, task_id, job, queue_length):
+        self._run(start, end, task_id, job)
+
+    def cpu_idle(self, start, end):
+        self._run(start, end, IDLE, IDLE)
+
+    def job_completed(self, time, task_id, job, deadline=None):
+        _, deadline = self.pending.pop(job)
+        if time > deadline:
+            self._instant("deadline perdido", time, task_id,
+                          f'"job": {job}, "deadline": {deadline}, "finish": {time}')
+
+    def close(self, end_time: int):
+        """Grava a última fatia e os deadlines perdidos por jobs que não terminaram até end_time."""
+        if self.slice is not None:
+            self._flush()
+            self.slice = None
+        for job, (task_id, deadline) in self.pending.items():
+            if deadline <= end_time:
+                self._instant("deadline perdido", deadline, task_id,
+                              f'"job": {job}, "deadline": {deadline}, "finish": null')
+        self.pending.clear()
+        self.f.write("\n]}\n")
+
+
+def open_output(path: str):
+    """Arquivo de texto para escrita; .gz é comprimido (o Perfetto abre direto)."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", compresslevel=6)
+    return open(path, "w", buffering=1 << 20)
+
+
+def export_chrome_trace(path: str, tasks, scheduler: str, sim_time: int, time_scale: int = 1):
+    """Simula até sim_time gravando o trace em path; retorna o número de eventos gravados.
+
+    O trace da simulação não é guardado (record=False): cada evento vai
+    direto para o arquivo.
+    """
+    with open_output(path) as f:
+        writer = ChromeTraceWriter(f, tasks, scheduler, time_scale)
+        engine = create_engine(tasks, scheduler, probe=writer, record=False)
+        engine.advance(sim_time)
+        writer.close(engine.time)
+    return writer.events
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from main import SIMULATORS, read_tasks_from_json
+
+    parser = argparse.ArgumentParser(description="Grava o escalonamento como Chrome Trace Event JSON (Perfetto).")
+    parser.add_argument("input", help="arquivo JSON de entrada")
+    parser.add_argument("-o", "--output", default="trace.json", help="arquivo de saída (.json ou .json.gz)")
+    parser.add_argument("-s", "--scheduler", choices=list(SIMULATORS), help="substitui o scheduler_name do arquivo")
+    parser.add_argument("--until", type=int, default=None, help="horizonte (padrão: simulation_time do arquivo)")
+    parser.add_argument("--time-scale", type=int, default=1, help="µs por unidade de tempo da simulação")
+    args = parser.parse_args()
+
+    sim_time, scheduler, tasks = read_tasks_from_json(args.input)
+    events = export_chrome_trace(args.output, tasks, args.scheduler or scheduler, args.until or sim_time,
+                                 args.time_scale)
+    print(f"{events} eventos gravados em {args.output}")
@@ -0,0 +1,207 @@
+"""Pós-processamento vetorizado (NumPy) dos resultados das simulações.
+
+Cada função aqui reproduz exatamente o resultado da versão em Python puro
+de job_table, execution_trace e main, mas trabalha sobre as colunas
+array('q') sem criar um objeto por job. NumPy é opcional e só é importado
+quando a entrada tem pelo menos MIN_ROWS linhas (abaixo disso o import
+custa mais que o laço); use enabled(n) antes de chamar qualquer função.
+"""
+
+from execution_trace import IDLE
+
+# Abaixo disso o laço em Python termina antes do import do NumPy (~70 ms)
+MIN_ROWS = 50_000
+
+np = None
+_tried = False
+
+
+def enabled(rows: int):
+    """True se NumPy está disponível e rows justifica usá-lo."""
+    global np, _tried
+    if rows < MIN_ROWS:
+        return False
+    if not _tried:
+        _tried = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np is not None
+
+
+def _column(values, size: int = None):
+    """Visão int64 (sem cópia) de um array('q')."""
+    column = np.frombuffer(values, dtype=np.int64) if len(values) else np.zeros(0, dtype=np.int64)
+    return column if size is None else column[:size]
+
+
+def _group(keys):
+    """(chaves distintas na ordem da primeira ocorrência, código de grupo de cada linha)."""
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    rank = np.argsort(first, kind="stable")
+    relabel = np.empty(len(rank), dtype=np.int64)
+    relabel[rank] = np.arange(len(rank))
+    return unique[rank], relabel[inverse.reshape(-1)]
+
+
+def _group_sums(codes, *columns):
+    """Soma exata (int64) de cada coluna por grupo, na ordem dos códigos."""
+    perm = np.argsort(codes, kind="stable")
+    ordered = codes[perm]
+    starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+    return [np.add.reduceat(column[perm], starts) for column in columns]
+
+
+def _task_columns(jobs):
+    """id e computation_time indexados por task_index."""
+    ids = np.array([task.id for task in jobs.tasks], dtype=np.int64)
+    computation = np.array([task.computation_time for task in jobs.tasks], dtype=np.int64)
+    return ids, computation
+
+
+def _per_task(task_index, tasks: int, *columns):
+    """(primeira linha, contagem, somas exatas das colunas) por task_index."""
+    first = np.full(tasks, len(task_index), dtype=np.int64)
+    np.minimum.at(first, task_index, np.arange(len(task_index)))
+    sums = []
+    for column in columns:
+        total = np.zeros(tasks, dtype=np.int64)
+        np.add.at(total, task_index, column)
+        sums.append(total.tolist())
+    return first, np.bincount(task_index, minlength=tasks).tolist(), sums
+
+
+def _completed_in_order(jobs):
+    """Jobs concluídos, na ordem de conclusão (jobs.order sem os pendentes)."""
+    order = _column(jobs.order)
+    completed = np.frombuffer(bytes(jobs.completed[:jobs.size]), dtype=np.uint8).astype(bool)
+    return order[completed[order]]
+
+
+def completion_totals(jobs, after: int = None, until: int = None):
+    """JobTable.completion_totals sem o filtro where."""
+    order = _completed_in_order(jobs)
+    finish = _column(jobs.finish)[order]
+    if after is not None or until is not None:
+        keep = np.ones(len(order), dtype=bool)
+        if after is not None:
+            keep &= finish > after
+        if until is not None:
+            keep &= finish <= until
+        order, finish = order[keep], finish[keep]
+    if not len(order):
+        return {}, None
+
+    _, computation_of = _task_columns(jobs)
+    task_index = _column(jobs.task_index)[order]
+    computation = computation_of[task_index]
+    tat = finish - _column(jobs.release)[order]
+    missed = (finish > _column(jobs.deadline)[order]).astype(np.int64)
+    first, counts, sums = _per_task(task_index, len(jobs.tasks), tat, tat - computation, computation, missed)
+
+    # Na ordem da primeira conclusão; tarefas com o mesmo id são somadas
+    totals = {}
+    for i in np.argsort(first, kind="stable").tolist():
+        if counts[i]:
+            entry = totals.setdefault(jobs.tasks[i].id, [0, 0, 0, 0, 0])
+            for k, value in enumerate((counts[i], *(column[i] for column in sums))):
+                entry[k] += value
+    return totals, int(finish.max())
+
+
+def deadline_summary(jobs):
+    """JobTable.deadline_summary."""
+    size = jobs.size
+    task_index = _column(jobs.task_index, size)
+    completed = np.frombuffer(bytes(jobs.completed[:size]), dtype=np.uint8).astype(bool)
+    missed = completed & (_column(jobs.finish, size) > _column(jobs.deadline, size))
+    totals = np.bincount(task_index, minlength=len(jobs.tasks)).tolist()
+    misses = np.bincount(task_index[missed], minlength=len(jobs.tasks)).tolist()
+    summary = {task.id: {"misses": 0, "total": 0} for task in jobs.tasks}
+    for i, task in enumerate(jobs.tasks):
+        summary[task.id]["total"] += totals[i]
+        summary[task.id]["misses"] += misses[i]
+    return summary
+
+
+def task_ids(jobs):
+    """Conjunto dos ids das tarefas com algum job na tabela."""
+    present = np.bincount(_column(jobs.task_index)[_column(jobs.order)], minlength=len(jobs.tasks))
+    return {jobs.tasks[i].id for i in np.flatnonzero(present).tolist()}
+
+
+def missed_jobs(jobs):
+    """(task_id, release, deadline, finish) dos jobs concluídos após o deadline, na ordem da tabela."""
+    order = _completed_in_order(jobs)
+    finish, deadline = _column(jobs.finish)[order], _column(jobs.deadline)[order]
+    missed = finish > deadline
+    order = order[missed]
+    ids, _ = _task_columns(jobs)
+    return zip(ids[_column(jobs.task_index)[order]].tolist(), _column(jobs.release)[order].tolist(),
+               deadline[missed].tolist(), finish[missed].tolist())
+
+
+def starved_jobs(jobs, threshold: float):
+    """(task_id, release, turnaround, espera) dos concluídos com espera/turnaround > threshold, em ordem."""
+    order = _completed_in_order(jobs)
+    ids, computation_of = _task_columns(jobs)
+    task_index = _column(jobs.task_index)[order]
+    release = _column(jobs.release)[order]
+    turnaround = _column(jobs.finish)[order] - release
+    waiting = turnaround - computation_of[task_index]
+    positive = turnaround > 0
+    selected = np.zeros(len(order), dtype=bool)
+    selected[positive] = waiting[positive] / turnaround[positive] > threshold
+    return zip(ids[task_index[selected]].tolist(), release[selected].tolist(),
+               turnaround[selected].tolist(), waiting[selected].tolist())
+
+
+def busy_time_by_task(sequence):
+    """ExecutionTrace.busy_time_by_task."""
+    task_id = _column(sequence.task_ids)
+    busy = task_id != IDLE
+    if not busy.any():
+        return {}
+    keys, codes = _group(task_id[busy])
+    (totals,) = _group_sums(codes, _column(sequence.ends)[busy] - _column(sequence.starts)[busy])
+    return dict(zip(keys.tolist(), totals.tolist()))
+
+
+def task_metrics(state, executed_time):
+    """Colunas de calculate_metrics para um RunState (FCFS/SJF/RR/SRTF).
+
+    Retorna (posições das tarefas não concluídas, TAT e espera das
+    concluídas, ids da que mais e da que menos esperou, soma de
+    computation das concluídas), com o critério de conclusão de
+    calculate_metrics.
+    """
+    tasks = state.tasks
+    n = len(tasks)
+    ids = np.fromiter((task.id for task in tasks), dtype=np.int64, count=n)
+    offset = np.fromiter((task.offset for task in tasks), dtype=np.int64, count=n)
+    computation = np.fromiter((task.computation_time for task in tasks), dtype=np.int64, count=n)
+    finish = _column(state.finish)
+    waiting = _column(state.waiting)
+
+    # Tempo executado de cada tarefa, ou -1 se ela não aparece no trace
+    executed = np.full(n, -1, dtype=np.int64)
+    if executed_time:
+        executed_ids = np.fromiter(executed_time.keys(), dtype=np.int64, count=len(executed_time))
+        totals = np.fromiter(executed_time.values(), dtype=np.int64, count=len(executed_time))
+        sort = np.argsort(executed_ids)
+        executed_ids, totals = executed_ids[sort], totals[sort]
+        position = np.minimum(np.searchsorted(executed_ids, ids), len(executed_ids) - 1)
+        found = executed_ids[position] == ids
+        executed[found] = totals[position[found]]
+
+    completed = np.where(executed >= 0, executed >= computation,
+                         (finish != 0) & (finish - offset >= computation))
+    waiting = waiting[completed]
+    if not len(waiting):
+        return np.flatnonzero(~completed).tolist(), [], [], None, None, 0
+    completed_ids = ids[completed]
+    return (np.flatnonzero(~completed).tolist(), (finish - offset)[completed].tolist(), waiting.tolist(),
+            int(completed_ids[np.argmax(waiting)]), int(completed_ids[np.argmin(waiting)]),
+            int(computation[completed].sum()))
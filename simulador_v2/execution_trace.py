@@ -0,0 +1,95 @@
+from array import array
+from bisect import bisect_right
+
+IDLE = -1
+
+
+class ExecutionTrace:
+    """Sequência de execução codificada por intervalos.
+
+    Cada fatia [start, end) guarda a tarefa e o job que ocuparam a CPU, em
+    colunas paralelas de array('q'). Fatias adjacentes da mesma tarefa e do
+    mesmo job são unidas, e o tempo ocioso é gravado com task_id = IDLE.
+    """
+
+    def __init__(self):
+        self.starts = array('q')
+        self.ends = array('q')
+        self.task_ids = array('q')
+        self.jobs = array('q')
+
+    def append(self, start: int, end: int, task_id: int, job: int = IDLE):
+        if end <= start:
+            return
+        if (self.ends and self.ends[-1] == start
+                and self.task_ids[-1] == task_id and self.jobs[-1] == job):
+            self.ends[-1] = end
+            return
+        self.starts.append(start)
+        self.ends.append(end)
+        self.task_ids.append(task_id)
+        self.jobs.append(job)
+
+    def idle(self, start: int, end: int):
+        self.append(start, end, IDLE)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def end_time(self):
+        return self.ends[-1] if self.ends else 0
+
+    def slices(self):
+        """Itera sobre (start, end, task_id, job)."""
+        return zip(self.starts, self.ends, self.task_ids, self.jobs)
+
+    def window(self, t0: int, t1: int):
+        """Retorna um novo trace com as fatias recortadas para [t0, t1)."""
+        result = ExecutionTrace()
+        i = bisect_right(self.ends, t0)
+        while i < len(self.starts) and self.starts[i] < t1:
+            result.append(max(self.starts[i], t0), min(self.ends[i], t1),
+                          self.task_ids[i], self.jobs[i])
+            i += 1
+        return result
+
+    def ticks(self, t0: int = 0, t1: int = None):
+        """Expande o trace tick a tick: o id da tarefa ou "idle"."""
+        if t1 is None:
+            t1 = self.end_time
+        for start, end, task_id, _ in self.window(t0, t1).slices():
+            value = "idle" if task_id == IDLE else task_id
+            for _ in range(start, end):
+                yield value
+
+    def to_list(self):
+        return list(self.ticks())
+
+    def executions_by_task(self, t0: int = 0, t1: int = None):
+        """Agrupa as fatias executadas por tarefa: {task_id: [(start, end), ...]}."""
+        trace = self if t0 == 0 and t1 is None else self.window(t0, t1)
+        grouped = {}
+        for start, end, task_id, _ in trace.slices():
+            if task_id != IDLE:
+                grouped.setdefault(task_id, []).append((start, end))
+        return grouped
+
+    def executions_by_job(self, t0: int = 0, t1: int = None):
+        """Agrupa as fatias executadas por job: {job: [(start, end), ...]}."""
+        trace = self if t0 == 0 and t1 is None else self.window(t0, t1)
+        grouped = {}
+        for start, end, task_id, job in trace.slices():
+            if task_id != IDLE:
+                grouped.setdefault(job, []).append((start, end))
+        return grouped
+
+    def busy_time_by_task(self):
+        import columnar  # importa execution_trace
+        if columnar.enabled(len(self)):
+            return columnar.busy_time_by_task(self)
+        totals = {}
+        for start, end, task_id, _ in self.slices():
+            if task_id != IDLE:
+                totals[task_id] = totals.get(task_id, 0) + end - start
+        return totals
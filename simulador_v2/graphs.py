@@ -1,97 +1,200 @@
 from typing import List
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.patches as mpatches
-from main import Task
-
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from typing import List
-
-def plot_gantt_chart(tasks: List, sim_time: int, title="Gantt Chart"):
-    fig, ax = plt.subplots(figsize=(10, len(tasks) * 0.8))
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from execution_trace import ExecutionTrace
+from job_table import JobTable
+
+# Acima disso o gráfico de tempo real agrupa as instâncias em uma linha por tarefa
+MAX_INSTANCE_ROWS = 60
+# Acima disso as barras são desenhadas sem contorno
+MAX_OUTLINED_BARS = 2000
+MAX_FIGURE_HEIGHT = 40
+
+
+def _new_figure(width: float, height: float, output: str = None):
+    """Com output, a figura não passa pelo pyplot (nenhum backend interativo é carregado)."""
+    height = min(max(height, 2.5), MAX_FIGURE_HEIGHT)
+    if output:
+        fig = Figure(figsize=(width, height))
+    else:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(width, height))
+    return fig, fig.add_subplot()
+
+
+def _finish(fig, output: str = None):
+    fig.tight_layout()
+    if output:
+        # O formato (PNG, SVG, PDF...) vem da extensão
+        fig.savefig(output)
+    else:
+        import matplotlib.pyplot as plt
+        plt.show()
+
+
+def _pixel_width(fig, t0: int, t1: int):
+    """Quanto tempo de simulação cabe em um pixel do eixo x (positivo mesmo com a janela vazia)."""
+    return max(t1 - t0, 1) / (fig.get_figwidth() * fig.dpi)
+
+
+def _downsample(intervals, resolution: float):
+    """Une intervalos (ordenados) separados por menos de um pixel.
+
+    Lacunas menores que um pixel não apareceriam no desenho; com isso cada
+    linha tem no máximo tantas barras quanto pixels na largura.
+    """
+    merged = []
+    for start, end in intervals:
+        if merged and start - merged[-1][1] < resolution:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _set_rows(ax, labels):
+    """Rótulos do eixo y; com linhas demais, só um a cada tantas linhas."""
+    step = -(-len(labels) // MAX_INSTANCE_ROWS) if labels else 1
+    ax.set_ylim(-0.5, len(labels) - 0.5)
+    ax.set_yticks(range(0, len(labels), step))
+    ax.set_yticklabels(labels[::step])
+
+
+def _add_bars(ax, bars, color, outlined: bool):
+    """Uma única PolyCollection para todas as barras (y, start, end) de uma cor."""
+    if not bars:
+        return
+    verts = [[(start, y - 0.3), (start, y + 0.3), (end, y + 0.3), (end, y - 0.3)]
+             for y, start, end in bars]
+    ax.add_collection(PolyCollection(verts, facecolors=[color],
+                                     edgecolors='black' if outlined else 'none',
+                                     linewidths=0.5 if outlined else 0))
+
+
+def plot_gantt_chart(tasks: List, sequence: ExecutionTrace, sim_time: int, title="Gantt Chart",
+                     output: str = None):
+    fig, ax = _new_figure(10, len(tasks) * 0.8, output)
+    resolution = _pixel_width(fig, 0, sim_time)
 
     color_map = {}
-    colors = plt.cm.get_cmap("tab10", len(tasks))
+    colors = matplotlib.colormaps["tab10"].resampled(max(len(tasks), 1))
+    executions = sequence.executions_by_task()
+    rows = {task_id: y for y, task_id in enumerate(dict.fromkeys(task.id for task in tasks))}
 
+    bars_by_task = {}
     for idx, task in enumerate(tasks):
         tid = f"T{task.id}"
         if tid not in color_map:
             color_map[tid] = colors(idx)
+        if task.id not in bars_by_task:
+            y = rows[task.id]
+            bars_by_task[task.id] = [(y, start, end)
+                                     for start, end in _downsample(executions.get(task.id, []), resolution)]
 
-        # Para métodos não-preemptivos (FCFS, SJF)
-        if not hasattr(task, 'executions') or not task.executions:
-            task.executions = [(task.start_time, task.finish_time)]
-
-        for start, end in task.executions:
-            ax.barh(y=tid, width=end - start, left=start, height=0.6,
-                    color=color_map[tid], edgecolor='black')
+    outlined = sum(len(bars) for bars in bars_by_task.values()) <= MAX_OUTLINED_BARS
+    for task_id, bars in bars_by_task.items():
+        _add_bars(ax, bars, color_map[f"T{task_id}"], outlined)
 
     ax.set_xlabel("Tempo")
     ax.set_ylabel("Tarefas")
     ax.set_title(title)
-    ax.set_xlim(0, sim_time)
-    ax.set_yticks([f"T{task.id}" for task in tasks])
+    ax.set_xlim(0, max(sim_time, 1))
+    _set_rows(ax, [f"T{task_id}" for task_id in rows])
     ax.grid(True, axis='x', linestyle='--', alpha=0.5)
 
-    # Legenda
-    patches = [mpatches.Patch(color=color_map[f"T{task.id}"], label=f"T{task.id}") for task in tasks]
-    ax.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left')
+    # Legenda (os rótulos do eixo já bastam quando há muitas tarefas)
+    if len(rows) <= MAX_INSTANCE_ROWS:
+        patches = [mpatches.Patch(color=color_map[f"T{task_id}"], label=f"T{task_id}") for task_id in rows]
+        ax.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left')
 
-    plt.tight_layout()
-    plt.show()
+    _finish(fig, output)
 
 
-def plot_gantt_chart_realtime(instances: List[Task], sim_time: int, title="Gantt Chart (Tempo Real)"):
-    fig, ax = plt.subplots(figsize=(12, len(instances) * 0.5))
+def plot_gantt_chart_realtime(jobs: JobTable, sequence: ExecutionTrace, sim_time: int, title="Gantt Chart (Tempo Real)",
+                              output: str = None, t0: int = 0):
+    """Uma linha por instância (T0_0, T0_1...) ou, com muitas instâncias, uma por tarefa.
 
-    colors = plt.cm.get_cmap("tab10", 10)  # até 10 tarefas
+    t0 > 0 desenha só o trecho [t0, sim_time), como numa janela lida de
+    trace_store.TraceStore.window.
 
-    # Nomear instâncias: T0_0, T0_1...
-    instance_labels = []
-    task_instance_counts = {}
+    No modo agrupado as execuções de jobs que perderam o deadline ficam em
+    cinza na linha da própria tarefa, e os deadlines viram marcas curtas
+    nessa linha em vez de retas ocupando o gráfico inteiro.
+    """
+    by_task = len(jobs) > MAX_INSTANCE_ROWS
+    colors = matplotlib.colormaps["tab10"]  # até 10 tarefas
 
-    for inst in instances:
-        tid = inst.id
-        task_instance_counts[tid] = task_instance_counts.get(tid, 0)
-        label = f"T{tid}_{task_instance_counts[tid]}"
-        instance_labels.append((label, inst))
-        task_instance_counts[tid] += 1
+    # Linhas: T0_0, T0_1... por instância, ou T0, T1... por tarefa
+    labels = []
+    rows = {}
+    task_instance_counts = {}
+    for j in jobs:
+        tid = jobs.task_id(j)
+        if by_task:
+            if tid not in rows:
+                rows[tid] = len(labels)
+                labels.append(f"T{tid}")
+        else:
+            task_instance_counts[tid] = task_instance_counts.get(tid, 0)
+            rows[j] = len(labels)
+            labels.append(f"T{tid}_{task_instance_counts[tid]}")
+            task_instance_counts[tid] += 1
+
+    fig, ax = _new_figure(12, len(labels) * 0.5, output)
+    resolution = _pixel_width(fig, t0, sim_time)
+    executions = sequence.executions_by_job()
+
+    # Agrupamento por (tarefa, perdeu deadline): uma coleção de barras e uma de deadlines por grupo
+    intervals = {}
+    deadlines = {}
+    for j in jobs:
+        tid = jobs.task_id(j)
+        y = rows[tid] if by_task else rows[j]
+        slices = intervals.setdefault((tid, bool(jobs.missed(j))), {}).setdefault(y, [])
+        slices.extend(executions.get(j, []))
+        deadlines.setdefault(tid, []).append((y, jobs.deadline[j]))
+
+    bars = {}
+    for key, rows_slices in intervals.items():
+        bars[key] = [(y, start, end)
+                     for y, slices in rows_slices.items()
+                     for start, end in _downsample(sorted(slices), resolution)]
+    outlined = sum(len(b) for b in bars.values()) <= MAX_OUTLINED_BARS
 
-    # Plotagem
-    yticks = []
-    yticklabels = []
     legend_labels = {}
-
-    for y, (label, inst) in enumerate(instance_labels):
-        base_color = colors(inst.id % 10)
-        legend_labels[f"T{inst.id}"] = base_color
-
-        # Determinar cor (cinza se perdeu deadline)
-        color = 'gray' if inst.finish_time and inst.finish_time > inst.deadline else base_color
-
-        for start, end in inst.executions:
-            ax.barh(y=label, width=end - start, left=start, height=0.6,
-                    color=color, edgecolor='black')
-
-        # Linha de deadline
-        ax.axvline(inst.deadline, color=base_color, linestyle='--', linewidth=1)
-
-        yticks.append(label)
-        yticklabels.append(label)
+    for (tid, missed), task_bars in bars.items():
+        base_color = colors(tid % 10)
+        legend_labels[f"T{tid}"] = base_color
+        # Cinza se perdeu deadline
+        _add_bars(ax, task_bars, 'gray' if missed else base_color, outlined)
+
+    # Linhas de deadline, sem repetir o mesmo pixel
+    for tid, marks in deadlines.items():
+        base_color = colors(tid % 10)
+        if by_task:
+            seen = {(y, int(deadline // resolution)): deadline for y, deadline in marks}
+            ys = [y for y, _ in seen]
+            ax.vlines(list(seen.values()), [y - 0.4 for y in ys], [y + 0.4 for y in ys],
+                      color=base_color, linestyle='--', linewidth=1)
+        else:
+            xs = sorted({deadline for _, deadline in marks})
+            ax.vlines(xs, 0, 1, transform=ax.get_xaxis_transform(),
+                      color=base_color, linestyle='--', linewidth=1)
 
     ax.set_xlabel("Tempo")
-    ax.set_ylabel("Instâncias")
+    ax.set_ylabel("Tarefas" if by_task else "Instâncias")
     ax.set_title(title)
-    ax.set_xlim(0, sim_time)
-    ax.set_yticks(range(len(yticks)))
-    ax.set_yticklabels([lbl for lbl, _ in instance_labels])
+    ax.set_xlim(t0, max(sim_time, t0 + 1))
+    _set_rows(ax, labels)
     ax.grid(True, axis='x', linestyle='--', alpha=0.5)
 
     # Legenda
     patches = [mpatches.Patch(color=color, label=task)
-            for task, color in sorted(legend_labels.items())]
+            for task, color in sorted(legend_labels.items())][:MAX_INSTANCE_ROWS]
     patches.append(mpatches.Patch(color='grey', label='Deadline perdido'))
     ax.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left')
 
-    plt.tight_layout()
-    plt.show()
+    _finish(fig, output)
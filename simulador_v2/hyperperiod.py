@@ -0,0 +1,87 @@
+from math import gcd
+
+from job_table import count_releases, first_release, task_releases
+from periodic_engine import PeriodicSimulation
+
+
+def hyperperiod(tasks):
+    """MMC dos períodos."""
+    result = 1
+    for task in tasks:
+        result = result * task.period_time // gcd(result, task.period_time)
+    return result
+
+
+class Extrapolation:
+    """Resultado de uma simulação periódica estendida até o horizonte completo.
+
+    O escalonamento a partir de cycle_start se repete a cada hyperperiod.
+    Só [0, cycle_start + hyperperiod) foi simulado; os totais por tarefa
+    (no mesmo formato de JobTable.completion_totals) cobrem [0, sim_time].
+    """
+
+    def __init__(self, jobs, sim_time: int, cycle_start: int, hyperperiod: int):
+        self.sim_time = sim_time
+        self.cycle_start = cycle_start
+        self.hyperperiod = hyperperiod
+        self.simulated_until = cycle_start + hyperperiod
+        self.releases = {task.id: task_releases(task, sim_time) for task in jobs.tasks}
+
+        cycles, rest = divmod(sim_time - cycle_start, hyperperiod)
+        transient, transient_last = jobs.completion_totals(until=cycle_start)
+        cycle, cycle_last = jobs.completion_totals(after=cycle_start, until=self.simulated_until)
+        tail, tail_last = jobs.completion_totals(after=cycle_start, until=cycle_start + rest)
+
+        self.totals = {tid: list(entry) for tid, entry in transient.items()}
+        for tid, entry in cycle.items():
+            total = self.totals.setdefault(tid, [0, 0, 0, 0, 0])
+            for k, value in enumerate(entry):
+                total[k] += value * cycles
+        for tid, entry in tail.items():
+            total = self.totals[tid]
+            for k, value in enumerate(entry):
+                total[k] += value
+
+        if tail_last is not None:
+            self.total_time = tail_last + cycles * hyperperiod
+        elif cycle_last is not None:
+            self.total_time = cycle_last + (cycles - 1) * hyperperiod
+        else:
+            self.total_time = transient_last
+
+    def deadline_summary(self):
+        return {
+            tid: {"misses": self.totals[tid][4] if tid in self.totals else 0, "total": total}
+            for tid, total in self.releases.items()
+        }
+
+    def describe(self):
+        return (f"Escalonamento periódico a partir de t={self.cycle_start} (hiperperíodo = {self.hyperperiod}); "
+                f"simulado até t={self.simulated_until}, métricas extrapoladas até t={self.sim_time}.")
+
+
+def simulate_extrapolated(sim_time: int, tasks, priority):
+    """Simula RM/EDF até o escalonamento entrar em regime e extrapola o resto.
+
+    O estado é comparado a cada hiperperíodo a partir da última primeira
+    liberação. Se dois estados consecutivos coincidem, o ciclo entre eles se
+    repete até o horizonte e jobs.extrapolation recebe os totais extrapolados;
+    senão (p. ex. utilização > 1) a simulação vai até sim_time normalmente.
+    """
+    period = hyperperiod(tasks)
+    boundary = max((first_release(task) for task in tasks), default=0)
+    sim = PeriodicSimulation(tasks, priority, count_releases(tasks, min(sim_time, boundary + 2 * period)))
+
+    previous = None
+    while boundary <= sim_time:
+        sim.advance(boundary)
+        state = sim.state_key()
+        if state == previous:
+            sequence, jobs = sim.close()
+            jobs.extrapolation = Extrapolation(jobs, sim_time, boundary - period, period)
+            return sequence, jobs
+        previous = state
+        boundary += period
+
+    sim.advance(sim_time)
+    return sim.close()
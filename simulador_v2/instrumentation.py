@@ -0,0 +1,171 @@
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+EVENTS = ("release", "dispatch", "preemption", "completion", "deadline_miss", "idle")
+# Fases do laço dos simuladores, na ordem em que acontecem a cada iteração
+LOOP_PHASES = ("release", "select", "trace", "complete")
+# Eventos contados por tarefa no relatório
+TASK_EVENTS = ("release", "dispatch", "preemption", "completion", "deadline_miss")
+
+
+class Probe:
+    """Instrumentação opcional dos simuladores (parâmetro probe).
+
+    Os simuladores informam liberações, fatias executadas, conclusões e
+    ociosidade; despacho, preempção e deadline perdido são deduzidos daí.
+    Um despacho (troca de contexto) é uma fatia de um job diferente do que
+    executava; uma preempção é um despacho enquanto o job anterior ainda
+    não terminou. on(evento, callback) registra callbacks para os eventos
+    de EVENTS.
+
+    Com timing=True o laço também marca o fim de cada fase (lap), e
+    phase(nome) mede trechos maiores, como o cálculo das métricas. Sem
+    probe os simuladores só fazem um teste de None por evento.
+    """
+
+    def __init__(self, timing: bool = True):
+        self.timing = timing
+        self.callbacks = {event: [] for event in EVENTS}
+        self.counts = {event: Counter() for event in EVENTS}
+        self.idle_time = 0
+        self.decisions = 0
+        self.queue_lengths = Counter()
+        self.phase_time = dict.fromkeys(LOOP_PHASES, 0.0)
+        self.running = None
+        self.last = perf_counter()
+
+    def on(self, event: str, callback):
+        if event not in self.callbacks:
+            raise ValueError(f"Evento desconhecido: {event}")
+        self.callbacks[event].append(callback)
+        return callback
+
+    def _emit(self, event, *args):
+        for callback in self.callbacks[event]:
+            callback(*args)
+
+    def lap(self, phase: str):
+        """Atribui a `phase` o tempo desde a marca anterior."""
+        if self.timing:
+            now = perf_counter()
+            self.phase_time[phase] += now - self.last
+            self.last = now
+
+    def start(self):
+        """Reinicia a marca de tempo (antes de entrar no laço)."""
+        self.last = perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_time[name] = self.phase_time.get(name, 0.0) + perf_counter() - start
+            self.last = perf_counter()
+
+    def job_released(self, time: int, task_id, job):
+        self.counts["release"][task_id] += 1
+        if self.callbacks["release"]:
+            self._emit("release", time, task_id, job)
+
+    def job_running(self, start: int, end: int, task_id, job, queue_length: int):
+        """Uma fatia [start, end) de job.
+
+        queue_length é o número de jobs prontos na decisão, contando o
+        escolhido. Encerra a fase select (que inclui o próprio registro).
+        """
+        self.decisions += 1
+        self.queue_lengths[queue_length] += 1
+        previous = self.running
+        if previous is None or previous[1] != job:
+            self._dispatch(start, task_id, job, previous)
+        self.lap("select")
+
+    def _dispatch(self, start, task_id, job, previous):
+        if previous is not None:
+            self.counts["preemption"][previous[0]] += 1
+            if self.callbacks["preemption"]:
+                self._emit("preemption", start, previous[0], previous[1], task_id, job)
+        self.running = (task_id, job)
+        self.counts["dispatch"][task_id] += 1
+        if self.callbacks["dispatch"]:
+            self._emit("dispatch", start, task_id, job)
+
+    def job_completed(self, time: int, task_id, job, deadline: int = None):
+        self.running = None
+        self.counts["completion"][task_id] += 1
+        if self.callbacks["completion"]:
+            self._emit("completion", time, task_id, job)
+        if deadline is not None and time > deadline:
+            self.counts["deadline_miss"][task_id] += 1
+            if self.callbacks["deadline_miss"]:
+                self._emit("deadline_miss", time, task_id, job, deadline)
+
+    def cpu_idle(self, start: int, end: int):
+        """Ociosidade em [start, end); também encerra a fase select."""
+        self.decisions += 1
+        self.queue_lengths[0] += 1
+        self.running = None
+        self.counts["idle"][None] += 1
+        self.idle_time += end - start
+        if self.callbacks["idle"]:
+            self._emit("idle", start, end)
+        self.lap("select")
+
+    def summary(self):
+        loop_time = sum(self.phase_time[phase] for phase in LOOP_PHASES)
+        tasks = {}
+        for event in TASK_EVENTS:
+            for task_id, count in self.counts[event].items():
+                tasks.setdefault(task_id, dict.fromkeys(TASK_EVENTS, 0))[event] = count
+        return {
+            "decisions": self.decisions,
+            "decisions_per_sec": self.decisions / loop_time if loop_time else None,
+            "context_switches": sum(self.counts["dispatch"].values()),
+            "preemptions": sum(self.counts["preemption"].values()),
+            "idle_periods": self.counts["idle"][None],
+            "idle_time": self.idle_time,
+            "queue_lengths": dict(sorted(self.queue_lengths.items())),
+            "phases": dict(self.phase_time),
+            "tasks": dict(sorted(tasks.items())),
+        }
+
+
+def _histogram(counts, width: int = 40):
+    """Linhas de um histograma de texto; comprimentos agrupados em potências de 2 acima de 8."""
+    buckets = Counter()
+    for length, count in counts.items():
+        if length <= 8:
+            buckets[(length, length)] += count
+        else:
+            low = 1 << (length.bit_length() - 1)
+            buckets[(low, 2 * low - 1)] += count
+    top = max(buckets.values(), default=0)
+    for (low, high), count in sorted(buckets.items()):
+        label = str(low) if low == high else f"{low}-{high}"
+        yield f"{label:>9} | {'#' * max(1, round(width * count / top))} {count}"
+
+
+def print_profile(probe: Probe):
+    summary = probe.summary()
+    print("\nPerfil da simulação:")
+    rate = summary["decisions_per_sec"]
+    print(f"Decisões: {summary['decisions']}" + (f" ({rate:,.0f}/s)" if rate else ""))
+    print(f"Trocas de contexto: {summary['context_switches']}, preempções: {summary['preemptions']}")
+    print(f"Ociosidade: {summary['idle_periods']} período(s), {summary['idle_time']} unidades de tempo")
+
+    total = sum(summary["phases"].values())
+    print("\nTempo por fase:")
+    for name, seconds in summary["phases"].items():
+        share = seconds / total if total else 0
+        print(f"{name:>12}: {seconds * 1000:10.3f} ms ({share:6.1%})")
+
+    print("\nTamanho da fila de prontos por decisão:")
+    for line in _histogram(summary["queue_lengths"]):
+        print(line)
+
+    print("\nPor tarefa (liberações / despachos / preempções / conclusões / deadlines perdidos):")
+    for task_id, counts in sorted(summary["tasks"].items()):
+        print(f"T{task_id}: " + " / ".join(str(counts[event]) for event in TASK_EVENTS))
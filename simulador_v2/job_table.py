@@ -0,0 +1,158 @@
+from array import array
+
+import columnar
+
+NOT_FINISHED = -1
+
+
+def first_release(task):
+    if task.offset >= 0:
+        return task.offset
+    return task.offset % task.period_time
+
+
+def task_releases(task, sim_time: int):
+    """Número de jobs da tarefa liberados em [0, sim_time)."""
+    first = first_release(task)
+    if first >= sim_time:
+        return 0
+    return (sim_time - 1 - first) // task.period_time + 1
+
+
+def count_releases(tasks, sim_time: int):
+    """Número exato de jobs liberados em [0, sim_time)."""
+    return sum(task_releases(task, sim_time) for task in tasks)
+
+
+class JobTable:
+    """Jobs periódicos liberados por RM/EDF, em colunas (struct-of-arrays).
+
+    O job j é a linha j de todas as colunas, e as linhas seguem a ordem de
+    liberação. Os parâmetros fixos (computation_time, period_time, ...) ficam
+    na Task de origem, acessível por tasks[task_index[j]]. finish[j] vale
+    NOT_FINISHED enquanto o job não termina.
+
+    order guarda os jobs na ordem em que foram concluídos, seguidos dos que
+    não terminaram até o fim da simulação (em ordem de liberação).
+
+    extrapolation é preenchido (ver hyperperiod.py) quando a tabela cobre só
+    o trecho simulado de uma execução extrapolada por hiperperíodo.
+
+    Com recycle=True a linha de um job concluído volta para uma lista livre
+    e é reaproveitada na próxima liberação: a tabela fica do tamanho do
+    maior número de jobs pendentes ao mesmo tempo, mas não guarda histórico
+    (order só recebe os não concluídos). released conta as liberações.
+    """
+
+    def __init__(self, tasks, capacity: int = 0, recycle: bool = False):
+        self.tasks = tasks
+        zeros = array('q', [0]) * capacity
+        self.task_index = array('q', zeros)
+        self.release = array('q', zeros)
+        self.deadline = array('q', zeros)
+        self.remaining = array('q', zeros)
+        self.finish = array('q', [NOT_FINISHED]) * capacity
+        self.completed = bytearray(capacity)
+        self.order = array('q')
+        self.size = 0
+        self.released = 0
+        self.recycle = recycle
+        self.free = array('q')
+        self.extrapolation = None
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def add(self, task_index: int, release: int):
+        if self.free:
+            j = self.free.pop()
+            self.finish[j] = NOT_FINISHED
+            self.completed[j] = 0
+        else:
+            j = self.size
+            if j == len(self.release):
+                self._grow()
+            self.size += 1
+        task = self.tasks[task_index]
+        self.task_index[j] = task_index
+        self.release[j] = release
+        self.deadline[j] = release + task.deadline
+        self.remaining[j] = task.computation_time
+        self.released += 1
+        return j
+
+    def _grow(self):
+        extra = max(len(self.release), 16)
+        zeros = array('q', [0]) * extra
+        for column in (self.task_index, self.release, self.deadline, self.remaining):
+            column.extend(zeros)
+        self.finish.extend(array('q', [NOT_FINISHED]) * extra)
+        self.completed.extend(bytearray(extra))
+
+    def complete(self, j: int, time: int):
+        if self.recycle:
+            self.free.append(j)
+            return
+        self.finish[j] = time
+        self.completed[j] = 1
+        self.order.append(j)
+
+    def task(self, j: int):
+        return self.tasks[self.task_index[j]]
+
+    def task_id(self, j: int):
+        return self.tasks[self.task_index[j]].id
+
+    def computation_time(self, j: int):
+        return self.tasks[self.task_index[j]].computation_time
+
+    def missed(self, j: int):
+        return self.completed[j] and self.finish[j] > self.deadline[j]
+
+    def deadline_summary(self):
+        """{task_id: {"misses": ..., "total": ...}} para todas as tarefas."""
+        if columnar.enabled(self.size):
+            return columnar.deadline_summary(self)
+        summary = {task.id: {"misses": 0, "total": 0} for task in self.tasks}
+        for j in range(self.size):
+            data = summary[self.task_id(j)]
+            data["total"] += 1
+            if self.missed(j):
+                data["misses"] += 1
+        return summary
+
+    def completion_totals(self, after: int = None, until: int = None, where=None):
+        """Agrega, por tarefa, os jobs concluídos com after < finish <= until.
+
+        where, se dado, é um filtro adicional where(j) -> bool.
+
+        Retorna ({task_id: [concluídos, soma TAT, soma WT, soma computation,
+        deadlines perdidos]}, maior finish). As tarefas aparecem na ordem da
+        primeira conclusão; o maior finish é None se nada terminou.
+        """
+        if where is None and columnar.enabled(self.size):
+            return columnar.completion_totals(self, after, until)
+        totals = {}
+        last_finish = None
+        for j in self.order:
+            if not self.completed[j]:
+                continue
+            finish = self.finish[j]
+            if (after is not None and finish <= after) or (until is not None and finish > until):
+                continue
+            if where is not None and not where(j):
+                continue
+            computation = self.computation_time(j)
+            tat = finish - self.release[j]
+            entry = totals.setdefault(self.task_id(j), [0, 0, 0, 0, 0])
+            entry[0] += 1
+            entry[1] += tat
+            entry[2] += tat - computation
+            entry[3] += computation
+            entry[4] += finish > self.deadline[j]
+            if last_finish is None or finish > last_finish:
+                last_finish = finish
+        return totals, last_finish
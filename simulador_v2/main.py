@@ -1,316 +1,160 @@
+import argparse
+import heapq
 import json
-from asyncio import current_task
+import os
+import sys
 from typing import List
-from collections import defaultdict
+from contextlib import nullcontext
+
+import columnar
+from aperiodic_engine import FCFSSimulation, RRSimulation, RunState, SJFSimulation, SRTFSimulation
+from execution_trace import IDLE, ExecutionTrace
+from hyperperiod import simulate_extrapolated
+from job_table import JobTable, count_releases
+from online_metrics import OnlineMetrics, print_percentiles
+from periodic_engine import PeriodicSimulation, edf_priority, rm_priority
+from schedulability import analyze
+from task_loader import load_scenario
 
 
 class Task:
+    """Especificação imutável de uma tarefa.
+
+    O estado de cada execução fica fora dela (RunState em FCFS/SJF/RR/SRTF,
+    JobTable em RM/EDF), então o mesmo conjunto lido do arquivo pode ser
+    simulado por todos os escalonadores, em threads ou processos, sem cópias.
+    """
+
+    __slots__ = ("id", "offset", "computation_time", "period_time", "quantum", "deadline")
+
     def __init__(self, id, offset, computation_time, period_time, quantum, deadline):
-        self.id = id
-        self.offset = offset
-        self.computation_time = computation_time
-        self.period_time = period_time
-        self.quantum = quantum
-        self.deadline = deadline
-        self.start_time = None
-        self.finish_time = 0
-        self.remaining_time = computation_time
-        self.waiting_time = 0
+        init = object.__setattr__
+        init(self, "id", id)
+        init(self, "offset", offset)
+        init(self, "computation_time", computation_time)
+        init(self, "period_time", period_time)
+        init(self, "quantum", quantum)
+        init(self, "deadline", deadline)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Task é imutável: {name} não pode ser alterado")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Task é imutável: {name} não pode ser removido")
+
+    def __reduce__(self):
+        return Task, (self.id, self.offset, self.computation_time, self.period_time, self.quantum, self.deadline)
 
     def __repr__(self):
         return f"T{self.id}"
 
 
 def read_tasks_from_json(file_path: str):
-    with open(file_path) as f:
-        data = json.load(f)
-        tasks = []
-        for i, t in enumerate(data['tasks']):
-            try:
-                tasks.append(Task(
-                    id=i,
-                    offset=t["offset"],
-                    computation_time=t["computation_time"],
-                    period_time=t["period_time"],
-                    quantum=t["quantum"],
-                    deadline=t["deadline"]
-                ))
-            except KeyError as e:
-                raise ValueError(f"Erro na task {i}: campo vazio -> {e}") from e
-
-    return data["simulation_time"], data["scheduler_name"], tasks
-
-
-def simulate_fcfs(sim_time: int, tasks: List[Task]):
-    tasks_remaining = tasks[:]
-    tasks_remaining.sort(key=lambda task: task.offset)
-    time = 0
-    sequence = []
-    ready_queue = []
-    executed_tasks = []
-
-    while time < sim_time:
-        for task in tasks_remaining[:]:
-            if task.offset <= time:
-                ready_queue.append(task)
-                tasks_remaining.remove(task)
-
-        if ready_queue:
-            current_task = ready_queue.pop(0)
-            if current_task.start_time is None:
-                current_task.start_time = time
-            sequence.extend([current_task.id] * current_task.computation_time)
-            time += current_task.computation_time
-            current_task.finish_time = time
-            current_task.waiting_time = current_task.start_time - current_task.offset
-            executed_tasks.append(current_task)
-        else:
-            sequence.append("idle")
-            time += 1
-
-    print_timeline_simple(tasks, sim_time)
-    return sequence, executed_tasks
-
-def simulate_sjf(sim_time: int, tasks: List[Task]):
-    time = 0
-    sequence = []
-    ready_queue = []
-    executed_tasks = []
-    tasks_remaining = tasks[:]
-
-    while time < sim_time:
-        for task in tasks_remaining[:]:
-            if task.offset <= time:
-                ready_queue.append(task)
-                tasks_remaining.remove(task)
-
-        if ready_queue:
-            current_task = min(ready_queue, key=lambda t: t.computation_time)
-            ready_queue.remove(current_task)
-            if current_task.start_time is None:
-                current_task.start_time = time
-            sequence.extend([current_task.id] * current_task.computation_time)
-            time += current_task.computation_time
-            current_task.finish_time = time
-            current_task.waiting_time = current_task.start_time - current_task.offset
-            executed_tasks.append(current_task)
-        else:
-            sequence.append("idle")
-            time += 1
-    print_timeline_simple(tasks, sim_time)
-    return sequence, executed_tasks
+    """(simulation_time, scheduler_name, tarefas) do arquivo.
 
-def simulate_rr(sim_time: int, tasks: List[Task]):
-    from collections import deque
+    Todas as tarefas inválidas são relatadas de uma vez (TaskValidationError,
+    um ValueError). Para arquivos com vários cenários, ver
+    task_loader.iter_scenarios.
+    """
+    scenario = load_scenario(file_path)
+    return scenario.simulation_time, scenario.scheduler, scenario.columns.tasks(Task)
 
-    time = 0
-    sequence = []
-    ready_queue = deque()
-    tasks_remaining = tasks[:]
-    executed_tasks = []
 
-    for task in tasks:
-        task.remaining_time = task.computation_time
-        task.executions = []
-
-    while time < sim_time or ready_queue:
-        for task in tasks_remaining[:]:
-            if task.offset <= time:
-                ready_queue.append(task)
-                tasks_remaining.remove(task)
-
-        if ready_queue:
-            current = ready_queue.popleft()
-
-            if current.start_time is None and current.remaining_time == current.computation_time:
-                current.start_time = time
-
-            exec_time = min(current.quantum, current.remaining_time)
-            current.executions.append((time, time + exec_time))
-            sequence.extend([current.id] * exec_time)
-            time += exec_time
-            current.remaining_time -= exec_time
-
-            for task in tasks_remaining[:]:
-                if task.offset <= time:
-                    ready_queue.append(task)
-                    tasks_remaining.remove(task)
-
-            if current.remaining_time > 0:
-                ready_queue.append(current)
-            else:
-                current.finish_time = time
-                current.waiting_time = current.finish_time - current.offset - current.computation_time
-                executed_tasks.append(current)
-        else:
-            sequence.append("idle")
-            time += 1
+def _simulate_aperiodic(engine, sim_time: int, tasks: List[Task], metrics=None, probe=None):
+    sim = engine(tasks, metrics, probe)
+    sim.advance(sim_time)
+    return sim.close()
 
-    print_timeline_preemptive(tasks, sim_time)
-    return sequence, executed_tasks
 
+def simulate_fcfs(sim_time: int, tasks: List[Task], metrics=None, probe=None):
+    return _simulate_aperiodic(FCFSSimulation, sim_time, tasks, metrics, probe)
 
-def simulate_srtf(sim_time: int, tasks: List[Task]):
-    sequence = []
-    ready_queue = []
-    tasks_remaining = tasks[:]
-    executed_tasks = []
 
-    for task in tasks:
-        task.remaining_time = task.computation_time
-        task.executions = []
-
-    current_task = None
-    for time in range(sim_time):
-        for task in tasks_remaining[:]:
-            if task.offset <= time:
-                ready_queue.append(task)
-                tasks_remaining.remove(task)
-
-        if current_task and current_task.remaining_time == 0:
-            current_task.finish_time = time
-            current_task.waiting_time = current_task.finish_time - current_task.offset - current_task.computation_time
-            executed_tasks.append(current_task)
-            current_task = None
-
-        if ready_queue or current_task:
-            if ready_queue:
-                if current_task:
-                    ready_queue.append(current_task)
-                current_task = min(ready_queue, key=lambda t: t.remaining_time)
-                ready_queue.remove(current_task)
-
-            if current_task.start_time is None and current_task.remaining_time == current_task.computation_time:
-                current_task.start_time = time
-
-            current_task.remaining_time -= 1
-            current_task.executions.append((time, time + 1))
-            sequence.append(current_task.id)
-        else:
-            sequence.append("idle")
-
-    print_timeline_preemptive(tasks, sim_time)
-    return sequence, executed_tasks
-
-def simulate_rm(sim_time: int, tasks: List[Task]):
-    sequence = []
-    executed_instances = []
-    active_instances = []
-    missed_deadlines = {task.id: {"misses": 0, "total": 0} for task in tasks}
-
-    for time in range(sim_time):
-        for task in tasks:
-            if (time - task.offset) % task.period_time == 0 and time >= task.offset:
-                instance = Task(
-                    id=task.id,
-                    offset=time,
-                    computation_time=task.computation_time,
-                    period_time=task.period_time,
-                    quantum=task.quantum,
-                    deadline=time + task.deadline
-                )
-                instance.remaining_time = instance.computation_time
-                instance.executions = []
-                active_instances.append(instance)
-                missed_deadlines[task.id]["total"] += 1
-
-        ready = [t for t in active_instances if t.offset <= time and t.remaining_time > 0]
-
-        if ready:
-            current = min(ready, key=lambda t: t.period_time)
-            current.executions.append((time, time + 1))
-            current.remaining_time -= 1
-            sequence.append(current.id)
-
-            if current.remaining_time == 0:
-                current.finish_time = time + 1
-                if current.finish_time > current.deadline:
-                    missed_deadlines[current.id]["misses"] += 1
-                executed_instances.append(current)
-        else:
-            sequence.append("idle")
-    for inst in active_instances:
-        if inst.remaining_time > 0 and inst not in executed_instances:
-            inst.finish_time = None
-            executed_instances.append(inst)
+def simulate_sjf(sim_time: int, tasks: List[Task], metrics=None, probe=None):
+    return _simulate_aperiodic(SJFSimulation, sim_time, tasks, metrics, probe)
 
-    print_timeline_realtime(executed_instances, sim_time)
 
-    print("\nDeadlines Perdidos (RM):")
-    for tid, data in missed_deadlines.items():
-        ratio = data["misses"] / data["total"]
-        print(f"T{tid} perdeu {data['misses']} de {data['total']} deadlines ({ratio:.2f})")
-    return sequence, executed_instances
-
-
-def simulate_edf(sim_time: int, tasks: List[Task]):
-    sequence = []
-    executed_instances = []
-    active_instances = []
-    missed_deadlines = {task.id: {"misses": 0, "total": 0} for task in tasks}
-
-    for time in range(sim_time):
-        for task in tasks:
-            if (time - task.offset) % task.period_time == 0 and time >= task.offset:
-                instance = Task(
-                    id=task.id,
-                    offset=time,
-                    computation_time=task.computation_time,
-                    period_time=task.period_time,
-                    quantum=task.quantum,
-                    deadline=time + task.deadline
-                )
-                instance.remaining_time = instance.computation_time
-                instance.executions = []
-                active_instances.append(instance)
-                missed_deadlines[task.id]["total"] += 1
-
-        ready = [t for t in active_instances if t.offset <= time and t.remaining_time > 0]
-
-        if ready:
-            current = min(ready, key=lambda t: t.deadline)
-            current.executions.append((time, time + 1))
-            current.remaining_time -= 1
-            sequence.append(current.id)
-
-            if current.remaining_time == 0:
-                current.finish_time = time + 1
-                if current.finish_time > current.deadline:
-                    missed_deadlines[current.id]["misses"] += 1
-                executed_instances.append(current)
-        else:
-            sequence.append("idle")
-            
-    for inst in active_instances:
-        if inst.remaining_time > 0 and inst not in executed_instances:
-            inst.finish_time = None
-            executed_instances.append(inst)
+def simulate_rr(sim_time: int, tasks: List[Task], metrics=None, probe=None):
+    return _simulate_aperiodic(RRSimulation, sim_time, tasks, metrics, probe)
+
+
+def simulate_srtf(sim_time: int, tasks: List[Task], metrics=None, probe=None):
+    return _simulate_aperiodic(SRTFSimulation, sim_time, tasks, metrics, probe)
+
 
-    print_timeline_realtime(executed_instances, sim_time)
+def _simulate_periodic(sim_time: int, tasks: List[Task], priority, extrapolate: bool = False, metrics=None,
+                       probe=None):
+    if extrapolate:
+        if metrics or probe:
+            raise ValueError("Métricas online e instrumentação não podem ser combinadas com extrapolação por hiperperíodo.")
+        return simulate_extrapolated(sim_time, tasks, priority)
+    sim = PeriodicSimulation(tasks, priority, count_releases(tasks, sim_time), metrics, probe=probe)
+    sim.advance(sim_time)
+    return sim.close()
 
-    print("\nDeadlines Perdidos (EDF):")
-    for tid, data in missed_deadlines.items():
+
+def deadline_summary(jobs: JobTable):
+    """{task_id: {"misses": ..., "total": ...}}, extrapolado se for o caso."""
+    return jobs.extrapolation.deadline_summary() if jobs.extrapolation else jobs.deadline_summary()
+
+
+def print_deadline_summary(jobs: JobTable, scheduler_name: str):
+    print(f"\nDeadlines Perdidos ({scheduler_name}):")
+    for tid, data in deadline_summary(jobs).items():
         ratio = data["misses"] / data["total"]
         print(f"T{tid} perdeu {data['misses']} de {data['total']} deadlines ({ratio:.2f})")
 
-    return sequence, executed_instances
 
-def calculate_metrics(tasks: List[Task]):
-    completed_tasks = []
+def simulate_rm(sim_time: int, tasks: List[Task], extrapolate: bool = False, metrics=None, probe=None):
+    return _simulate_periodic(sim_time, tasks, rm_priority, extrapolate, metrics, probe)
 
-    for task in tasks:
-        if hasattr(task, "executions") and task.executions:
-            total_executed = sum(end - start for start, end in task.executions)
-            if total_executed >= task.computation_time:
-                completed_tasks.append(task)
+
+def simulate_edf(sim_time: int, tasks: List[Task], extrapolate: bool = False, metrics=None, probe=None):
+    return _simulate_periodic(sim_time, tasks, edf_priority, extrapolate, metrics, probe)
+
+
+SIMULATORS = {
+    "FCFS": simulate_fcfs,
+    "SJF": simulate_sjf,
+    "RR": simulate_rr,
+    "SRTF": simulate_srtf,
+    "RM": simulate_rm,
+    "EDF": simulate_edf,
+}
+REALTIME_SCHEDULERS = ["RM", "EDF"]
+
+def calculate_metrics(state: RunState, sequence: ExecutionTrace, sim_time: int, verbose: bool = True):
+    executed_time = sequence.busy_time_by_task()
+    tasks, finish, waiting = state.tasks, state.finish, state.waiting
+
+    if columnar.enabled(len(tasks)):
+        incomplete, tat_list, wt_list, most_wt, least_wt, computation = columnar.task_metrics(state, executed_time)
+        incomplete = [tasks[i] for i in incomplete]
+    else:
+        completed = []
+        incomplete = []
+        for i, task in enumerate(tasks):
+            if task.id in executed_time:
+                done = executed_time[task.id] >= task.computation_time
             else:
-                print(f"\n[AVISO] Tarefa T{task.id} não completou sua execução e será desconsiderada nas métricas.")
-        elif task.finish_time and task.finish_time - task.offset >= task.computation_time:
-            completed_tasks.append(task)
-        else:
+                done = finish[i] and finish[i] - task.offset >= task.computation_time
+            if done:
+                completed.append(i)
+            else:
+                incomplete.append(task)
+
+        tat_list = [finish[i] - tasks[i].offset for i in completed]
+        wt_list = [waiting[i] for i in completed]
+        if completed:
+            most_wt = tasks[max(completed, key=waiting.__getitem__)].id
+            least_wt = tasks[min(completed, key=waiting.__getitem__)].id
+            computation = sum(tasks[i].computation_time for i in completed)
+
+    if verbose:
+        for task in incomplete:
             print(f"\n[AVISO] Tarefa T{task.id} não completou sua execução e será desconsiderada nas métricas.")
 
-    if not completed_tasks:
+    if not tat_list:
         return {
             "TAT_avg_system": 0,
             "WT_avg_system": 0,
@@ -321,47 +165,55 @@ def calculate_metrics(tasks: List[Task]):
             "CPU_utilization": 0
         }
 
-    tat_list = [task.finish_time - task.offset for task in completed_tasks]
-    wt_list = [task.waiting_time for task in completed_tasks]
-
     return {
         "TAT_avg_system": sum(tat_list) / len(tat_list),
         "WT_avg_system": sum(wt_list) / len(wt_list),
         "TAT_per_task": tat_list,
         "WT_per_task": wt_list,
-        "Most_Waiting_Task": max(completed_tasks, key=lambda t: t.waiting_time).id,
-        "Least_Waiting_Task": min(completed_tasks, key=lambda t: t.waiting_time).id,
-        "CPU_utilization": sum(t.computation_time for t in completed_tasks) / sim_time
+        "Most_Waiting_Task": most_wt,
+        "Least_Waiting_Task": least_wt,
+        "CPU_utilization": computation / sim_time
     }
 
-def calculate_metrics_realtime(instances: List[Task]):
-    grouped = defaultdict(list)
+def realtime_totals(jobs: JobTable):
+    """(totais por tarefa, tempo total, ids das tarefas com jobs) de uma execução RM/EDF."""
+    if jobs.extrapolation:
+        totals = jobs.extrapolation.totals
+        total_time = jobs.extrapolation.total_time
+        all_task_ids = set(tid for tid, count in jobs.extrapolation.releases.items() if count)
+    else:
+        totals, total_time = jobs.completion_totals()
+        if columnar.enabled(len(jobs)):
+            all_task_ids = columnar.task_ids(jobs)
+        else:
+            all_task_ids = set(jobs.task_id(j) for j in jobs)
+    return totals, total_time, all_task_ids
+
 
-    for inst in instances:
-        if inst.finish_time is not None:
-            grouped[inst.id].append(inst)
+def calculate_metrics_realtime(jobs: JobTable, verbose: bool = True):
+    return metrics_from_totals(*realtime_totals(jobs), verbose=verbose)
 
-    all_task_ids = set(inst.id for inst in instances)
-    completed_task_ids = set(grouped.keys())
-    incomplete_ids = all_task_ids - completed_task_ids
 
-    for tid in sorted(incomplete_ids):
-        print(f"\n[AVISO] Tarefa T{tid} não completou nenhuma instância e será desconsiderada nas métricas.")
+def metrics_from_totals(totals, total_time, all_task_ids, verbose: bool = True, cores: int = 1):
+    """Métricas de calculate_metrics_realtime a partir dos totais por tarefa.
 
-    tat_all = []
-    wt_all = []
-    tat_avg_per_task = {}
-    wt_avg_per_task = {}
+    Com cores > 1 a utilização é dividida pela capacidade de todos os núcleos.
+    """
+    incomplete_ids = all_task_ids - set(totals)
 
-    for tid, inst_list in grouped.items():
-        tats = [inst.finish_time - inst.offset for inst in inst_list]
-        wts = [inst.finish_time - inst.offset - inst.computation_time for inst in inst_list]
-        tat_avg_per_task[tid] = sum(tats) / len(tats)
-        wt_avg_per_task[tid] = sum(wts) / len(wts)
-        tat_all.extend(tats)
-        wt_all.extend(wts)
+    if verbose:
+        for tid in sorted(incomplete_ids):
+            print(f"\n[AVISO] Tarefa T{tid} não completou nenhuma instância e será desconsiderada nas métricas.")
 
-    if not tat_all:
+    completed_count = {tid: entry[0] for tid, entry in totals.items()}
+    tat_sum = {tid: entry[1] for tid, entry in totals.items()}
+    wt_sum = {tid: entry[2] for tid, entry in totals.items()}
+    total_computation = sum(entry[3] for entry in totals.values())
+    tat_avg_per_task = {tid: tat_sum[tid] / n for tid, n in completed_count.items()}
+    wt_avg_per_task = {tid: wt_sum[tid] / n for tid, n in completed_count.items()}
+    completed_jobs = sum(completed_count.values())
+
+    if not completed_jobs:
         return {
             "TAT_avg_system": 0,
             "WT_avg_system": 0,
@@ -374,189 +226,343 @@ def calculate_metrics_realtime(instances: List[Task]):
 
     most_wt = max(wt_avg_per_task.items(), key=lambda x: x[1])[0]
     least_wt = min(wt_avg_per_task.items(), key=lambda x: x[1])[0]
-    total_computation = sum(inst.computation_time for insts in grouped.values() for inst in insts)
-    total_time = max(inst.finish_time for insts in grouped.values() for inst in insts)
 
     return {
-        "TAT_avg_system": sum(tat_all) / len(tat_all),
-        "WT_avg_system": sum(wt_all) / len(wt_all),
+        "TAT_avg_system": sum(tat_sum.values()) / completed_jobs,
+        "WT_avg_system": sum(wt_sum.values()) / completed_jobs,
         "TAT_avg_per_task": tat_avg_per_task,
         "WT_avg_per_task": wt_avg_per_task,
         "Most_Waiting_Task": most_wt,
         "Least_Waiting_Task": least_wt,
-        "CPU_utilization": total_computation / total_time
+        "CPU_utilization": total_computation / (total_time * cores)
     }
 
 
-def print_timeline_simple(tasks: List[Task], sim_time):
-    print(f"\nTimeline ({scheduler}):")
-    for task in tasks:
-        line = ['_'] * sim_time
-        start = task.finish_time - task.computation_time
-        for i in range(start, min(task.finish_time, sim_time)):
-            if i >= 0:
-                line[i] = '#'
-        print(f"T{task.id}: {''.join(line)}")
-
-def print_timeline_preemptive(tasks: List[Task], sim_time):
-    print(f"\nTimeline ({scheduler}):")
-    for task in tasks:
-        line = ['_'] * sim_time
-        for start, end in getattr(task, 'executions', []):
-            for i in range(start, min(end, sim_time)):
-                if i >= 0:
-                    line[i] = '#'
-        print(f"T{task.id}: {''.join(line)}")
+def _timeline_line(executions, sim_time):
+    line = ['_'] * sim_time
+    for start, end in executions:
+        line[start:end] = '#' * (end - start)
+    return ''.join(line)
 
-def print_timeline_realtime(tasks: List[Task], sim_time):
-    from collections import defaultdict
+def print_timeline_simple(tasks: List[Task], sequence: ExecutionTrace, sim_time):
+    # Com o trace por intervalos, não-preemptivo e preemptivo se desenham igual
+    print_timeline_preemptive(tasks, sequence, sim_time)
 
+def print_timeline_preemptive(tasks: List[Task], sequence: ExecutionTrace, sim_time):
     print(f"\nTimeline ({scheduler}):")
-    lines = defaultdict(lambda: ['_'] * sim_time)
-
+    executions = sequence.executions_by_task(0, sim_time)
     for task in tasks:
-        tid = f"T{task.id}"
-        for start, end in getattr(task, 'executions', []):
-            for i in range(start, min(end, sim_time)):
-                lines[tid][i] = '#'
+        print(f"T{task.id}: {_timeline_line(executions.get(task.id, []), sim_time)}")
+
+def print_timeline_realtime(sequence: ExecutionTrace, sim_time):
+    print(f"\nTimeline ({scheduler}):")
+    lines = {f"T{tid}": _timeline_line(executions, sim_time)
+             for tid, executions in sequence.executions_by_task(0, sim_time).items()}
 
     for tid in sorted(lines):
-        print(f"{tid}: {''.join(lines[tid])}")
+        print(f"{tid}: {lines[tid]}")
 
-def detect_starvation(instances: List[Task], starvation_threshold: float = 0.8):
-    starved = []
-    for instance in instances:
-        if instance.finish_time is None:
+def _starved_jobs(jobs: JobTable, starvation_threshold: float):
+    for j in jobs:
+        if not jobs.completed[j]:
             continue
+        turnaround = jobs.finish[j] - jobs.release[j]
+        waiting = turnaround - jobs.computation_time(j)
+        if turnaround > 0 and waiting / turnaround > starvation_threshold:
+            yield jobs.task_id(j), jobs.release[j], turnaround, waiting
 
-        turnaround = instance.finish_time - instance.offset
-        waiting = turnaround - instance.computation_time
 
-        if turnaround > 0:
-            wait_ratio = waiting / turnaround
-            if wait_ratio > starvation_threshold:
-                starved.append({
-                    "task_id": instance.id,
-                    "offset": instance.offset,
-                    "wait_ratio": round(wait_ratio, 2),
-                    "waiting_time": waiting,
-                    "turnaround": turnaround
-                })
-    return starved
+def detect_starvation(jobs: JobTable, starvation_threshold: float = 0.8):
+    if columnar.enabled(len(jobs)):
+        candidates = columnar.starved_jobs(jobs, starvation_threshold)
+    else:
+        candidates = _starved_jobs(jobs, starvation_threshold)
+    return [{
+        "task_id": task_id,
+        "offset": release,
+        "wait_ratio": round(waiting / turnaround, 2),
+        "waiting_time": waiting,
+        "turnaround": turnaround
+    } for task_id, release, turnaround, waiting in candidates]
 
 
 
 from typing import List
 
-def detect_priority_inversion(tasks: List[Task], sequence: List[int], sim_time: int, scheduler: str = "EDF"):
+def _higher_priority(pending, limit, done):
+    """Jobs do heap pending com prioridade < limit, podando subárvores do heap."""
+    stack = [0] if pending else []
+    while stack:
+        i = stack.pop()
+        priority, j = pending[i]
+        if priority >= limit:
+            continue
+        if not done[j]:
+            yield j
+        stack.extend(child for child in (2 * i + 1, 2 * i + 2) if child < len(pending))
+
+
+def detect_priority_inversion(jobs: JobTable, sequence: ExecutionTrace, sim_time: int, scheduler: str = "EDF"):
+    """Intervalos em que um job executa enquanto outro, de tarefa mais prioritária, espera.
+
+    Varre só os instantes de evento (liberações, conclusões e fatias do
+    trace): um job está pendente de sua liberação até seu término (ou até o
+    fim do trace, se não terminou). Cada inversão sai como um intervalo
+    [inicio, fim) com os jobs e as tarefas envolvidos, em ordem de início.
+    """
     if scheduler not in ["RM", "EDF"]:
         print("Detecção de inversão só implementada para RM e EDF.")
         return []
 
+    if scheduler == "EDF":
+        get_priority = jobs.deadline.__getitem__
+    else:
+        get_priority = lambda j: jobs.task(j).period_time
+
+    horizon = min(sim_time, sequence.end_time)
+    releases = sorted(range(jobs.size), key=jobs.release.__getitem__)
+    finishes = sorted((jobs.finish[j], j) for j in range(jobs.size) if jobs.completed[j])
+    starts, ends, task_ids, running_jobs = sequence.starts, sequence.ends, sequence.task_ids, sequence.jobs
+    times = sorted({t for t in starts if t < horizon}
+                   | {jobs.release[j] for j in releases if jobs.release[j] < horizon}
+                   | {finish for finish, _ in finishes if finish < horizon})
+
+    pending = []
+    done = bytearray(jobs.size)
+    open_intervals = {}
     inversions = []
+    r = f = s = 0
+
+    def close(key, end):
+        running, blocked = key
+        inversions.append({
+            "inicio": open_intervals.pop(key),
+            "fim": end,
+            "executando": jobs.task_id(running),
+            "bloqueada": jobs.task_id(blocked),
+            "job_executando": running,
+            "job_bloqueado": blocked,
+            "prioridade_exec": get_priority(running),
+            "prioridade_bloq": get_priority(blocked)
+        })
+
+    for t in times:
+        while f < len(finishes) and finishes[f][0] <= t:
+            done[finishes[f][1]] = 1
+            f += 1
+        while r < len(releases) and jobs.release[releases[r]] <= t:
+            j = releases[r]
+            if not done[j]:
+                heapq.heappush(pending, (get_priority(j), j))
+            r += 1
+        while pending and done[pending[0][1]]:
+            heapq.heappop(pending)
+        while s < len(starts) and ends[s] <= t:
+            s += 1
+
+        blocked = ()
+        running = IDLE
+        if s < len(starts) and starts[s] <= t and task_ids[s] != IDLE:
+            running = running_jobs[s]
+            task_index = jobs.task_index[running]
+            blocked = {j for j in _higher_priority(pending, get_priority(running), done)
+                       if jobs.task_index[j] != task_index}
+
+        for key in [key for key in open_intervals if key[0] != running or key[1] not in blocked]:
+            close(key, t)
+        for j in blocked:
+            open_intervals.setdefault((running, j), t)
+
+    for key in list(open_intervals):
+        close(key, horizon)
+    inversions.sort(key=lambda inv: (inv["inicio"], inv["fim"]))
+    return inversions
 
-    get_priority = (lambda t: t.deadline) if scheduler == "EDF" else (lambda t: t.period_time)
-
-    for t in range(sim_time):
-        running_id = sequence[t] if sequence[t] != "idle" else None
-        running_priority = None
-
-        ready = [
-            task for task in tasks
-            if task.offset <= t < task.offset + task.deadline and task.remaining_time > 0
-        ]
-
-        if running_id is not None:
-            running_tasks = [task for task in ready if task.id == running_id]
-            if running_tasks:
-                running_priority = get_priority(running_tasks[0])
-                if running_priority is None:
-                    running_priority = None
-
-        for task in ready:
-            if running_id is not None and task.id != running_id:
-                task_priority = get_priority(task)
-
-                if task_priority is not None and running_priority is not None:
-                    if task_priority < running_priority:
-                        inversions.append({
-                            "tempo": t,
-                            "executando": running_id,
-                            "bloqueada": task.id,
-                            "prioridade_exec": running_priority,
-                            "prioridade_bloq": task_priority
-                        })
 
-    return inversions
+def missed_deadlines(jobs: JobTable):
+    """(task_id, release, deadline, finish) de cada job concluído após o deadline, na ordem de conclusão."""
+    if columnar.enabled(len(jobs)):
+        return columnar.missed_jobs(jobs)
+    return ((jobs.task_id(j), jobs.release[j], jobs.deadline[j], jobs.finish[j]) for j in jobs if jobs.missed(j))
 
 
-def report_deadlines_missed(instances: List[Task]):
+def report_deadlines_missed(jobs: JobTable):
     print("\nInstâncias que perderam deadlines:")
     any_missed = False
-    for task in instances:
-        if task.finish_time is not None and task.finish_time > task.deadline:
-            delay = task.finish_time - task.deadline
-            print(f"- Tarefa T{task.id} (instância com offset {task.offset}): deadline perdido por {delay} unidades de tempo (deadline = {task.deadline}, término = {task.finish_time})")
-            any_missed = True
+    for task_id, release, deadline, finish in missed_deadlines(jobs):
+        print(f"- Tarefa T{task_id} (instância com offset {release}): deadline perdido por {finish - deadline} unidades de tempo (deadline = {deadline}, término = {finish})")
+        any_missed = True
     if not any_missed:
         print("Nenhuma instância perdeu o deadline.")
+    if jobs.extrapolation:
+        print(f"(listagem limitada ao trecho simulado, até t={jobs.extrapolation.simulated_until})")
+
+
+def report_schedulability(results):
+    print("\nAnálise de escalonabilidade:")
+    for result in results:
+        if result["schedulable"] is None:
+            verdict = "inconclusivo"
+        else:
+            verdict = "escalonável" if result["schedulable"] else "NÃO escalonável"
+        print(f"- {result['test']}: {verdict}")
+        for t in result["tasks"]:
+            if t["wcrt"] is not None:
+                if t["schedulable"] is None:
+                    status = "pode perder o deadline (limite superior: período repetido)"
+                else:
+                    status = "ok" if t["schedulable"] else "perde deadline"
+                print(f"    T{t['task_id']}: pior tempo de resposta = {t['wcrt']} (deadline = {t['deadline']}) -> {status}")
+
+
+DEFAULT_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "package.json")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Simula um conjunto de tarefas e relata as métricas.")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT,
+                        help="arquivo JSON de entrada (padrão: package.json ao lado do script)")
+    parser.add_argument("-s", "--scheduler", choices=list(SIMULATORS), help="substitui o scheduler_name do arquivo")
+    parser.add_argument("--hyperperiod", action="store_true",
+                        help="RM/EDF simulam só até o regime periódico e extrapolam o resto")
+    parser.add_argument("--percentiles", action="store_true",
+                        help="agrega p50/p99/p99.9 de resposta e espera durante a simulação")
+    parser.add_argument("--schedulability", action="store_true",
+                        help="RM/EDF respondem só se o conjunto é escalonável, sem simular")
+    parser.add_argument("--timeline", action="store_true", help="imprime as timelines ASCII")
+    parser.add_argument("--sequence", action="store_true", help="imprime a sequência de execução completa")
+    parser.add_argument("--profile", action="store_true",
+                        help="relata decisões/s, fila de prontos, tempo por fase e trocas de contexto por tarefa")
+    plot = parser.add_mutually_exclusive_group()
+    plot.add_argument("--no-plot", action="store_true", help="não desenha o gráfico de Gantt")
+    plot.add_argument("--plot-file", help="grava o gráfico de Gantt (PNG/SVG...) em vez de abrir uma janela")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("-q", "--quiet", action="store_true", help="não imprime nada")
+    output.add_argument("--json", action="store_true", help="imprime um único documento JSON com os resultados")
+    return parser
 
 
 if __name__ == "__main__":
-    sim_time, scheduler, tasks = read_tasks_from_json("simulador_v2\\package.json")
-    from graphs import plot_gantt_chart, plot_gantt_chart_realtime
-    if scheduler == "FCFS":
-        sequence, executed_tasks = simulate_fcfs(sim_time, tasks)
-        metrics = calculate_metrics(tasks)
-        plot_gantt_chart(executed_tasks, sim_time)
-    elif scheduler == "SJF":
-        sequence, executed_tasks = simulate_sjf(sim_time, tasks)
-        metrics = calculate_metrics(tasks)
-        plot_gantt_chart(executed_tasks, sim_time)
-    elif scheduler == "RR":
-        sequence, executed_tasks = simulate_rr(sim_time, tasks)
-        metrics = calculate_metrics(tasks)
-        plot_gantt_chart(tasks, sim_time)
-    elif scheduler == "SRTF":
-        sequence, executed_tasks = simulate_srtf(sim_time, tasks)
-        metrics = calculate_metrics(tasks)
-        plot_gantt_chart(executed_tasks, sim_time)
-    elif scheduler == "RM":
-        sequence, executed_tasks = simulate_rm(sim_time, tasks)
-        metrics = calculate_metrics_realtime(executed_tasks)
-        report_deadlines_missed(executed_tasks)
-        plot_gantt_chart_realtime(executed_tasks, sim_time)
-    elif scheduler == "EDF":
-        sequence, executed_tasks = simulate_edf(sim_time, tasks)
-        metrics = calculate_metrics_realtime(executed_tasks)
-        report_deadlines_missed(executed_tasks)
-        plot_gantt_chart_realtime(executed_tasks, sim_time)
+    args = build_parser().parse_args()
+    # Relatórios em texto só sem --quiet/--json
+    text = not (args.quiet or args.json)
+    scenario = load_scenario(args.input)
+    sim_time, tasks = scenario.simulation_time, scenario.columns.tasks(Task)
+    scheduler = args.scheduler or scenario.scheduler
+    extrapolate = args.hyperperiod
+    online = OnlineMetrics() if args.percentiles and not extrapolate else None
+    probe = None
+    if args.profile and not extrapolate:
+        from instrumentation import Probe, print_profile
+        probe = Probe()
+
+    if args.schedulability and scheduler in REALTIME_SCHEDULERS:
+        results = analyze(tasks, scheduler)
+        if args.json:
+            # Tempo de resposta ilimitado vira "inf" (Infinity não é JSON válido)
+            for result in results:
+                for t in result["tasks"]:
+                    if t["wcrt"] == float("inf"):
+                        t["wcrt"] = "inf"
+            print(json.dumps(results, allow_nan=False))
+        elif text:
+            report_schedulability(results)
+        sys.exit()
+
+    # "cores" > 1 no JSON: RM/EDF particionado ou global (ver multicore.py)
+    if scenario.options.get("cores", 1) != 1 and scheduler in REALTIME_SCHEDULERS:
+        from multicore import print_multicore_report, read_platform, run_multicore
+        cores, mode, heuristic = read_platform(scenario.options)
+        report = run_multicore(sim_time, tasks, scheduler, cores, mode, heuristic, extrapolate)
+        if args.json:
+            print(json.dumps(report))
+        elif text:
+            print_multicore_report(report)
+        sys.exit()
+
+    if scheduler not in SIMULATORS:
+        print("Algoritmo não implementado.", file=sys.stderr)
+        sys.exit(1)
+
+    realtime = scheduler in REALTIME_SCHEDULERS
+    if realtime:
+        sequence, jobs = SIMULATORS[scheduler](sim_time, tasks, extrapolate, online, probe)
+        if args.timeline and not args.json:
+            print_timeline_realtime(sequence, min(sim_time, sequence.end_time))
+        if text:
+            print_deadline_summary(jobs, scheduler)
+        with probe.phase("metrics") if probe else nullcontext():
+            metrics = calculate_metrics_realtime(jobs, verbose=text)
+        if text:
+            report_deadlines_missed(jobs)
     else:
-        print("Algoritmo não implementado.")
-        exit()
-
-    print("\nSequência de Execução:")
-    print(sequence)
-
-    print("\nMétricas:")
-    for k, v in metrics.items():
-        print(f"{k}: {v}")
-
-    if scheduler in ["RM", "EDF"]:
-        starved = detect_starvation(executed_tasks)
-        if starved:
-            print("\nInstâncias com starvation detectado:")
-            for s in starved:
-                print(f"T{s['task_id']} (offset {s['offset']}): espera = {s['waiting_time']}, TAT = {s['turnaround']}, WT/TAT = {s['wait_ratio']}")
-        else:
-            print("\nNenhuma instância com starvation.")
+        sequence, state = SIMULATORS[scheduler](sim_time, tasks, online, probe)
+        if args.timeline and not args.json:
+            if scheduler in ["FCFS", "SJF"]:
+                print_timeline_simple(tasks, sequence, sim_time)
+            else:
+                print_timeline_preemptive(tasks, sequence, sim_time)
+        with probe.phase("metrics") if probe else nullcontext():
+            metrics = calculate_metrics(state, sequence, sim_time, verbose=text)
+
+    if realtime:
+        with probe.phase("analysis") if probe else nullcontext():
+            starved = detect_starvation(jobs)
+            inversions = detect_priority_inversion(jobs, sequence, sim_time, scheduler)
+
+    if args.json:
+        result = {"scheduler": scheduler, "simulation_time": sim_time, "metrics": metrics}
+        if realtime:
+            result["deadlines"] = deadline_summary(jobs)
+            result["starvation"] = starved
+            result["inversions"] = inversions
+            if jobs.extrapolation:
+                result["extrapolation"] = jobs.extrapolation.describe()
+        if online:
+            result["percentiles"] = online.summary()
+        if probe:
+            result["profile"] = probe.summary()
+        if args.sequence:
+            result["sequence"] = sequence.to_list()
+        print(json.dumps(result))
+    elif text:
+        if args.sequence:
+            print("\nSequência de Execução:")
+            print(sequence.to_list())
+
+        print("\nMétricas:")
+        for k, v in metrics.items():
+            print(f"{k}: {v}")
+
+        if online:
+            print_percentiles(online)
+
+        if realtime and jobs.extrapolation:
+            print(f"\n[INFO] {jobs.extrapolation.describe()}")
+
+        if realtime:
+            if starved:
+                print("\nInstâncias com starvation detectado:")
+                for s in starved:
+                    print(f"T{s['task_id']} (offset {s['offset']}): espera = {s['waiting_time']}, TAT = {s['turnaround']}, WT/TAT = {s['wait_ratio']}")
+            else:
+                print("\nNenhuma instância com starvation.")
+
+            if inversions:
+                print("\nInversões de prioridade detectadas:")
+                for inv in inversions:
+                    print(f"[{inv['inicio']}, {inv['fim']}): T{inv['bloqueada']} (mais prioritária) bloqueada por T{inv['executando']}")
+            else:
+                print("\nNenhuma inversão de prioridade detectada.")
 
+        if probe:
+            print_profile(probe)
 
-    if scheduler in ["RM", "EDF"]:
-        inversions = detect_priority_inversion(executed_tasks, sequence, sim_time, scheduler)
-        if inversions:
-            print("\nInversões de prioridade detectadas:")
-            for inv in inversions:
-                print(f"Tempo {inv['tempo']}: T{inv['bloqueada']} (mais prioritária) bloqueada por T{inv['executando']}")
+    # matplotlib só é importado quando há gráfico a desenhar
+    if not args.no_plot:
+        from graphs import plot_gantt_chart, plot_gantt_chart_realtime
+        if realtime:
+            plot_gantt_chart_realtime(jobs, sequence, sim_time, output=args.plot_file)
         else:
-            print("\nNenhuma inversão de prioridade detectada.")
\ No newline at end of file
+            plot_gantt_chart(tasks if scheduler == "RR" else state.completed_tasks(), sequence, sim_time,
+                             output=args.plot_file)
@@ -0,0 +1,360 @@
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from aperiodic_engine import SRTFSimulation
+from job_table import first_release, task_releases
+from main import Task
+from periodic_engine import PRIORITIES, PeriodicSimulation
+from task_loader import load_scenario
+
+SCHEDULERS = ("RM", "EDF", "SRTF")
+DISTRIBUTIONS = ("uniform", "normal", "empirical")
+PERCENTILES = (50, 95, 99)
+DEFAULT_BLOCK = 64
+# Rejeições seguidas da normal truncada antes de desistir da faixa pedida
+MAX_REJECTION_ROUNDS = 1000
+
+
+class ExecutionTime:
+    """Distribuição do tempo de execução de uma tarefa, em unidades inteiras.
+
+    kind é "fixed" (sempre computation_time), "uniform" (inteiros em
+    [low, high]), "normal" (normal arredondada e truncada em [low, high]) ou
+    "empirical" (values com probabilidades proporcionais a weights).
+    """
+
+    __slots__ = ("kind", "low", "high", "mean", "std", "values", "weights")
+
+    def __init__(self, kind: str, low: int, high: int, mean: float = None, std: float = None,
+                 values=None, weights=None):
+        self.kind = kind
+        self.low = low
+        self.high = high
+        self.mean = mean
+        self.std = std
+        self.values = values
+        self.weights = weights
+
+    def sample(self, rng, shape):
+        """Array int64 de amostras com o formato shape."""
+        if self.kind == "fixed":
+            return np.full(shape, self.low, dtype=np.int64)
+        if self.kind == "uniform":
+            return rng.integers(self.low, self.high + 1, size=shape, dtype=np.int64)
+        if self.kind == "empirical":
+            return rng.choice(np.asarray(self.values, dtype=np.int64), size=shape, p=self.weights)
+        samples = np.rint(rng.normal(self.mean, self.std, size=shape)).astype(np.int64)
+        for _ in range(MAX_REJECTION_ROUNDS):
+            rejected = (samples < self.low) | (samples > self.high)
+            count = int(rejected.sum())
+            if not count:
+                return samples
+            samples[rejected] = np.rint(rng.normal(self.mean, self.std, size=count)).astype(np.int64)
+        raise ValueError(f"Normal(mean={self.mean}, std={self.std}) raramente cai em [{self.low}, {self.high}].")
+
+
+def _positive_int(value, name: str, i: int):
+    if type(value) is not int or value <= 0:
+        raise ValueError(f"Erro na task {i}: {name} deve ser um inteiro positivo ({value!r})")
+    return value
+
+
+def parse_execution_time(spec, computation_time: int, i: int):
+    """ExecutionTime do campo "execution_time" da tarefa i (None = fixo em computation_time).
+
+    Formatos aceitos (min e max inteiros, por padrão 1 e computation_time):
+      {"distribution": "uniform", "min": 2, "max": 5}
+      {"distribution": "normal", "mean": 3.5, "std": 1, "min": 1, "max": 6}
+      {"distribution": "empirical", "values": [2, 3, 6], "weights": [0.7, 0.2, 0.1]}
+    """
+    if spec is None:
+        return ExecutionTime("fixed", computation_time, computation_time)
+    if not isinstance(spec, dict) or spec.get("distribution") not in DISTRIBUTIONS:
+        raise ValueError(f"Erro na task {i}: execution_time.distribution deve ser um de {', '.join(DISTRIBUTIONS)}")
+    kind = spec["distribution"]
+    if kind == "empirical":
+        values = spec.get("values")
+        if not isinstance(values, list) or not values:
+            raise ValueError(f"Erro na task {i}: execution_time.values vazio")
+        values = [_positive_int(v, "execution_time.values", i) for v in values]
+        weights = spec.get("weights") or [1] * len(values)
+        if (len(weights) != len(values) or any(not isinstance(w, (int, float)) or w < 0 for w in weights)
+                or not sum(weights)):
+            raise ValueError(f"Erro na task {i}: execution_time.weights inválido")
+        total = sum(weights)
+        return ExecutionTime(kind, min(values), max(values), values=values, weights=[w / total for w in weights])
+
+    low = _positive_int(spec.get("min", 1), "execution_time.min", i)
+    high = _positive_int(spec.get("max", computation_time), "execution_time.max", i)
+    if low > high:
+        raise ValueError(f"Erro na task {i}: execution_time.min > execution_time.max ({low} > {high})")
+    if kind == "uniform":
+        return ExecutionTime(kind, low, high)
+    mean, std = spec.get("mean"), spec.get("std")
+    if not isinstance(mean, (int, float)) or not isinstance(std, (int, float)) or std < 0:
+        raise ValueError(f"Erro na task {i}: execution_time.normal precisa de mean e std >= 0")
+    return ExecutionTime(kind, low, high, mean=mean, std=std)
+
+
+def read_model(file_path: str):
+    """(simulation_time, scheduler_name, tarefas, distribuições) de um arquivo de entrada.
+
+    As distribuições vêm do campo opcional "execution_time" de cada tarefa
+    (ver parse_execution_time); as demais tarefas ficam fixas no WCET.
+    """
+    scenario = load_scenario(file_path, extra=("execution_time",))
+    tasks = scenario.columns.tasks(Task)
+    distributions = [parse_execution_time(spec, task.computation_time, i)
+                     for i, (spec, task) in enumerate(zip(scenario.columns.extra["execution_time"], tasks))]
+    return scenario.simulation_time, scenario.scheduler, tasks, distributions
+
+
+def known_deadlines(task, sim_time: int, periodic: bool = True):
+    """Jobs da tarefa com deadline <= sim_time, cujo resultado (cumprido ou não) já é conhecido."""
+    if not periodic:
+        return int(task.offset + task.deadline <= sim_time)
+    first = first_release(task)
+    if first + task.deadline > sim_time:
+        return 0
+    return (sim_time - task.deadline - first) // task.period_time + 1
+
+
+class _Outcomes:
+    """Observador (interface de OnlineMetrics) que guarda o tempo de resposta e os deadlines cumpridos."""
+
+    def __init__(self, tasks, sim_time: int):
+        self.index = {task.id: i for i, task in enumerate(tasks)}
+        self.sim_time = sim_time
+        self.responses = [[] for _ in tasks]
+        self.met = [0] * len(tasks)
+
+    def job_released(self, task_id):
+        pass
+
+    def job_completed(self, task_id, release, finish, computation, deadline):
+        i = self.index[task_id]
+        self.responses[i].append(finish - release)
+        if deadline <= self.sim_time and finish <= deadline:
+            self.met[i] += 1
+
+
+def _replicate(tasks, scheduler: str, sim_time: int, demands):
+    """_Outcomes de uma replicação; demands[i] é a lista de demandas dos jobs da tarefa i."""
+    outcomes = _Outcomes(tasks, sim_time)
+    if scheduler == "SRTF":
+        run_tasks = [Task(t.id, t.offset, demand[0], t.period_time, t.quantum, t.deadline)
+                     for t, demand in zip(tasks, demands)]
+        sim = SRTFSimulation(run_tasks, record=False)
+        sim.advance(sim_time)
+        _, state = sim.close()
+        for i in state.executed:
+            task = run_tasks[i]
+            outcomes.job_completed(task.id, task.offset, state.finish[i], task.computation_time,
+                                   task.offset + task.deadline)
+        return outcomes
+    iterators = [iter(demand) for demand in demands]
+    sim = PeriodicSimulation(tasks, PRIORITIES[scheduler], metrics=outcomes, record=False,
+                             execution_time=lambda i: next(iterators[i]))
+    sim.advance(sim_time)
+    return outcomes
+
+
+def statistic_names(tasks):
+    """Nomes das colunas de run_block: razão de perdas do sistema, e por tarefa perdas e percentis."""
+    names = ["miss_ratio"]
+    for task in tasks:
+        names.append(f"T{task.id}.miss_ratio")
+        names.extend(f"T{task.id}.response_p{p}" for p in PERCENTILES)
+    return names
+
+
+def run_block(spec, block: int, size: int):
+    """Matriz (size x estatísticas) das replicações do bloco block.
+
+    As demandas de todos os jobs do bloco são sorteadas de uma vez, por
+    tarefa, com um gerador semeado por (seed, block): o resultado não
+    depende de qual processo executa o bloco. Estatística sem amostra
+    (tarefa sem deadline conhecido ou sem job concluído) vale NaN.
+    """
+    tasks, distributions, scheduler, sim_time, seed = spec
+    periodic = scheduler != "SRTF"
+    rng = np.random.default_rng([seed, block])
+    samples = [distribution.sample(rng, (size, task_releases(task, sim_time) if periodic else 1))
+               for task, distribution in zip(tasks, distributions)]
+    known = np.array([known_deadlines(task, sim_time, periodic) for task in tasks], dtype=np.int64)
+    total_known = int(known.sum())
+
+    rows = np.full((size, len(statistic_names(tasks))), np.nan)
+    for r in range(size):
+        outcomes = _replicate(tasks, scheduler, sim_time, [sample[r].tolist() for sample in samples])
+        missed = known - np.array(outcomes.met, dtype=np.int64)
+        row = rows[r]
+        if total_known:
+            row[0] = missed.sum() / total_known
+        column = 1
+        for i, responses in enumerate(outcomes.responses):
+            if known[i]:
+                row[column] = missed[i] / known[i]
+            if responses:
+                row[column + 1:column + 1 + len(PERCENTILES)] = np.percentile(responses, PERCENTILES)
+            column += 1 + len(PERCENTILES)
+    return rows
+
+
+def confidence_intervals(rows, confidence: float):
+    """(média, meia largura) de cada coluna, ignorando NaN; meia largura NaN com menos de 2 amostras."""
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    counts = np.sum(~np.isnan(rows), axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nansum(rows, axis=0) / counts
+        deviations = np.where(np.isnan(rows), 0.0, rows - means)
+        variances = np.sum(deviations ** 2, axis=0) / (counts - 1)
+        half = np.where(counts > 1, z * np.sqrt(variances) / np.sqrt(counts), np.nan)
+    return means, half, counts
+
+
+def _converged(names, means, half, counts, precision: float, relative_precision: float):
+    for name, mean, width, count in zip(names, means, half, counts):
+        if not count:
+            continue
+        if count < 2:
+            return False
+        limit = precision if name.endswith("miss_ratio") else relative_precision * abs(mean)
+        if width > limit:
+            return False
+    return True
+
+
+def _blocks(spec, max_replications: int, block_size: int, workers: int):
+    """Resultados de run_block em ordem de bloco; com workers > 1, calculados em paralelo e adiantados."""
+    sizes = [min(block_size, max_replications - start) for start in range(0, max_replications, block_size)]
+    if workers <= 1:
+        for block, size in enumerate(sizes):
+            yield run_block(spec, block, size)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        submitted = 0
+        try:
+            for block in range(len(sizes)):
+                while submitted < len(sizes) and len(pending) < 2 * workers:
+                    pending[submitted] = pool.submit(run_block, spec, submitted, sizes[submitted])
+                    submitted += 1
+                yield pending.pop(block).result()
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+
+def simulate_montecarlo(sim_time: int, tasks, distributions, scheduler: str, seed: int = 0,
+                        max_replications: int = 10000, min_replications: int = 100,
+                        confidence: float = 0.95, precision: float = 0.01, relative_precision: float = 0.02,
+                        block_size: int = DEFAULT_BLOCK, workers: int = None):
+    """Replicações de RM/EDF/SRTF com tempos de execução sorteados de distributions.
+
+    Um job perde o deadline se não termina até ele; só contam os jobs com
+    deadline <= sim_time. Para cada estatística (razão de perdas do sistema
+    e, por tarefa, razão de perdas e percentis do tempo de resposta de cada
+    replicação) calcula o intervalo de confiança da média entre replicações.
+    Para, após pelo menos min_replications, assim que todas as meias
+    larguras ficam abaixo de precision (razões de perdas) ou de
+    relative_precision vezes a média (tempos de resposta).
+
+    Os blocos são avaliados em ordem e a parada é verificada ao fim de cada
+    um, então o resultado depende só de seed e block_size, não de workers.
+    """
+    if scheduler not in SCHEDULERS:
+        raise ValueError(f"Monte Carlo só está disponível para {', '.join(SCHEDULERS)}.")
+    workers = workers or os.cpu_count() or 1
+    spec = (tasks, distributions, scheduler, sim_time, seed)
+    names = statistic_names(tasks)
+
+    blocks = []
+    replications = 0
+    converged = False
+    for rows in _blocks(spec, max_replications, block_size, workers):
+        blocks.append(rows)
+        replications += len(rows)
+        if replications >= min_replications:
+            means, half, counts = confidence_intervals(np.concatenate(blocks), confidence)
+            if _converged(names, means, half, counts, precision, relative_precision):
+                converged = True
+                break
+    means, half, counts = confidence_intervals(np.concatenate(blocks), confidence)
+
+    def interval(k):
+        if not counts[k]:
+            return None
+        width = 0.0 if math.isnan(half[k]) else float(half[k])
+        low, high = float(means[k]) - width, float(means[k]) + width
+        if names[k].endswith("miss_ratio"):
+            low, high = max(low, 0.0), min(high, 1.0)
+        return {"mean": float(means[k]), "low": low, "high": high}
+
+    per_task = {}
+    column = 1
+    for task in tasks:
+        entry = {"miss_ratio": interval(column)}
+        for k, p in enumerate(PERCENTILES, start=1):
+            entry[f"response_p{p}"] = interval(column + k)
+        per_task[task.id] = entry
+        column += 1 + len(PERCENTILES)
+    return {
+        "scheduler": scheduler,
+        "simulation_time": sim_time,
+        "replications": replications,
+        "converged": converged,
+        "confidence": confidence,
+        "miss_ratio": interval(0),
+        "tasks": per_task,
+    }
+
+
+def _format_interval(ci, digits: int):
+    if ci is None:
+        return "-"
+    return f"{ci['mean']:.{digits}f} [{ci['low']:.{digits}f}, {ci['high']:.{digits}f}]"
+
+
+def print_report(report):
+    status = "convergiu" if report["converged"] else "limite de replicações atingido"
+    print(f"\nMonte Carlo ({report['scheduler']}, {report['replications']} replicações, {status}, "
+          f"IC de {report['confidence']:.0%}):")
+    print(f"Razão de deadlines perdidos: {_format_interval(report['miss_ratio'], 4)}")
+    for tid, entry in report["tasks"].items():
+        percentiles = ", ".join(f"p{p} {_format_interval(entry[f'response_p{p}'], 1)}" for p in PERCENTILES)
+        print(f"T{tid}: perdas {_format_interval(entry['miss_ratio'], 4)}; resposta {percentiles}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probabilidade de perda de deadline com tempos de execução aleatórios.")
+    parser.add_argument("input", help="arquivo JSON de entrada; cada tarefa pode ter o campo execution_time")
+    parser.add_argument("-s", "--scheduler", choices=SCHEDULERS, help="substitui o scheduler_name do arquivo")
+    parser.add_argument("--until", type=int, default=None, help="horizonte (padrão: simulation_time do arquivo)")
+    parser.add_argument("--replications", type=int, default=10000, help="máximo de replicações")
+    parser.add_argument("--min-replications", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--precision", type=float, default=0.01,
+                        help="meia largura máxima do IC das razões de perdas")
+    parser.add_argument("--relative-precision", type=float, default=0.02,
+                        help="meia largura máxima do IC dos tempos de resposta, relativa à média")
+    parser.add_argument("--block", type=int, default=DEFAULT_BLOCK, help="replicações por unidade de trabalho")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    args = parser.parse_args()
+
+    sim_time, scheduler, tasks, distributions = read_model(args.input)
+    report = simulate_montecarlo(args.until or sim_time, tasks, distributions, args.scheduler or scheduler,
+                                 args.seed, args.replications, args.min_replications, args.confidence,
+                                 args.precision, args.relative_precision, args.block, args.workers)
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from job_table import count_releases, task_releases
+from main import REALTIME_SCHEDULERS, SIMULATORS, Task, deadline_summary, metrics_from_totals, realtime_totals
+from periodic_engine import PRIORITIES, GlobalSimulation
+from task_loader import load_scenario
+
+MODES = ["partitioned", "global"]
+HEURISTICS = ["FFD", "WFD"]
+
+
+def read_platform(options):
+    """(cores, modo, heurística) do cabeçalho do cenário (Scenario.options).
+
+    Campos opcionais: "cores" (padrão 1), "multiprocessor" ("partitioned"
+    ou "global", padrão "partitioned") e "partitioning" ("FFD" ou "WFD",
+    padrão "FFD").
+    """
+    cores = options.get("cores", 1)
+    mode = options.get("multiprocessor", "partitioned")
+    heuristic = options.get("partitioning", "FFD")
+    if not isinstance(cores, int) or cores < 1:
+        raise ValueError(f"Número de núcleos inválido: {cores}")
+    if mode not in MODES:
+        raise ValueError(f"Modo multiprocessado desconhecido: {mode}")
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Heurística de particionamento desconhecida: {heuristic}")
+    return cores, mode, heuristic
+
+
+def _density(task):
+    return task.computation_time / min(task.deadline, task.period_time)
+
+
+def partition(tasks, cores: int, scheduler: str, heuristic: str = "FFD"):
+    """Distribui as tarefas entre os núcleos por densidade decrescente.
+
+    Um núcleo aceita a tarefa se continuar passando no limitante do
+    escalonador: hiperbólico (prod(d + 1) <= 2) para RM, densidade total
+    <= 1 para EDF, como em schedulability.py. FFD usa o primeiro núcleo que
+    aceita; WFD, o menos carregado. Retorna (tarefas por núcleo, tarefas
+    que não couberam em nenhum).
+    """
+    if scheduler not in REALTIME_SCHEDULERS:
+        raise ValueError("Particionamento só implementado para RM e EDF.")
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Heurística de particionamento desconhecida: {heuristic}")
+    rm = scheduler == "RM"
+    # RM guarda o produto hiperbólico; EDF, a soma das densidades
+    loads = [1.0 if rm else 0.0] * cores
+    bins = [[] for _ in range(cores)]
+    unassigned = []
+
+    for task in sorted(tasks, key=_density, reverse=True):
+        d = _density(task)
+        fits = [c for c in range(cores) if (loads[c] * (d + 1) <= 2 if rm else loads[c] + d <= 1)]
+        if not fits:
+            unassigned.append(task)
+            continue
+        c = fits[0] if heuristic == "FFD" else min(fits, key=lambda c: loads[c])
+        loads[c] = loads[c] * (d + 1) if rm else loads[c] + d
+        bins[c].append(task)
+
+    # Dentro do núcleo as tarefas voltam à ordem do arquivo (desempate do simulador)
+    position = {id(task): i for i, task in enumerate(tasks)}
+    return [sorted(b, key=lambda task: position[id(task)]) for b in bins], unassigned
+
+
+def simulate_core(sim_time: int, tasks, scheduler: str, extrapolate: bool = False):
+    return SIMULATORS[scheduler](sim_time, tasks, extrapolate)
+
+
+def simulate_partitioned(sim_time: int, tasks, cores: int, scheduler: str, heuristic: str = "FFD",
+                         extrapolate: bool = False, workers: int = None):
+    """Particiona e simula cada núcleo de forma independente, em processos separados.
+
+    Retorna (lista de (sequence, jobs) por núcleo, tarefas não alocadas);
+    núcleos sem tarefas ficam com None.
+    """
+    bins, unassigned = partition(tasks, cores, scheduler, heuristic)
+    busy = [c for c in range(cores) if bins[c]]
+    results = [None] * cores
+    workers = min(workers or os.cpu_count() or 1, len(busy))
+    if workers <= 1:
+        for c in busy:
+            results[c] = simulate_core(sim_time, bins[c], scheduler, extrapolate)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {c: pool.submit(simulate_core, sim_time, bins[c], scheduler, extrapolate) for c in busy}
+            for c, future in futures.items():
+                results[c] = future.result()
+    return results, unassigned
+
+
+def simulate_global(sim_time: int, tasks, cores: int, scheduler: str):
+    """RM/EDF global.
+
+    Retorna (um trace por núcleo, jobs, núcleo de conclusão de cada job,
+    número de migrações).
+    """
+    if scheduler not in REALTIME_SCHEDULERS:
+        raise ValueError("Escalonamento global só implementado para RM e EDF.")
+    sim = GlobalSimulation(tasks, PRIORITIES[scheduler], cores, count_releases(tasks, sim_time))
+    sim.advance(sim_time)
+    sequences, jobs = sim.close()
+    return sequences, jobs, sim.core, sim.migrations
+
+
+def _unassigned_summary(tasks, sim_time: int):
+    """deadline_summary das tarefas sem núcleo: nenhum job executa, e todo deadline até sim_time é perdido."""
+    return {task.id: {"misses": task_releases(task, sim_time - task.deadline + 1),
+                      "total": task_releases(task, sim_time)} for task in tasks}
+
+
+def _deadline_stats(summaries):
+    misses = sum(data["misses"] for summary in summaries for data in summary.values())
+    total = sum(data["total"] for summary in summaries for data in summary.values())
+    return {"misses": misses, "total": total, "miss_ratio": misses / total if total else 0}
+
+
+def _merge_totals(parts):
+    """Junta (totais, tempo total, ids) de vários núcleos; o tempo total é o maior."""
+    totals, total_time, task_ids = {}, None, set()
+    for part_totals, part_time, part_ids in parts:
+        for tid, entry in part_totals.items():
+            merged = totals.setdefault(tid, [0, 0, 0, 0, 0])
+            for k, value in enumerate(entry):
+                merged[k] += value
+        if part_time is not None and (total_time is None or part_time > total_time):
+            total_time = part_time
+        task_ids |= part_ids
+    return totals, total_time, task_ids
+
+
+def run_multicore(sim_time: int, tasks, scheduler: str, cores: int, mode: str = "partitioned",
+                  heuristic: str = "FFD", extrapolate: bool = False, workers: int = None):
+    """Simula em `cores` núcleos e devolve métricas por núcleo e do sistema.
+
+    per_core e system têm o formato de calculate_metrics_realtime; a
+    utilização do sistema é relativa à capacidade de todos os núcleos. No
+    modo global, um job conta no núcleo em que concluiu. throughput é o
+    número de jobs concluídos por unidade de tempo. No particionado, as
+    tarefas que não couberam em nenhum núcleo são não escalonáveis: os
+    jobs delas entram em deadlines como perdidos (os com deadline até
+    sim_time).
+    """
+    report = {"scheduler": scheduler, "cores": cores, "mode": mode}
+    if mode == "partitioned":
+        results, unassigned = simulate_partitioned(sim_time, tasks, cores, scheduler, heuristic,
+                                                   extrapolate, workers)
+        report["heuristic"] = heuristic
+        report["assignment"] = [[task.id for task in r[1].tasks] if r else [] for r in results]
+        report["unassigned"] = [task.id for task in unassigned]
+        per_core = [realtime_totals(r[1]) if r else ({}, None, set()) for r in results]
+        summaries = [deadline_summary(r[1]) for r in results if r]
+        summaries.append(_unassigned_summary(unassigned, sim_time))
+        system = _merge_totals(per_core)
+    elif mode == "global":
+        if extrapolate:
+            raise ValueError("Extrapolação por hiperperíodo não é suportada no modo global.")
+        _, jobs, core_of, migrations = simulate_global(sim_time, tasks, cores, scheduler)
+        report["migrations"] = migrations
+        system = realtime_totals(jobs)
+        per_core = []
+        for c in range(cores):
+            totals, _ = jobs.completion_totals(where=lambda j, c=c: core_of[j] == c)
+            per_core.append((totals, system[1], set(totals)))
+        summaries = [jobs.deadline_summary()]
+    else:
+        raise ValueError(f"Modo multiprocessado desconhecido: {mode}")
+
+    report["per_core"] = [metrics_from_totals(*part, verbose=False) for part in per_core]
+    report["system"] = metrics_from_totals(*system, verbose=False, cores=cores)
+    report["deadlines"] = _deadline_stats(summaries)
+    completed = sum(entry[0] for entry in system[0].values())
+    report["throughput"] = completed / sim_time if sim_time else 0
+    return report
+
+
+def print_multicore_report(report):
+    print(f"\n{report['scheduler']} {report['mode']} em {report['cores']} núcleos")
+    if report["mode"] == "partitioned":
+        for c, task_ids in enumerate(report["assignment"]):
+            print(f"Núcleo {c}: " + (", ".join(f"T{tid}" for tid in task_ids) or "vazio"))
+        if report["unassigned"]:
+            print("Não escalonáveis (sem núcleo que passe no limitante; jobs contados como deadlines perdidos): "
+                  + ", ".join(f"T{tid}" for tid in report["unassigned"]))
+    else:
+        print(f"Migrações: {report['migrations']}")
+
+    for c, metrics in enumerate(report["per_core"]):
+        print(f"\nMétricas do núcleo {c}:")
+        for k, v in metrics.items():
+            print(f"{k}: {v}")
+    print("\nMétricas do sistema:")
+    for k, v in report["system"].items():
+        print(f"{k}: {v}")
+    deadlines = report["deadlines"]
+    print(f"Deadlines perdidos: {deadlines['misses']} de {deadlines['total']} ({deadlines['miss_ratio']:.2f})")
+    print(f"Vazão: {report['throughput']:.4f} jobs por unidade de tempo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simula RM/EDF particionado ou global em vários núcleos.")
+    parser.add_argument("input", help="arquivo JSON de entrada")
+    parser.add_argument("--cores", type=int, nargs="+", default=None,
+                        help="número(s) de núcleos; por padrão usa o campo cores do arquivo")
+    parser.add_argument("--mode", choices=MODES, default=None)
+    parser.add_argument("--heuristic", choices=HEURISTICS, default=None)
+    parser.add_argument("--scheduler", choices=REALTIME_SCHEDULERS, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="processos no modo particionado")
+    parser.add_argument("--hyperperiod", action="store_true", help="extrapola cada núcleo pelo hiperperíodo")
+    parser.add_argument("--json", action="store_true", help="imprime os relatórios em JSON")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.input)
+    sim_time, tasks = scenario.simulation_time, scenario.columns.tasks(Task)
+    cores, mode, heuristic = read_platform(scenario.options)
+    scheduler = args.scheduler or scenario.scheduler
+    reports = [run_multicore(sim_time, tasks, scheduler, m, args.mode or mode, args.heuristic or heuristic,
+                             args.hyperperiod, args.workers)
+               for m in args.cores or [cores]]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for report in reports:
+            print_multicore_report(report)
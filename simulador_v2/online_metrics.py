@@ -0,0 +1,185 @@
+import math
+
+from periodic_engine import PRIORITIES, PeriodicSimulation
+
+QUANTILES = {"p50": 0.5, "p99": 0.99, "p99_9": 0.999}
+
+
+class QuantileSketch:
+    """Histograma com baldes logarítmicos (estilo DDSketch).
+
+    Cada quantil sai com erro relativo <= accuracy, e o número de baldes só
+    depende da faixa de valores, não da quantidade de amostras.
+    """
+
+    __slots__ = ("gamma", "log_gamma", "buckets", "zeros", "count")
+
+    def __init__(self, accuracy: float = 0.01):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def quantile(self, q: float):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class RunningStats:
+    """Contagem, média, variância (Welford), mínimo, máximo e quantis aproximados."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "sketch")
+
+    def __init__(self, accuracy: float = 0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(accuracy)
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.sketch.add(value)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        result = {
+            "count": self.count,
+            "mean": self.mean,
+            "std": math.sqrt(self.variance),
+            "min": self.min,
+            "max": self.max,
+        }
+        for name, q in QUANTILES.items():
+            # A aproximação do balde nunca sai da faixa observada
+            result[name] = min(max(self.sketch.quantile(q), self.min), self.max)
+        return result
+
+
+class _TaskAggregate:
+    __slots__ = ("released", "completed", "misses", "starved", "response", "waiting")
+
+    def __init__(self, accuracy):
+        self.released = 0
+        self.completed = 0
+        self.misses = 0
+        self.starved = 0
+        self.response = RunningStats(accuracy)
+        self.waiting = RunningStats(accuracy)
+
+
+class OnlineMetrics:
+    """Métricas agregadas job a job, com memória constante no número de jobs.
+
+    Os simuladores chamam job_released/job_completed (via o parâmetro
+    metrics). Tempo de resposta é finish - release e espera é resposta -
+    computation, como em calculate_metrics_realtime. Um job conta como
+    starvation quando espera/resposta passa de starvation_threshold, o
+    mesmo critério de detect_starvation.
+    """
+
+    def __init__(self, starvation_threshold: float = 0.8, accuracy: float = 0.01):
+        self.starvation_threshold = starvation_threshold
+        self.accuracy = accuracy
+        self.per_task = {}
+        self.response = RunningStats(accuracy)
+        self.waiting = RunningStats(accuracy)
+        self.busy_time = 0
+        self.last_finish = 0
+
+    def _task(self, task_id):
+        aggregate = self.per_task.get(task_id)
+        if aggregate is None:
+            aggregate = self.per_task[task_id] = _TaskAggregate(self.accuracy)
+        return aggregate
+
+    def job_released(self, task_id):
+        self._task(task_id).released += 1
+
+    def job_completed(self, task_id, release: int, finish: int, computation: int, deadline: int = None):
+        aggregate = self._task(task_id)
+        response = finish - release
+        waiting = response - computation
+        aggregate.completed += 1
+        aggregate.response.add(response)
+        aggregate.waiting.add(waiting)
+        self.response.add(response)
+        self.waiting.add(waiting)
+        if deadline is not None and finish > deadline:
+            aggregate.misses += 1
+        if response > 0 and waiting / response > self.starvation_threshold:
+            aggregate.starved += 1
+        self.busy_time += computation
+        self.last_finish = max(self.last_finish, finish)
+
+    def summary(self):
+        tasks = {}
+        for task_id, aggregate in self.per_task.items():
+            tasks[task_id] = {
+                "released": aggregate.released,
+                "completed": aggregate.completed,
+                "deadline_misses": aggregate.misses,
+                "starved": aggregate.starved,
+                "response_time": aggregate.response.summary(),
+                "waiting_time": aggregate.waiting.summary(),
+            }
+        return {
+            "tasks": tasks,
+            "response_time": self.response.summary(),
+            "waiting_time": self.waiting.summary(),
+            "deadline_misses": sum(a.misses for a in self.per_task.values()),
+            "starved": sum(a.starved for a in self.per_task.values()),
+            "CPU_utilization": self.busy_time / self.last_finish if self.last_finish else 0,
+        }
+
+
+def stream_periodic_metrics(sim_time: int, tasks, scheduler: str, metrics: OnlineMetrics = None):
+    """Simula RM/EDF sem guardar trace nem jobs concluídos e devolve as métricas online.
+
+    A memória depende só do número de jobs pendentes, então serve para
+    horizontes em que a simulação completa não caberia.
+    """
+    metrics = metrics or OnlineMetrics()
+    PeriodicSimulation(tasks, PRIORITIES[scheduler], metrics=metrics, record=False).advance(sim_time)
+    return metrics
+
+
+def print_percentiles(metrics: OnlineMetrics):
+    print("\nPercentis por tarefa (resposta / espera):")
+    for task_id, data in sorted(metrics.summary()["tasks"].items()):
+        response, waiting = data["response_time"], data["waiting_time"]
+        if not response["count"]:
+            print(f"T{task_id}: nenhum job concluído")
+            continue
+        print(f"T{task_id}: " + ", ".join(
+            f"{name} = {response[name]:.1f} / {waiting[name]:.1f}" for name in QUANTILES
+        ) + f", max = {response['max']} / {waiting['max']}")
@@ -0,0 +1,217 @@
+import heapq
+
+from execution_trace import ExecutionTrace
+from job_table import JobTable, first_release
+
+
+def rm_priority(task, deadline):
+    return task.period_time
+
+
+def edf_priority(task, deadline):
+    return deadline
+
+
+PRIORITIES = {"RM": rm_priority, "EDF": edf_priority}
+
+
+class PeriodicSimulation:
+    """Simulação RM/EDF orientada a eventos que pode ser avançada por partes.
+
+    Mantém um calendário de liberações (heap de (próxima liberação, índice da
+    tarefa)) e uma fila de prontos (heap de (prioridade, ordem de liberação,
+    job)); a ordem de liberação desempata prioridades iguais.
+
+    metrics (ver online_metrics.OnlineMetrics) recebe cada liberação e cada
+    conclusão. Com record=False nem o trace nem os jobs concluídos são
+    guardados, e a memória não cresce com o horizonte. probe (ver
+    instrumentation.Probe) recebe também as fatias e a ociosidade, e marca
+    o tempo de cada fase do laço.
+
+    execution_time, se dado, é chamado como execution_time(i) a cada
+    liberação e devolve a demanda do novo job da tarefa i (por padrão,
+    computation_time). As métricas continuam usando computation_time.
+    """
+
+    def __init__(self, tasks, priority, capacity: int = 0, metrics=None, record: bool = True, probe=None,
+                 execution_time=None):
+        self.tasks = tasks
+        self.priority = priority
+        self.metrics = metrics
+        self.probe = probe
+        self.execution_time = execution_time
+        self.record = record
+        self.sequence = ExecutionTrace()
+        self.jobs = JobTable(tasks, capacity, recycle=not record)
+        self.releases = [(first_release(task), i) for i, task in enumerate(tasks)]
+        heapq.heapify(self.releases)
+        self.ready = []
+        self.time = 0
+        self.closed_at = None
+
+    def advance(self, until: int):
+        tasks, jobs, ready, releases = self.tasks, self.jobs, self.ready, self.releases
+        metrics, record, probe = self.metrics, self.record, self.probe
+        execution_time = self.execution_time
+        if self.closed_at is not None:
+            # Reabre após close(): os pendentes voltam a não constar em order
+            del jobs.order[self.closed_at:]
+            self.closed_at = None
+        if probe:
+            probe.start()
+        time = self.time
+        while time < until:
+            while releases and releases[0][0] <= time:
+                release_time, i = heapq.heappop(releases)
+                task = tasks[i]
+                seq = jobs.released
+                j = jobs.add(i, release_time)
+                if execution_time:
+                    jobs.remaining[j] = execution_time(i)
+                heapq.heappush(ready, (self.priority(task, jobs.deadline[j]), seq, j))
+                if metrics:
+                    metrics.job_released(task.id)
+                if probe:
+                    probe.job_released(release_time, task.id, j)
+                heapq.heappush(releases, (release_time + task.period_time, i))
+            if probe:
+                probe.lap("release")
+
+            # Só há decisões de escalonamento em liberações e conclusões
+            next_event = min(releases[0][0], until) if releases else until
+
+            if ready:
+                j = ready[0][2]
+                end = min(time + jobs.remaining[j], next_event)
+                if probe:
+                    probe.job_running(time, end, jobs.task_id(j), j, len(ready))
+                if record:
+                    self.sequence.append(time, end, jobs.task_id(j), j)
+                if probe:
+                    probe.lap("trace")
+                jobs.remaining[j] -= end - time
+
+                if jobs.remaining[j] == 0:
+                    heapq.heappop(ready)
+                    if metrics:
+                        metrics.job_completed(jobs.task_id(j), jobs.release[j], end,
+                                              jobs.computation_time(j), jobs.deadline[j])
+                    if probe:
+                        probe.job_completed(end, jobs.task_id(j), j, jobs.deadline[j])
+                    jobs.complete(j, end)
+            else:
+                end = next_event
+                if probe:
+                    probe.cpu_idle(time, end)
+                if record:
+                    self.sequence.idle(time, end)
+                if probe:
+                    probe.lap("trace")
+            if probe:
+                probe.lap("complete")
+            time = end
+        self.time = time
+
+    def state_key(self):
+        """Estado do escalonador relativo ao instante atual.
+
+        Dois instantes com a mesma chave produzem, dali em diante, o mesmo
+        escalonamento deslocado no tempo.
+        """
+        jobs, time = self.jobs, self.time
+        pending = tuple(
+            (jobs.task_index[j], jobs.remaining[j], jobs.release[j] - time, jobs.deadline[j] - time)
+            for _, _, j in sorted(self.ready, key=lambda entry: entry[1])
+        )
+        calendar = tuple(sorted((release - time, i) for release, i in self.releases))
+        return pending, calendar
+
+    def close(self):
+        """Encerra a simulação: os jobs ainda prontos ficam como não concluídos.
+
+        Um advance() posterior desfaz o encerramento e continua de onde parou.
+        """
+        if self.closed_at is None:
+            self.closed_at = len(self.jobs.order)
+            self.jobs.order.extend(j for _, _, j in sorted(self.ready, key=lambda entry: entry[1]))
+        return self.sequence, self.jobs
+
+
+class GlobalSimulation:
+    """RM/EDF global em `cores` processadores idênticos, com migração.
+
+    A cada evento os `cores` jobs mais prioritários da fila de prontos
+    executam. Um job que continua entre os escolhidos fica no mesmo núcleo;
+    os demais ocupam os núcleos livres em ordem de índice. Com cores=1 o
+    escalonamento é o mesmo de PeriodicSimulation.
+
+    core[j] é o núcleo em que o job j executou por último (ou concluiu);
+    migrations conta as trocas de núcleo de um mesmo job.
+    """
+
+    def __init__(self, tasks, priority, cores: int, capacity: int = 0):
+        self.tasks = tasks
+        self.priority = priority
+        self.cores = cores
+        self.sequences = [ExecutionTrace() for _ in range(cores)]
+        self.jobs = JobTable(tasks, capacity)
+        self.core = {}
+        self.migrations = 0
+        self.releases = [(first_release(task), i) for i, task in enumerate(tasks)]
+        heapq.heapify(self.releases)
+        self.ready = []
+        self.running = [None] * cores
+        self.time = 0
+
+    def advance(self, until: int):
+        tasks, jobs, ready, releases = self.tasks, self.jobs, self.ready, self.releases
+        sequences, core_of = self.sequences, self.core
+        time = self.time
+        while time < until:
+            while releases and releases[0][0] <= time:
+                release_time, i = heapq.heappop(releases)
+                task = tasks[i]
+                seq = jobs.released
+                j = jobs.add(i, release_time)
+                heapq.heappush(ready, (self.priority(task, jobs.deadline[j]), seq, j))
+                heapq.heappush(releases, (release_time + task.period_time, i))
+
+            selected = [heapq.heappop(ready) for _ in range(min(self.cores, len(ready)))]
+            next_event = min(releases[0][0], until) if releases else until
+            end = min([next_event] + [time + jobs.remaining[entry[2]] for entry in selected])
+
+            # Quem já estava em um núcleo fica nele; os outros pegam os livres
+            chosen = {entry[2] for entry in selected}
+            running = [j if j in chosen else None for j in self.running]
+            free = (c for c in range(self.cores) if running[c] is None)
+            placed = set(running)
+            for entry in selected:
+                j = entry[2]
+                if j not in placed:
+                    running[next(free)] = j
+            self.running = running
+
+            for c, j in enumerate(running):
+                if j is None:
+                    sequences[c].idle(time, end)
+                    continue
+                if core_of.get(j, c) != c:
+                    self.migrations += 1
+                core_of[j] = c
+                sequences[c].append(time, end, jobs.task_id(j), j)
+                jobs.remaining[j] -= end - time
+
+            for entry in selected:
+                j = entry[2]
+                if jobs.remaining[j] == 0:
+                    jobs.complete(j, end)
+                    running[running.index(j)] = None
+                else:
+                    heapq.heappush(ready, entry)
+            time = end
+        self.time = time
+
+    def close(self):
+        """Encerra a simulação: os jobs ainda prontos ficam como não concluídos."""
+        self.jobs.order.extend(j for _, _, j in sorted(self.ready, key=lambda entry: entry[1]))
+        return self.sequences, self.jobs
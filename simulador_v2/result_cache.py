@@ -0,0 +1,336 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from aperiodic_engine import RunState
+from execution_trace import IDLE, ExecutionTrace
+from job_table import NOT_FINISHED, JobTable
+from main import (REALTIME_SCHEDULERS, SIMULATORS, Task, calculate_metrics, calculate_metrics_realtime,
+                  deadline_summary, missed_deadlines)
+
+# Mudar sempre que alguma mudança nos simuladores ou nas métricas alterar resultados
+ENGINE_VERSION = 1
+TASK_FIELDS = ("id", "offset", "computation_time", "period_time", "quantum", "deadline")
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+MAGIC = b"SIMCACHE1"
+EXTENSION = ".simcache"
+_LENGTH = struct.Struct("<Q")
+# Campos do resultado indexados por id de tarefa (chaves int, que o JSON não preserva)
+_METRICS_BY_TASK = ("TAT_avg_per_task", "WT_avg_per_task")
+
+
+def cache_key(tasks, scheduler: str, extrapolate: bool = False, sim_time: int = None):
+    """SHA-256 do conjunto de tarefas normalizado, do escalonador e da versão do motor.
+
+    O horizonte não entra na chave (uma execução até H serve horizontes
+    menores), exceto com extrapolação por hiperperíodo, cujo resultado não
+    é um prefixo do de um horizonte maior.
+    """
+    canonical = {
+        "engine": ENGINE_VERSION,
+        "scheduler": scheduler,
+        "tasks": [[getattr(task, field) for field in TASK_FIELDS] for task in tasks],
+    }
+    if extrapolate:
+        canonical["extrapolate"] = sim_time
+    return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+
+class ResultCache:
+    """Cache de resultados em dois níveis: LRU em memória e diretório em disco.
+
+    Uma entrada guarda o horizonte H da execução, o resultado (métricas,
+    resumo de deadlines e jobs que perderam o deadline) e as colunas que
+    permitem recalcular o resultado para qualquer horizonte <= H (ver
+    prefix_result). O disco é compartilhável entre processos (gravação
+    atômica) e é limitado a max_bytes: os arquivos usados há mais tempo
+    (mtime, atualizado a cada acerto) são removidos primeiro. Nos arquivos
+    vão só JSON e bytes de array('q') (ver _dump_entry), nunca pickle.
+    """
+
+    def __init__(self, directory: str = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()
+        self.hits = self.prefix_hits = self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """Entrada da chave, da memória ou do disco; None se não houver."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            return entry
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = _load_entry(f.read())
+            os.utime(path)
+        except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        if not self.directory:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_dump_entry(entry))
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(EXTENSION):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+    def lookup(self, key, sim_time: int):
+        """Resultado para sim_time a partir de uma entrada com horizonte >= sim_time, ou None."""
+        entry = self.get(key)
+        if entry is None or entry["horizon"] < sim_time:
+            self.misses += 1
+            return None
+        if entry["horizon"] == sim_time:
+            self.hits += 1
+            return entry["result"]
+        self.prefix_hits += 1
+        return prefix_result(entry, sim_time)
+
+
+def _dump_entry(entry):
+    """Bytes de uma entrada: MAGIC, cabeçalho JSON e as colunas, cada um precedido do tamanho."""
+    result = dict(entry["result"])
+    metrics = result["metrics"] = dict(result["metrics"])
+    # Dicionários com chave int viram listas de pares
+    for field in _METRICS_BY_TASK:
+        if field in metrics:
+            metrics[field] = list(metrics[field].items())
+    if result["deadlines"] is not None:
+        result["deadlines"] = list(result["deadlines"].items())
+    columns = entry.get("columns")
+    header = {
+        "horizon": entry["horizon"],
+        "scheduler": entry["scheduler"],
+        "tasks": [[getattr(task, field) for field in TASK_FIELDS] for task in entry["tasks"]],
+        "result": result,
+        "columns": list(columns) if columns is not None else None,
+        "byteorder": sys.byteorder,
+    }
+    sections = [json.dumps(header, allow_nan=False).encode()]
+    sections.extend(column.tobytes() for column in (columns or {}).values())
+    return MAGIC + b"".join(_LENGTH.pack(len(data)) + data for data in sections)
+
+
+def _load_entry(data: bytes):
+    """Inverso de _dump_entry; levanta ValueError se os bytes não forem uma entrada."""
+    if not data.startswith(MAGIC):
+        raise ValueError("Arquivo de cache inválido.")
+    sections = []
+    pos = len(MAGIC)
+    while pos < len(data):
+        (length,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        sections.append(data[pos:pos + length])
+        pos += length
+    header = json.loads(sections[0])
+
+    result = header["result"]
+    metrics = result["metrics"]
+    for field in _METRICS_BY_TASK:
+        if field in metrics:
+            metrics[field] = dict(metrics[field])
+    if result["deadlines"] is not None:
+        result["deadlines"] = dict(result["deadlines"])
+    entry = {
+        "horizon": header["horizon"],
+        "scheduler": header["scheduler"],
+        "tasks": [Task(*fields) for fields in header["tasks"]],
+        "result": result,
+    }
+    if header["columns"] is not None:
+        if len(header["columns"]) != len(sections) - 1:
+            raise ValueError("Arquivo de cache truncado.")
+        columns = entry["columns"] = {}
+        for name, raw in zip(header["columns"], sections[1:]):
+            column = columns[name] = array('q')
+            column.frombytes(raw)
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+    return entry
+
+
+def _realtime_result(jobs):
+    summary = deadline_summary(jobs)
+    return {
+        "metrics": calculate_metrics_realtime(jobs, verbose=False),
+        "deadlines": summary,
+        "missed": [list(row) for row in missed_deadlines(jobs)],
+    }
+
+
+def _simulate(sim_time: int, tasks, scheduler: str, extrapolate: bool = False):
+    """Executa e devolve a entrada do cache (horizonte, resultado e colunas para prefixos)."""
+    if scheduler in REALTIME_SCHEDULERS:
+        sequence, jobs = SIMULATORS[scheduler](sim_time, tasks, extrapolate)
+        entry = {"horizon": sim_time, "scheduler": scheduler, "tasks": tasks, "result": _realtime_result(jobs)}
+        if not extrapolate:
+            size = jobs.size
+            completed = array('q', (j for j in jobs if jobs.completed[j]))
+            entry["columns"] = {
+                "task_index": jobs.task_index[:size], "release": jobs.release[:size],
+                "deadline": jobs.deadline[:size], "finish": jobs.finish[:size],
+                "completed": completed, "completed_finish": array('q', (jobs.finish[j] for j in completed)),
+            }
+        return entry
+
+    sequence, state = SIMULATORS[scheduler](sim_time, tasks)
+    return {
+        "horizon": sim_time, "scheduler": scheduler, "tasks": tasks,
+        "result": {"metrics": calculate_metrics(state, sequence, sim_time, verbose=False),
+                   "deadlines": None, "missed": None},
+        "columns": {
+            "starts": sequence.starts, "ends": sequence.ends, "task_ids": sequence.task_ids,
+            "finish": state.finish, "waiting": state.waiting,
+        },
+    }
+
+
+def _periodic_prefix(entry, sim_time: int):
+    """JobTable de uma execução RM/EDF até sim_time, recortada da execução até o horizonte da entrada.
+
+    Até sim_time o escalonamento é o mesmo: ficam os jobs liberados antes de
+    sim_time, e só os que terminaram até sim_time contam como concluídos.
+    """
+    columns = entry["columns"]
+    size = bisect_left(columns["release"], sim_time)
+    done = bisect_right(columns["completed_finish"], sim_time)
+    jobs = JobTable(entry["tasks"])
+    jobs.task_index = columns["task_index"][:size]
+    jobs.release = columns["release"][:size]
+    jobs.deadline = columns["deadline"][:size]
+    jobs.remaining = array('q', bytes(8 * size))
+    jobs.finish = array('q', [NOT_FINISHED]) * size
+    jobs.completed = bytearray(size)
+    full_finish = columns["finish"]
+    order = columns["completed"][:done]
+    for j in order:
+        jobs.finish[j] = full_finish[j]
+        jobs.completed[j] = 1
+    order.extend(j for j in range(size) if not jobs.completed[j])
+    jobs.order = order
+    jobs.size = jobs.released = size
+    return jobs
+
+
+def _aperiodic_cut(scheduler: str, starts, ends, task_ids, sim_time: int):
+    """Instante em que a execução até sim_time para, dentro da execução mais longa.
+
+    FCFS/SJF/SRTF param na primeira decisão em sim_time ou depois; RR
+    continua até a fila esvaziar, isto é, até a primeira ociosidade a
+    partir de sim_time (ou o fim do trace). Com sim_time <= 0 nenhum
+    escalonador chega a executar.
+    """
+    if scheduler != "RR" or sim_time <= 0:
+        return sim_time
+    for k in range(bisect_right(ends, sim_time - 1), len(starts)):
+        if task_ids[k] == IDLE:
+            return max(starts[k], sim_time)
+    return ends[-1] if len(ends) else sim_time
+
+
+def _aperiodic_prefix(entry, sim_time: int):
+    """(RunState, sequence) de uma execução FCFS/SJF/RR/SRTF até sim_time."""
+    scheduler, columns = entry["scheduler"], entry["columns"]
+    starts, ends, task_ids = columns["starts"], columns["ends"], columns["task_ids"]
+    cut = _aperiodic_cut(scheduler, starts, ends, task_ids, sim_time)
+    # FCFS e SJF não são preemptivos: a fatia iniciada antes do corte vai até o fim
+    whole = scheduler in ("FCFS", "SJF")
+
+    sequence = ExecutionTrace()
+    for k in range(bisect_left(starts, cut)):
+        end = ends[k] if whole and task_ids[k] != IDLE else min(ends[k], cut)
+        sequence.append(starts[k], end, task_ids[k], task_ids[k])
+
+    state = RunState(entry["tasks"])
+    for i, (task, finish, waiting) in enumerate(zip(state.tasks, columns["finish"], columns["waiting"])):
+        if not finish:
+            continue
+        if whole:
+            included = finish - task.computation_time < cut
+        elif scheduler == "RR":
+            included = finish <= cut
+        else:
+            # SRTF só registra a conclusão na decisão seguinte, que precisa ser antes do corte
+            included = finish < cut
+        if included:
+            state.finish[i] = finish
+            state.waiting[i] = waiting
+    return state, sequence
+
+
+def prefix_result(entry, sim_time: int):
+    """Resultado de uma execução até sim_time <= entry["horizon"], sem simular de novo."""
+    if entry["scheduler"] in REALTIME_SCHEDULERS:
+        return _realtime_result(_periodic_prefix(entry, sim_time))
+    state, sequence = _aperiodic_prefix(entry, sim_time)
+    return {"metrics": calculate_metrics(state, sequence, sim_time, verbose=False),
+            "deadlines": None, "missed": None}
+
+
+def run_cached(sim_time: int, tasks, scheduler: str, extrapolate: bool = False, cache: ResultCache = None):
+    """{"metrics", "deadlines", "missed"} de uma execução, do cache se possível.
+
+    metrics é o dicionário de calculate_metrics/calculate_metrics_realtime;
+    deadlines (deadline_summary) e missed ([task_id, release, deadline,
+    finish] por job atrasado) são None fora de RM/EDF.
+    """
+    if scheduler not in SIMULATORS:
+        raise ValueError("Algoritmo não implementado.")
+    # Só RM/EDF extrapolam; nos demais a opção não muda o resultado
+    extrapolate = extrapolate and scheduler in REALTIME_SCHEDULERS
+    if cache is None:
+        return _simulate(sim_time, tasks, scheduler, extrapolate)["result"]
+    key = cache_key(tasks, scheduler, extrapolate, sim_time)
+    result = cache.lookup(key, sim_time)
+    if result is None:
+        entry = _simulate(sim_time, tasks, scheduler, extrapolate)
+        cache.put(key, entry)
+        result = entry["result"]
+    return result
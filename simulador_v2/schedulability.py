@@ -0,0 +1,294 @@
+import math
+from collections import Counter
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def utilization(tasks):
+    return sum(task.computation_time / task.period_time for task in tasks)
+
+
+def density(tasks):
+    return sum(task.computation_time / min(task.deadline, task.period_time) for task in tasks)
+
+
+def _result(test, tasks, schedulable, wcrt=None, upper_bounds=()):
+    """Monta o resultado de um teste: veredito global e por tarefa.
+
+    schedulable é True/False, ou None quando o teste é só suficiente e não
+    foi conclusivo. wcrt mapeia task_id -> pior tempo de resposta (math.inf
+    se ilimitado); testes por limitante não calculam tempos de resposta.
+    Para as tarefas em upper_bounds o wcrt é só um limite superior, e
+    passar do deadline deixa o veredito da tarefa em None.
+    """
+    per_task = []
+    for task in tasks:
+        response = wcrt.get(task.id) if wcrt is not None else None
+        if response is not None:
+            verdict = response <= task.deadline
+            if not verdict and task.id in upper_bounds:
+                verdict = None
+        else:
+            verdict = True if schedulable else None
+        per_task.append({
+            "task_id": task.id,
+            "schedulable": verdict,
+            "wcrt": response,
+            "deadline": task.deadline
+        })
+    return {"test": test, "schedulable": schedulable, "tasks": per_task}
+
+
+def liu_layland_test(tasks):
+    """Limitante de Liu-Layland para RM: sum(C/min(D, T)) <= n(2^(1/n) - 1)."""
+    n = len(tasks)
+    bound = n * (2 ** (1 / n) - 1) if n else 1
+    return _result("Liu-Layland", tasks, True if density(tasks) <= bound else None)
+
+
+def hyperbolic_test(tasks):
+    """Limitante hiperbólico para RM: prod(C/min(D, T) + 1) <= 2."""
+    product = 1
+    for task in tasks:
+        product *= task.computation_time / min(task.deadline, task.period_time) + 1
+    return _result("Hiperbólico", tasks, True if product <= 2 else None)
+
+
+def _rm_interference(tasks, i):
+    # O simulador desempata períodos iguais pela ordem de liberação dos
+    # jobs, que muda com a fila; as tarefas de mesmo período contam todas
+    # como interferência, o que dá um limite superior.
+    period = tasks[i].period_time
+    return [other for j, other in enumerate(tasks) if j != i and other.period_time <= period]
+
+
+def _period_ties(tasks):
+    """task_id das tarefas que dividem o período com outra."""
+    counts = Counter(task.period_time for task in tasks)
+    return {task.id for task in tasks if counts[task.period_time] > 1}
+
+
+def rm_response_time(tasks, i):
+    """Pior tempo de resposta da tarefa i sob RM (liberação síncrona).
+
+    Análise de período ocupado de Lehoczky, válida também para D > T: para
+    cada job q do período ocupado, w = (q+1)C_i + sum(ceil(w/T_j) C_j).
+    Exata se nenhuma outra tarefa tem o mesmo período; senão, limite
+    superior (ver _rm_interference).
+    """
+    task = tasks[i]
+    higher = _rm_interference(tasks, i)
+    if utilization(higher) + task.computation_time / task.period_time > 1:
+        return math.inf
+
+    worst = 0
+    q = 0
+    while True:
+        w = (q + 1) * task.computation_time
+        while True:
+            demand = (q + 1) * task.computation_time + sum(
+                _ceil_div(w, other.period_time) * other.computation_time for other in higher)
+            if demand == w:
+                break
+            w = demand
+        worst = max(worst, w - q * task.period_time)
+        if w <= (q + 1) * task.period_time:
+            return worst
+        q += 1
+
+
+def response_time(task, higher, u_higher: float, first: int = 0):
+    """(pior tempo de resposta, conclusão do primeiro job) de task sob as mais prioritárias higher.
+
+    Mesma análise de rm_response_time, com a prioridade já resolvida
+    (u_higher é a utilização de higher). first é um limite inferior
+    conhecido para a conclusão do primeiro job do período ocupado, por
+    exemplo a de um conjunto com menos interferência, e encurta a
+    iteração; cada job seguinte parte da conclusão do anterior mais C.
+    """
+    computation, period = task.computation_time, task.period_time
+    if u_higher + computation / period > 1:
+        return math.inf, None
+    worst = 0
+    q = 0
+    w = max(first, computation)
+    first = None
+    while True:
+        while True:
+            demand = (q + 1) * computation
+            for other in higher:
+                demand += -(-w // other.period_time) * other.computation_time
+            if demand == w:
+                break
+            w = demand
+        if first is None:
+            first = w
+        worst = max(worst, w - q * period)
+        if w <= (q + 1) * period:
+            return worst, first
+        q += 1
+        w += computation
+
+
+def response_time_analysis(tasks):
+    """Análise de tempo de resposta para prioridade fixa (RM).
+
+    Exata sem períodos repetidos; com eles, só suficiente: uma tarefa de
+    período repetido que passa do deadline deixa o veredito inconclusivo.
+    """
+    wcrt = {task.id: rm_response_time(tasks, i) for i, task in enumerate(tasks)}
+    ties = _period_ties(tasks)
+    missed = {task.id for task in tasks if wcrt[task.id] > task.deadline}
+    if not missed:
+        schedulable = True
+    else:
+        schedulable = None if missed <= ties else False
+    return _result("RTA", tasks, schedulable, wcrt, ties)
+
+
+def demand_bound(tasks, t):
+    """Demanda de processador dos jobs com liberação e deadline em [0, t]."""
+    return sum(
+        ((t - task.deadline) // task.period_time + 1) * task.computation_time
+        for task in tasks if task.deadline <= t
+    )
+
+
+def busy_period(tasks, start: int = None, cap: int = None):
+    """Comprimento do período ocupado síncrono (U <= 1), ou cap se ele for maior.
+
+    start, se dado, é um limite inferior já conhecido (por exemplo, o
+    período ocupado de um subconjunto das tarefas) e encurta a iteração.
+    """
+    w = sum(task.computation_time for task in tasks) if start is None else start
+    while True:
+        demand = sum(-(-w // task.period_time) * task.computation_time for task in tasks)
+        if demand == w:
+            return w
+        if cap is not None and demand >= cap:
+            return cap
+        w = demand
+
+
+def _last_deadline_before(tasks, t):
+    """Maior deadline absoluto estritamente menor que t (ou None)."""
+    latest = None
+    for task in tasks:
+        if task.deadline >= t:
+            continue
+        d = task.deadline + (t - task.deadline - 1) // task.period_time * task.period_time
+        if latest is None or d > latest:
+            latest = d
+    return latest
+
+
+def baruah_bound(tasks, u: float):
+    """Limite L_a de Baruah para os pontos do teste de demanda (U = u < 1)."""
+    return max(max(task.deadline for task in tasks),
+               sum((task.period_time - task.deadline) * task.computation_time / task.period_time
+                   for task in tasks) / (1 - u))
+
+
+def qpa_test(tasks, limit: int = None):
+    """Teste de demanda de processador para EDF pelo algoritmo QPA (Zhang e Burns).
+
+    Os deadlines testados vão até limit; sem ele, até o menor entre o
+    período ocupado síncrono e baruah_bound. Qualquer limite não menor que
+    um dos dois serve.
+    """
+    if utilization(tasks) > 1:
+        return False
+    return qpa_violation(tasks, limit) is None
+
+
+def qpa_violation(tasks, limit: int = None):
+    """Deadline t com demanda h(t) > t achado pelo QPA, ou None se não há (U <= 1).
+
+    limit como em qpa_test.
+    """
+    if limit is None:
+        u = utilization(tasks)
+        limit = busy_period(tasks, cap=math.ceil(baruah_bound(tasks, u)) if u < 1 else None)
+
+    d_min = min(task.deadline for task in tasks)
+    t = _last_deadline_before(tasks, limit + 1)
+    while t is not None:
+        h = demand_bound(tasks, t)
+        if h > t:
+            return t
+        if h <= d_min:
+            return None
+        t = h if h < t else _last_deadline_before(tasks, t)
+    return None
+
+
+def edf_response_time(tasks, i, limit):
+    """Pior tempo de resposta da tarefa i sob EDF (análise de Spuri).
+
+    Para cada instante de liberação candidato a dentro do período ocupado
+    síncrono, L(a) = W_i(a, L(a)) + (1 + floor(a/T_i)) C_i e R_i(a) =
+    max(C_i, L(a) - a). Jobs com deadline igual contam como interferência.
+    """
+    task = tasks[i]
+    others = [other for j, other in enumerate(tasks) if j != i]
+
+    candidates = set()
+    for other in tasks:
+        a = other.deadline - task.deadline
+        if a < 0:
+            a += _ceil_div(-a, other.period_time) * other.period_time
+        while a < limit - task.computation_time + 1:
+            candidates.add(a)
+            a += other.period_time
+    if not candidates:
+        candidates.add(0)
+
+    worst = task.computation_time
+    for a in sorted(candidates):
+        own = (1 + a // task.period_time) * task.computation_time
+        absolute_deadline = a + task.deadline
+        interfering = [other for other in others if other.deadline <= absolute_deadline]
+        w = own
+        while True:
+            demand = own + sum(
+                min(_ceil_div(w, other.period_time),
+                    1 + (absolute_deadline - other.deadline) // other.period_time) * other.computation_time
+                for other in interfering)
+            if demand == w:
+                break
+            w = demand
+        worst = max(worst, w - a)
+    return worst
+
+
+def edf_demand_test(tasks):
+    """Teste exato para EDF (QPA) com tempos de resposta de Spuri por tarefa."""
+    schedulable = qpa_test(tasks)
+    if utilization(tasks) > 1:
+        wcrt = {task.id: math.inf for task in tasks}
+    else:
+        limit = busy_period(tasks)
+        wcrt = {task.id: edf_response_time(tasks, i, limit) for i, task in enumerate(tasks)}
+    return _result("QPA", tasks, schedulable, wcrt)
+
+
+def analyze(tasks, scheduler: str):
+    """Executa os testes de escalonabilidade de RM ou EDF sobre as tarefas.
+
+    As tarefas são tratadas como liberadas juntas (o offset é ignorado),
+    o que é o pior caso para prioridade fixa. Os limitantes rápidos vêm
+    primeiro; o teste exato fecha a lista e dá o veredito final.
+    """
+    if not tasks:
+        return []
+    if scheduler == "RM":
+        results = [liu_layland_test(tasks), hyperbolic_test(tasks)]
+        results.append(response_time_analysis(tasks))
+    elif scheduler == "EDF":
+        bound = _result("Densidade", tasks, True if density(tasks) <= 1 else None)
+        results = [bound, edf_demand_test(tasks)]
+    else:
+        raise ValueError(f"Análise de escalonabilidade só existe para RM e EDF, não {scheduler}.")
+    return results
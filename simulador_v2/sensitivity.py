@@ -0,0 +1,397 @@
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from itertools import groupby
+
+from main import Task
+from schedulability import (baruah_bound, busy_period, demand_bound, density, qpa_violation, response_time,
+                            rm_response_time, utilization)
+
+PARAMETERS = ("computation_time", "period_time", "deadline")
+LABELS = {"computation_time": "WCET", "period_time": "período", "deadline": "deadline"}
+SCHEDULERS = ("RM", "EDF")
+DEFAULT_RESOLUTION = 1000
+# Quantas vezes um período ou deadline pode dobrar procurando um valor viável
+MAX_DOUBLINGS = 20
+
+
+def _replace(task, parameter: str, value: int):
+    """Cópia de task com parameter = value; um deadline implícito (D = T) acompanha o período."""
+    computation, period, deadline = task.computation_time, task.period_time, task.deadline
+    if parameter == "computation_time":
+        computation = value
+    elif parameter == "period_time":
+        if deadline == period:
+            deadline = value
+        period = value
+    else:
+        deadline = value
+    return Task(task.id, task.offset, computation, period, task.quantum, deadline)
+
+
+def _scale(task, parameter: str, factor: Fraction):
+    """task com parameter multiplicado por factor, arredondado para o lado pessimista.
+
+    WCET para cima; período e deadline para baixo, nunca abaixo de 1.
+    """
+    value = getattr(task, parameter) * factor
+    value = math.ceil(value) if parameter == "computation_time" else max(1, math.floor(value))
+    return _replace(task, parameter, value)
+
+
+class _Probe:
+    """Teste de escalonabilidade dos conjuntos sondados por uma busca.
+
+    x é o valor do parâmetro da tarefa index ou, com index None, o fator
+    x/resolution aplicado ao parâmetro de todas. Aumentar o WCET ou
+    encolher período e deadline só aumenta a demanda, e o que a última
+    sondagem viável calculou serve de ponto de partida para a seguinte:
+
+    RM: como em schedulability.rm_response_time, as tarefas de mesmo
+    período interferem umas nas outras. A análise de tempo de resposta de
+    cada tarefa parte da conclusão do primeiro job na última sondagem
+    viável, um limite inferior enquanto as que interferem nela não mudam
+    (com o período de uma tarefa encolhendo, só ela pode subir de
+    prioridade e perde o ponto de partida; com ele crescendo, todas
+    perdem). As tarefas de período menor que o da alterada têm o mesmo
+    resultado em todas as sondagens e são analisadas uma vez. O deadline
+    não entra na análise, então na busca de deadline os tempos de resposta
+    são calculados uma vez só.
+
+    EDF: U > 1 e densidade <= 1 decidem sem o QPA; os deadlines em que a
+    demanda excedeu o tempo em sondagens inviáveis são testados antes
+    dele, e o período ocupado parte do da última sondagem viável.
+    """
+
+    def __init__(self, tasks, scheduler: str, index: int, parameter: str, resolution: int):
+        self.tasks = tasks
+        self.scheduler = scheduler
+        self.index = index
+        self.parameter = parameter
+        self.resolution = resolution
+        self.memo = {}
+        # task_id -> conclusão do primeiro job na última sondagem viável, e a ordem de prioridade dela
+        self.seeds = {}
+        self.seed_order = None
+        self.seed_x = None
+        # task_id -> veredito das tarefas acima da alterada
+        self.unaffected = {}
+        self.responses = None
+        self.witnesses = []
+        self.busy = None
+
+    def tasks_at(self, x: int):
+        if self.index is None:
+            factor = Fraction(x, self.resolution)
+            return [_scale(task, self.parameter, factor) for task in self.tasks]
+        tasks = list(self.tasks)
+        tasks[self.index] = _replace(tasks[self.index], self.parameter, x)
+        return tasks
+
+    def __call__(self, x: int):
+        feasible = self.memo.get(x)
+        if feasible is None:
+            tasks = self.tasks_at(x)
+            feasible = self.memo[x] = self._rm(tasks, x) if self.scheduler == "RM" else self._edf(tasks)
+        return feasible
+
+    def _rm(self, tasks, x: int):
+        if self.parameter == "deadline":
+            if self.responses is None:
+                self.responses = [rm_response_time(self.tasks, i) for i in range(len(self.tasks))]
+            return all(r <= task.deadline for r, task in zip(self.responses, tasks))
+
+        ranked = sorted(range(len(tasks)), key=lambda i: (tasks[i].period_time, i))
+        groups = [[tasks[i] for i in group] for _, group in groupby(ranked, key=lambda i: tasks[i].period_time)]
+        order = [[task.id for task in group] for group in groups]
+        seeds = self.seeds
+        if self.parameter == "period_time":
+            if self.index is None and order != self.seed_order:
+                seeds = {}
+            elif self.index is not None and self.seed_x is not None and x > self.seed_x:
+                seeds = {}
+        changed = None if self.index is None else tasks[self.index]
+        higher = []
+        u_higher = 0.0
+        firsts = {}
+        for group in groups:
+            for task in group:
+                ties = [other for other in group if other is not task]
+                interference = higher + ties
+                u = u_higher + sum(other.computation_time / other.period_time for other in ties)
+                if changed is None or task.period_time >= changed.period_time:
+                    seed = 0 if task is changed and self.parameter == "period_time" else seeds.get(task.id, 0)
+                    r, first = response_time(task, interference, u, seed)
+                    if r > task.deadline:
+                        return False
+                    firsts[task.id] = first
+                else:
+                    feasible = self.unaffected.get(task.id)
+                    if feasible is None:
+                        feasible = self.unaffected[task.id] = response_time(task, interference, u)[0] <= task.deadline
+                    if not feasible:
+                        return False
+            higher.extend(group)
+            u_higher += sum(task.computation_time / task.period_time for task in group)
+        self.seeds, self.seed_order, self.seed_x = firsts, order, x
+        return True
+
+    def _edf(self, tasks):
+        u = utilization(tasks)
+        if u > 1:
+            return False
+        if density(tasks) <= 1:
+            return True
+        for t in self.witnesses:
+            if demand_bound(tasks, t) > t:
+                return False
+        # min(período ocupado, L_a), e um limite inferior do período ocupado
+        busy = busy_period(tasks, self.busy, math.ceil(baruah_bound(tasks, u)) if u < 1 else None)
+        t = qpa_violation(tasks, busy)
+        if t is not None:
+            self.witnesses.append(t)
+            return False
+        self.busy = busy
+        return True
+
+
+def _bisect(feasible, start: int, grows: bool, bound: int):
+    """Valor crítico inteiro de uma busca monótona, ou None se nenhum valor é viável.
+
+    grows: maior x viável, sendo bound o maior que pode ser viável; senão,
+    menor x viável, sendo bound o menor que pode ser viável (bound - 1 é
+    sabidamente inviável). A busca parte de start, o valor atual; sem um
+    valor viável acima dele, dobra-o no máximo MAX_DOUBLINGS vezes.
+    """
+    if grows:
+        if bound < 1:
+            return None
+        start = max(1, min(start, bound))
+        if feasible(start):
+            lo, hi = start, bound + 1
+        elif start > 1 and feasible(1):
+            lo, hi = 1, start
+        else:
+            return None
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if feasible(mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+    start = max(start, bound)
+    if feasible(start):
+        lo, hi = bound - 1, start
+    else:
+        lo = start
+        for _ in range(MAX_DOUBLINGS):
+            if feasible(2 * lo):
+                hi = 2 * lo
+                break
+            lo *= 2
+        else:
+            return None
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if feasible(mid):
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def _rm_period(feasible, tasks, index: int, bound: int):
+    """Menor período viável da tarefa index sob RM, ou None.
+
+    O período define a prioridade, e a escalonabilidade só é monótona
+    dentro de uma faixa de prioridade: entre dois períodos consecutivos das
+    demais tarefas, ou igual a um deles. As faixas são testadas em ordem
+    crescente a partir de bound; a primeira com algum valor viável contém o
+    menor. Acima do maior período das demais, a busca é a de _bisect.
+    """
+    low = 1
+    bands = []
+    for period in sorted({task.period_time for j, task in enumerate(tasks) if j != index}):
+        bands += [(low, period - 1), (period, period)]
+        low = period + 1
+    for first, last in bands:
+        first = max(first, bound)
+        if first > last or not feasible(last):
+            continue
+        lo, hi = first - 1, last
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if feasible(mid):
+                hi = mid
+            else:
+                lo = mid
+        return hi
+    low = max(low, bound)
+    return _bisect(feasible, low, False, low)
+
+
+def critical_value(spec, index: int, parameter: str):
+    """Valor crítico do parâmetro da tarefa index, ou o fator crítico x resolution com index None.
+
+    spec é (tasks, scheduler, resolution). O WCET é o maior viável; período
+    e deadline, os menores.
+    """
+    tasks, scheduler, resolution = spec
+    feasible = _Probe(tasks, scheduler, index, parameter, resolution)
+    grows = parameter == "computation_time"
+    u = sum(Fraction(task.computation_time, task.period_time) for task in tasks)
+
+    if index is None:
+        if parameter == "computation_time":
+            # U <= 1 e C <= D
+            bound = min([math.floor(resolution / u)] +
+                        [math.floor(Fraction(resolution * task.deadline, task.computation_time)) for task in tasks])
+        else:
+            # O fator não leva nenhum valor abaixo de 1; acima disso, U > 1 ou D < C
+            # com fator menor que bound
+            smallest = min(getattr(task, parameter) for task in tasks)
+            if parameter == "period_time":
+                limit = u
+            else:
+                limit = max(Fraction(task.computation_time, task.deadline) for task in tasks)
+            bound = max(math.ceil(Fraction(resolution, smallest)), math.ceil(limit * resolution))
+        return _bisect(feasible, resolution, grows, bound)
+
+    task = tasks[index]
+    others = u - Fraction(task.computation_time, task.period_time)
+    if parameter == "computation_time":
+        bound = min(task.deadline, math.floor((1 - others) * task.period_time))
+    elif parameter == "period_time":
+        if others >= 1:
+            return None
+        bound = max(1, math.ceil(task.computation_time / (1 - others)))
+        if scheduler == "RM":
+            return _rm_period(feasible, tasks, index, bound)
+    else:
+        bound = task.computation_time
+    return _bisect(feasible, getattr(task, parameter), grows, bound)
+
+
+def _critical_values(spec, jobs, workers: int):
+    if workers <= 1 or len(jobs) <= 1:
+        return [critical_value(spec, index, parameter) for index, parameter in jobs]
+    indices, parameters = zip(*jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(critical_value, [spec] * len(jobs), indices, parameters))
+
+
+def sensitivity(tasks, scheduler: str, parameters=PARAMETERS, resolution: int = DEFAULT_RESOLUTION,
+                workers: int = None):
+    """Fatores críticos de WCET, período e deadline sob RM ou EDF (liberação síncrona).
+
+    Para o sistema, o fator pelo qual o parâmetro de todas as tarefas pode
+    ser multiplicado (em passos de 1/resolution, arredondando para o lado
+    pessimista) com o conjunto ainda escalonável; o do WCET dá a
+    utilização de ruptura. Para cada tarefa, o valor inteiro crítico do
+    parâmetro com as demais fixas. O WCET cresce até o maior valor viável,
+    período e deadline encolhem até o menor (o fator do sistema, só até o
+    menor valor chegar a 1); um deadline igual ao período acompanha o
+    período. None quando nenhum valor torna o conjunto escalonável.
+
+    A bisseção supõe que a escalonabilidade é monótona no parâmetro, o que
+    vale para EDF e para RM com D = T. Com RM, o período de uma tarefa
+    define a prioridade, e a busca por tarefa é feita em cada faixa de
+    prioridade (ver _rm_period); no fator do sistema com D < T o conjunto
+    pode voltar a ser escalonável mais adiante, e a busca devolve a
+    fronteira mais próxima do valor atual. Tarefas de mesmo período contam
+    como interferência mútua, como em schedulability.rm_response_time.
+
+    Cada busca é uma bisseção sobre os testes exatos de schedulability
+    (RTA para RM, QPA para EDF), partindo do valor atual e limitada pelos
+    valores analiticamente inviáveis (U > 1, C > D); as buscas por tarefa
+    rodam em paralelo em workers processos.
+    """
+    if scheduler not in SCHEDULERS:
+        raise ValueError(f"Análise de sensibilidade só existe para RM e EDF, não {scheduler}.")
+    unknown = set(parameters) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(unknown))}.")
+    workers = workers or os.cpu_count() or 1
+    spec = (tasks, scheduler, resolution)
+    jobs = [(None, parameter) for parameter in parameters]
+    jobs += [(i, parameter) for i in range(len(tasks)) for parameter in parameters]
+    values = iter(_critical_values(spec, jobs, workers) if tasks else [])
+
+    system = {}
+    for parameter in parameters:
+        k = next(values)
+        entry = {"factor": None, "utilization": None}
+        if k is not None:
+            scaled = [_scale(task, parameter, Fraction(k, resolution)) for task in tasks]
+            entry = {"factor": k / resolution, "utilization": utilization(scaled)}
+        system[parameter] = entry
+    per_task = {}
+    for task in tasks:
+        entry = {}
+        for parameter in parameters:
+            value = next(values)
+            entry[parameter] = {"value": value,
+                                "factor": None if value is None else value / getattr(task, parameter)}
+        per_task[task.id] = entry
+    return {
+        "scheduler": scheduler,
+        "resolution": resolution,
+        "schedulable": bool(tasks) and _Probe(tasks, scheduler, None, "computation_time", resolution)(resolution),
+        "utilization": utilization(tasks),
+        "system": system,
+        "tasks": per_task,
+    }
+
+
+def print_report(report, tasks):
+    status = "escalonável" if report["schedulable"] else "não escalonável"
+    print(f"\nSensibilidade ({report['scheduler']}, {status}, U = {report['utilization']:.4f}):")
+    system = []
+    for parameter, entry in report["system"].items():
+        if entry["factor"] is None:
+            system.append(f"{LABELS[parameter]} inviável")
+        elif parameter == "computation_time":
+            system.append(f"{LABELS[parameter]} x{entry['factor']:.3f} "
+                          f"(utilização de ruptura {entry['utilization']:.4f})")
+        else:
+            system.append(f"{LABELS[parameter]} x{entry['factor']:.3f}")
+    print(f"Sistema: {', '.join(system)}")
+    for task in tasks:
+        parts = []
+        for parameter, entry in report["tasks"][task.id].items():
+            if entry["value"] is None:
+                parts.append(f"{LABELS[parameter]} inviável")
+            else:
+                parts.append(f"{LABELS[parameter]} {getattr(task, parameter)} -> {entry['value']} "
+                             f"(x{entry['factor']:.3f})")
+        print(f"T{task.id}: {', '.join(parts)}")
+
+
+if __name__ == "__main__":
+    from main import read_tasks_from_json
+
+    parser = argparse.ArgumentParser(description="Fatores críticos de WCET, período e deadline sob RM/EDF.")
+    parser.add_argument("input", help="arquivo JSON de entrada")
+    parser.add_argument("-s", "--scheduler", choices=SCHEDULERS, help="substitui o scheduler_name do arquivo")
+    parser.add_argument("-p", "--parameter", choices=PARAMETERS, action="append",
+                        help="parâmetro a variar (repetível; padrão: todos)")
+    parser.add_argument("--resolution", type=int, default=DEFAULT_RESOLUTION,
+                        help="passos por unidade do fator do sistema")
+    parser.add_argument("--workers", type=int, default=None, help="número de processos")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    args = parser.parse_args()
+
+    _, scheduler, tasks = read_tasks_from_json(args.input)
+    scheduler = args.scheduler or scheduler
+    if scheduler not in SCHEDULERS:
+        parser.error(f"o arquivo usa {scheduler}; escolha RM ou EDF com -s")
+    report = sensitivity(tasks, scheduler, args.parameter or PARAMETERS, args.resolution, args.workers)
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, tasks)
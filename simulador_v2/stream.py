@@ -0,0 +1,137 @@
+import asyncio
+from collections import deque, namedtuple
+
+from aperiodic_engine import ENGINES as APERIODIC_ENGINES
+from instrumentation import Probe
+from periodic_engine import PRIORITIES, PeriodicSimulation
+
+Decision = namedtuple("Decision", ["time", "job", "action", "task_id"])
+Decision.__doc__ = """Uma decisão do escalonador.
+
+action é um dos eventos de instrumentation.EVENTS (release, dispatch,
+preemption, completion, deadline_miss, idle). Em preemption, job é o job
+interrompido; em idle, job e task_id são None.
+"""
+
+DEFAULT_BUFFER = 4096
+
+
+def create_engine(tasks, scheduler: str, metrics=None, probe=None, record: bool = True):
+    """Simulação incremental (com advance(until) e close()) de qualquer um dos seis escalonadores."""
+    if scheduler in PRIORITIES:
+        return PeriodicSimulation(tasks, PRIORITIES[scheduler], metrics=metrics, record=record, probe=probe)
+    if scheduler in APERIODIC_ENGINES:
+        return APERIODIC_ENGINES[scheduler](tasks, metrics, probe, record)
+    raise ValueError(f"Escalonador desconhecido: {scheduler}")
+
+
+class DecisionStream:
+    """As decisões de uma simulação, entregues à medida que acontecem.
+
+    A simulação avança em trechos de `span` unidades de tempo, e span se
+    ajusta para que cada trecho produza no máximo cerca de `buffer`
+    decisões (mais que isso só se um único instante tiver mais eventos).
+    Só o trecho corrente fica em memória; como o trace não é gravado
+    (record=False), um horizonte de 10^9 não acumula nada além dos jobs
+    pendentes. O consumidor controla o ritmo: nada é simulado enquanto ele
+    não pede a próxima decisão.
+
+    Uso: `for d in stream`, `stream.run_until(t)` (pode ser chamado de
+    novo com t maior), `async for d in stream` ou pump(queue) para uma
+    asyncio.Queue limitada. Sem sim_time a iteração não termina.
+    """
+
+    def __init__(self, tasks, scheduler: str, sim_time: int = None, buffer: int = DEFAULT_BUFFER,
+                 record: bool = False, metrics=None):
+        self.sim_time = sim_time
+        self.buffer = buffer
+        self.span = 1
+        self.pending = deque()
+        self.probe = Probe(timing=False)
+        self._connect()
+        self.engine = create_engine(tasks, scheduler, metrics, self.probe, record)
+
+    def _connect(self):
+        push = self.pending.append
+        on = self.probe.on
+        on("release", lambda time, task_id, job: push(Decision(time, job, "release", task_id)))
+        on("dispatch", lambda time, task_id, job: push(Decision(time, job, "dispatch", task_id)))
+        on("preemption", lambda time, task_id, job, *by: push(Decision(time, job, "preemption", task_id)))
+        on("completion", lambda time, task_id, job: push(Decision(time, job, "completion", task_id)))
+        on("deadline_miss", lambda time, task_id, job, deadline: push(Decision(time, job, "deadline_miss", task_id)))
+        on("idle", lambda start, end: push(Decision(start, None, "idle", None)))
+
+    @property
+    def time(self):
+        """Até onde a simulação já avançou."""
+        return self.engine.time
+
+    def _batches(self, until):
+        """Lotes de decisões até until (None = sem fim), esvaziando o buffer a cada lote."""
+        pending = self.pending
+        while pending or until is None or self.engine.time < until:
+            if not pending:
+                target = self.engine.time + self.span
+                self.engine.advance(target if until is None else min(target, until))
+                if len(pending) > self.buffer and self.span > 1:
+                    self.span //= 2
+                elif len(pending) < self.buffer // 2:
+                    self.span *= 2
+                if not pending:
+                    continue
+            batch = list(pending)
+            pending.clear()
+            yield batch
+
+    def run_until(self, until: int):
+        """Gera as decisões até o instante until."""
+        for batch in self._batches(until):
+            yield from batch
+
+    def __iter__(self):
+        return self.run_until(self.sim_time)
+
+    async def arun_until(self, until: int):
+        """Como run_until, devolvendo o controle ao laço de eventos entre lotes."""
+        for batch in self._batches(until):
+            for decision in batch:
+                yield decision
+            await asyncio.sleep(0)
+
+    def __aiter__(self):
+        return self.arun_until(self.sim_time)
+
+    async def pump(self, queue: asyncio.Queue, until: int = None):
+        """Produz as decisões em queue e termina com None.
+
+        Com uma fila limitada (asyncio.Queue(maxsize)) a simulação espera
+        sempre que o consumidor fica para trás.
+        """
+        async for decision in self.arun_until(self.sim_time if until is None else until):
+            await queue.put(decision)
+        await queue.put(None)
+
+    def close(self):
+        """Resultado da simulação até aqui, como o do simulate_* correspondente (com record=True)."""
+        return self.engine.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+
+    from main import SIMULATORS, read_tasks_from_json
+
+    parser = argparse.ArgumentParser(description="Emite as decisões do escalonador como NDJSON, à medida que ocorrem.")
+    parser.add_argument("input", help="arquivo JSON de entrada")
+    parser.add_argument("-s", "--scheduler", choices=list(SIMULATORS), help="substitui o scheduler_name do arquivo")
+    parser.add_argument("--until", type=int, default=None, help="horizonte (padrão: simulation_time do arquivo)")
+    parser.add_argument("--buffer", type=int, default=DEFAULT_BUFFER, help="decisões por lote")
+    args = parser.parse_args()
+
+    sim_time, scheduler, tasks = read_tasks_from_json(args.input)
+    stream = DecisionStream(tasks, args.scheduler or scheduler, args.until or sim_time, args.buffer)
+    out = sys.stdout
+    for decision in stream:
+        out.write(json.dumps(decision._asdict()) + "\n")
@@ -0,0 +1,203 @@
+import json
+from array import array
+from collections import namedtuple
+
+FIELDS = ("offset", "computation_time", "period_time", "quantum", "deadline")
+# Campos que precisam ser positivos (o offset pode ser negativo, ver job_table.first_release).
+# O quantum só é usado pelo RR e só é exigido positivo nos cenários RR.
+POSITIVE_FIELDS = ("computation_time", "period_time", "deadline")
+RR_POSITIVE_FIELDS = POSITIVE_FIELDS + ("quantum",)
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+Scenario = namedtuple("Scenario", ["name", "simulation_time", "scheduler", "columns", "options", "error"])
+Scenario.__doc__ = """Um cenário lido do arquivo.
+
+columns é um TaskColumns (None se o cenário for inválido), options guarda
+os demais campos do cabeçalho (cores, multiprocessor...) e error a
+mensagem de validação quando iter_scenarios roda com strict=False.
+"""
+
+
+class TaskValidationError(ValueError):
+    """Conjunto de tarefas inválido; errors lista (índice da tarefa, mensagem) de todas as falhas."""
+
+    def __init__(self, errors, scenario: str = None):
+        self.errors = errors
+        self.scenario = scenario
+        lines = [message for _, message in errors]
+        if scenario:
+            invalid = len({i for i, _ in errors})
+            lines.insert(0, f"Cenário {scenario}: {invalid} tarefa(s) inválida(s)")
+        super().__init__("\n".join(lines))
+
+
+class TaskColumns:
+    """Tarefas em colunas de array('q'), na ordem do arquivo.
+
+    É a representação compacta de um conjunto de tarefas: cabe em poucos
+    bytes por tarefa e pode ser enviada a outro processo sem criar objetos.
+    tasks(Task) cria os objetos quando o simulador precisa deles. extra
+    guarda, sem validar, os campos adicionais pedidos ao loader ({campo:
+    lista com o valor de cada tarefa, None se ausente}).
+    """
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self):
+        for field in FIELDS:
+            setattr(self, field, array('q'))
+        self.extra = {}
+
+    def __len__(self):
+        return len(self.offset)
+
+    def tasks(self, factory):
+        """Lista de factory(id, offset, computation_time, period_time, quantum, deadline)."""
+        return [factory(i, *row) for i, row in enumerate(zip(*(getattr(self, field) for field in FIELDS)))]
+
+
+class _ColumnBuilder:
+    """Acumula tarefas (dicts) coluna a coluna e valida cada coluna de uma vez."""
+
+    def __init__(self, extra=()):
+        self.fields = FIELDS + tuple(extra)
+        self.values = {field: [] for field in self.fields}
+
+    def append(self, task):
+        if not isinstance(task, dict):
+            task = {}
+        for field in self.fields:
+            self.values[field].append(task.get(field))
+
+    def extend(self, tasks):
+        for field in self.fields:
+            self.values[field].extend(task.get(field) if isinstance(task, dict) else None for task in tasks)
+
+    def build(self, scenario: str = None, positive=POSITIVE_FIELDS):
+        """Retorna as colunas; levanta TaskValidationError com todas as tarefas inválidas.
+
+        Floats integrais (5.0) são aceitos como inteiros; positive lista os
+        campos que precisam ser > 0.
+        """
+        errors = {}
+        for field in FIELDS:
+            column = self.values[field]
+            # Caminho rápido: a coluna inteira é de inteiros (bool não conta)
+            if not all(type(v) is int for v in column):
+                normalized = []
+                for i, v in enumerate(column):
+                    if type(v) is float and v.is_integer():
+                        v = int(v)
+                    elif v is None:
+                        errors.setdefault(i, []).append(f"Erro na task {i}: campo vazio -> '{field}'")
+                    elif type(v) is not int:
+                        errors.setdefault(i, []).append(f"Erro na task {i}: {field} não é inteiro ({v!r})")
+                    normalized.append(v if type(v) is int else 1)
+                column = self.values[field] = normalized
+            # array('q') levantaria OverflowError fora do int64
+            if column and (min(column) < INT64_MIN or max(column) > INT64_MAX):
+                for i, v in enumerate(column):
+                    if not INT64_MIN <= v <= INT64_MAX:
+                        errors.setdefault(i, []).append(f"Erro na task {i}: {field} fora da faixa de 64 bits ({v})")
+                column = self.values[field] = [v if INT64_MIN <= v <= INT64_MAX else 1 for v in column]
+            if field in positive and column and min(column) <= 0:
+                for i, v in enumerate(column):
+                    if v <= 0:
+                        errors.setdefault(i, []).append(f"Erro na task {i}: {field} deve ser positivo ({v})")
+        if errors:
+            raise TaskValidationError([(i, message) for i in sorted(errors) for message in errors[i]], scenario)
+
+        columns = TaskColumns()
+        for field in FIELDS:
+            setattr(columns, field, array('q', self.values[field]))
+        columns.extra = {field: self.values[field] for field in self.fields[len(FIELDS):]}
+        return columns
+
+
+def _scenario(name, header, builder, strict: bool):
+    options = {key: value for key, value in header.items()
+               if key not in ("name", "simulation_time", "scheduler_name", "tasks", "tasks_number")}
+    try:
+        for key in ("simulation_time", "scheduler_name"):
+            if key not in header:
+                raise ValueError(f"Cenário {name}: campo vazio -> '{key}'")
+        positive = RR_POSITIVE_FIELDS if header["scheduler_name"] == "RR" else POSITIVE_FIELDS
+        columns = builder.build(name, positive)
+    except ValueError as e:
+        if strict:
+            raise
+        return Scenario(name, header.get("simulation_time"), header.get("scheduler_name"), None, options, str(e))
+    return Scenario(name, header["simulation_time"], header["scheduler_name"], columns, options, None)
+
+
+def _from_object(name, data, strict: bool, extra=()):
+    builder = _ColumnBuilder(extra)
+    builder.extend(data.get("tasks") or [])
+    return _scenario(data.get("name", name), data, builder, strict)
+
+
+def _iter_ndjson(path: str, strict: bool, extra=()):
+    """Cada linha é um cenário completo, ou o cabeçalho de um cenário seguido de uma tarefa por linha.
+
+    Um cabeçalho é uma linha com simulation_time e sem tasks; as linhas
+    seguintes sem simulation_time são as tarefas dele. Só um cenário fica
+    em memória por vez.
+    """
+    header = builder = None
+    count = 0
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: JSON inválido ({e})") from e
+            if not isinstance(data, dict):
+                raise ValueError(f"{path}:{line_number}: esperado um objeto JSON")
+
+            if "simulation_time" in data or "tasks" in data:
+                if header is not None:
+                    yield _scenario(header.get("name", f"{path}#{count}"), header, builder, strict)
+                    count += 1
+                    header = builder = None
+                if "tasks" in data:
+                    yield _from_object(f"{path}#{count}", data, strict, extra)
+                    count += 1
+                else:
+                    header, builder = data, _ColumnBuilder(extra)
+            elif header is not None:
+                builder.append(data)
+            else:
+                raise ValueError(f"{path}:{line_number}: tarefa sem cabeçalho de cenário")
+    if header is not None:
+        yield _scenario(header.get("name", f"{path}#{count}"), header, builder, strict)
+
+
+def iter_scenarios(path: str, strict: bool = True, extra=()):
+    """Gera os cenários do arquivo, um por vez.
+
+    .ndjson/.jsonl são lidos linha a linha (ver _iter_ndjson). Um .json pode
+    ter um cenário (objeto) ou vários (lista de objetos). Com strict=False
+    cenários inválidos saem com error preenchido em vez de interromper a
+    leitura. Os campos de tarefa listados em extra vão para columns.extra.
+    """
+    if path.endswith(NDJSON_EXTENSIONS):
+        yield from _iter_ndjson(path, strict, extra)
+        return
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        for k, item in enumerate(data):
+            yield _from_object(f"{path}#{k}", item if isinstance(item, dict) else {}, strict, extra)
+    else:
+        yield _from_object(path, data, strict, extra)
+
+
+def load_scenario(path: str, extra=()):
+    """O primeiro (normalmente único) cenário do arquivo, validado."""
+    for scenario in iter_scenarios(path, extra=extra):
+        return scenario
+    raise ValueError(f"{path} não contém nenhum cenário.")
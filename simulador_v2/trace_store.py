@@ -0,0 +1,220 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+from execution_trace import ExecutionTrace
+from job_table import JobTable
+
+MAGIC = b"SIMTRC01"
+TASK_FIELDS = ("id", "offset", "computation_time", "period_time", "quantum", "deadline")
+# Registros de largura fixa, em int64
+SLICE_FIELDS = ("start", "end", "task_id", "job")
+JOB_FIELDS = ("task_index", "release", "deadline", "remaining", "finish", "completed")
+DEFAULT_STRIDE = 1024
+_PREFIX = struct.Struct("<8sQ")
+_CHUNK = 1 << 16
+
+StoredTask = namedtuple("StoredTask", TASK_FIELDS)
+
+
+def _align(n: int):
+    return -(-n // 8) * 8
+
+
+def _layout(header):
+    """Deslocamentos (em bytes) das quatro seções, a partir do tamanho do cabeçalho."""
+    slices, jobs, stride = header["slices"], header["jobs"], header["stride"]
+    offsets = {"slices": _align(_PREFIX.size + header["header_size"])}
+    offsets["slice_index"] = offsets["slices"] + slices * len(SLICE_FIELDS) * 8
+    offsets["jobs"] = offsets["slice_index"] + -(-slices // stride) * 8
+    offsets["job_index"] = offsets["jobs"] + jobs * len(JOB_FIELDS) * 8
+    offsets["end"] = offsets["job_index"] + -(-jobs // stride) * 8
+    return offsets
+
+
+def _interleave(f, columns, start: int, stop: int):
+    """Grava as linhas [start, stop) das colunas como registros contíguos, em blocos."""
+    width = len(columns)
+    for lo in range(start, stop, _CHUNK):
+        hi = min(lo + _CHUNK, stop)
+        records = array('q', bytes(8 * width * (hi - lo)))
+        for k, column in enumerate(columns):
+            records[k::width] = column[lo:hi]
+        f.write(records.tobytes())
+
+
+def write_trace(path: str, sequence: ExecutionTrace, jobs: JobTable, stride: int = DEFAULT_STRIDE):
+    """Grava o trace e os jobs de uma execução RM/EDF em formato binário mapeável.
+
+    Layout: MAGIC, tamanho e cabeçalho JSON (tarefas, contagens, stride);
+    depois, alinhados em 8 bytes, os registros de fatia (start, end,
+    task_id, job), o índice esparso com o start de uma fatia a cada
+    `stride`, os registros de job (na ordem de liberação) e o índice
+    esparso com a liberação de um job a cada `stride`. Numa execução
+    extrapolada só o trecho simulado é gravado.
+    """
+    size = jobs.size
+    header = {
+        "tasks": [{field: getattr(task, field) for field in TASK_FIELDS} for task in jobs.tasks],
+        "slices": len(sequence),
+        "jobs": size,
+        "stride": stride,
+        "end_time": sequence.end_time,
+        "byteorder": sys.byteorder,
+    }
+    raw = json.dumps(header).encode()
+    header["header_size"] = len(raw)
+    offsets = _layout(header)
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(raw)))
+        f.write(raw)
+        f.write(bytes(offsets["slices"] - f.tell()))
+        _interleave(f, [sequence.starts, sequence.ends, sequence.task_ids, sequence.jobs], 0, len(sequence))
+        f.write(sequence.starts[::stride].tobytes())
+        completed = array('q', list(jobs.completed[:size]))
+        _interleave(f, [jobs.task_index, jobs.release, jobs.deadline, jobs.remaining, jobs.finish, completed],
+                    0, size)
+        f.write(jobs.release[:size:stride].tobytes())
+
+
+class TraceStore:
+    """Leitura por janela de tempo de um arquivo gravado por write_trace.
+
+    O arquivo é mapeado em memória (somente leitura) e os registros são
+    lidos direto das páginas mapeadas: vários processos abrindo o mesmo
+    arquivo compartilham o cache de páginas, e só as janelas consultadas
+    são de fato lidas do disco.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            magic, header_size = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} não é um trace gravado por write_trace.")
+            header = json.loads(f.read(header_size))
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} foi gravado em uma máquina {header['byteorder']}-endian.")
+        header["header_size"] = header_size
+        offsets = _layout(header)
+        view = memoryview(self.mmap)
+        self.slices = view[offsets["slices"]:offsets["slice_index"]].cast('q')
+        self.slice_index = view[offsets["slice_index"]:offsets["jobs"]].cast('q')
+        self.job_records = view[offsets["jobs"]:offsets["job_index"]].cast('q')
+        self.job_index = view[offsets["job_index"]:offsets["end"]].cast('q')
+        self.stride = header["stride"]
+        self.end_time = header["end_time"]
+        self.tasks = [StoredTask(**task) for task in header["tasks"]]
+        self.slice_count = header["slices"]
+        self.job_count = header["jobs"]
+
+    def close(self):
+        for view in (self.slices, self.slice_index, self.job_records, self.job_index):
+            view.release()
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.slice_count
+
+    def _first_slice(self, t0: int):
+        """Índice da primeira fatia com end > t0 (busca no índice e varredura de um bloco)."""
+        width = len(SLICE_FIELDS)
+        k = max(bisect_right(self.slice_index, t0) - 1, 0) * self.stride
+        while k < self.slice_count and self.slices[k * width + 1] <= t0:
+            k += 1
+        return k
+
+    def _first_job(self, t: int):
+        """Índice do primeiro job liberado em t ou depois."""
+        width = len(JOB_FIELDS)
+        k = max(bisect_right(self.job_index, t - 1) - 1, 0) * self.stride
+        while k < self.job_count and self.job_records[k * width + 1] < t:
+            k += 1
+        return k
+
+    def iter_slices(self, t0: int = 0, t1: int = None):
+        """(start, end, task_id, job) das fatias que cruzam [t0, t1), recortadas à janela."""
+        t1 = self.end_time if t1 is None else t1
+        width, slices = len(SLICE_FIELDS), self.slices
+        k = self._first_slice(t0)
+        while k < self.slice_count:
+            base = k * width
+            start = slices[base]
+            if start >= t1:
+                break
+            yield max(start, t0), min(slices[base + 1], t1), slices[base + 2], slices[base + 3]
+            k += 1
+
+    def trace(self, t0: int = 0, t1: int = None):
+        """ExecutionTrace só com a janela [t0, t1); job continua sendo o índice global."""
+        sequence = ExecutionTrace()
+        for record in self.iter_slices(t0, t1):
+            sequence.append(*record)
+        return sequence
+
+    def window(self, t0: int = 0, t1: int = None):
+        """(jobs, sequence) da janela [t0, t1), no formato de simulate_rm/simulate_edf.
+
+        jobs é uma JobTable com os jobs liberados na janela mais os
+        liberados antes que executam nela; os índices de job do trace são
+        renumerados para essa tabela. Assim detect_starvation,
+        report_deadlines_missed e plot_gantt_chart_realtime funcionam sem
+        carregar o resto da execução.
+        """
+        t1 = self.end_time if t1 is None else t1
+        sequence = self.trace(t0, t1)
+        first, last = self._first_job(t0), self._first_job(t1)
+        earlier = sorted({j for j, task_id in zip(sequence.jobs, sequence.task_ids) if task_id >= 0 and j < first})
+        rows = earlier + list(range(first, last))
+        renumber = {j: k for k, j in enumerate(rows)}
+        for k in range(len(sequence)):
+            if sequence.task_ids[k] >= 0:
+                sequence.jobs[k] = renumber[sequence.jobs[k]]
+
+        jobs = JobTable(self.tasks)
+        width, records = len(JOB_FIELDS), self.job_records
+        columns = [array('q', [records[j * width + field] for j in rows]) for field in range(width)]
+        jobs.task_index, jobs.release, jobs.deadline, jobs.remaining, jobs.finish, completed = columns
+        jobs.completed = bytearray(completed.tolist())
+        jobs.size = jobs.released = len(rows)
+        # Ordem de conclusão (término; só um job conclui por instante) e depois os pendentes
+        finished = sorted((j for j in range(jobs.size) if jobs.completed[j]), key=jobs.finish.__getitem__)
+        jobs.order = array('q', finished + [j for j in range(jobs.size) if not jobs.completed[j]])
+        return jobs, sequence
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from main import detect_starvation, report_deadlines_missed
+
+    parser = argparse.ArgumentParser(description="Consulta uma janela de tempo de um trace gravado.")
+    parser.add_argument("trace", help="arquivo gravado por write_trace")
+    parser.add_argument("--from", dest="t0", type=int, default=0)
+    parser.add_argument("--to", dest="t1", type=int, default=None)
+    parser.add_argument("--plot-file", help="grava o Gantt da janela (PNG/SVG)")
+    args = parser.parse_args()
+
+    with TraceStore(args.trace) as store:
+        t1 = store.end_time if args.t1 is None else args.t1
+        jobs, sequence = store.window(args.t0, t1)
+        print(f"Janela [{args.t0}, {t1}): {len(sequence)} fatias, {len(jobs)} jobs")
+        report_deadlines_missed(jobs)
+        starved = detect_starvation(jobs)
+        print(f"\n{len(starved)} instância(s) com starvation")
+        for s in starved:
+            print(f"T{s['task_id']} (offset {s['offset']}): espera = {s['waiting_time']}, TAT = {s['turnaround']}, WT/TAT = {s['wait_ratio']}")
+        if args.plot_file:
+            from graphs import plot_gantt_chart_realtime
+            plot_gantt_chart_realtime(jobs, sequence, t1, output=args.plot_file, t0=args.t0)
@@ -0,0 +1,143 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+
+def uunifast(n: int, total_utilization: float, rng: random.Random):
+    """Utilizações uniformes no simplex sum(u) = U (Bini e Buttazzo), para U <= 1."""
+    utilizations = []
+    remaining = total_utilization
+    for i in range(1, n):
+        next_remaining = remaining * rng.random() ** (1 / (n - i))
+        utilizations.append(remaining - next_remaining)
+        remaining = next_remaining
+    utilizations.append(remaining)
+    return utilizations
+
+
+def randfixedsum(n: int, total_utilization: float, rng: random.Random, low: float = 0.0, high: float = 1.0):
+    """Vetor uniforme em {sum(u) = U, low <= u_i <= high} (algoritmo de Stafford).
+
+    Ao contrário do UUniFast, aceita U > 1 mantendo cada u_i <= 1, o que é
+    necessário para conjuntos multiprocessados.
+    """
+    if not n * low <= total_utilization <= n * high:
+        raise ValueError(f"Utilização {total_utilization} impossível para {n} tarefas em [{low}, {high}].")
+    s = (total_utilization - n * low) / (high - low)
+    k = max(min(math.floor(s), n - 1), 0)
+    s = max(min(s, k + 1), k)
+    # Índices a partir de 1, como no original
+    s1 = [0.0] + [s - (k - i + 1) for i in range(1, n + 1)]
+    s2 = [0.0] + [(k + n - i + 1) - s for i in range(1, n + 1)]
+
+    w = [[0.0] * (n + 2) for _ in range(n + 1)]
+    w[1][2] = sys.float_info.max
+    t = [[0.0] * (n + 1) for _ in range(n)]
+    tiny = 2.0 ** -1074
+    for i in range(2, n + 1):
+        for c in range(1, i + 1):
+            tmp1 = w[i - 1][c + 1] * s1[c] / i
+            tmp2 = w[i - 1][c] * s2[n - i + c] / i
+            w[i][c + 1] = tmp1 + tmp2
+            tmp3 = w[i][c + 1] + tiny
+            if s2[n - i + c] > s1[c]:
+                t[i - 1][c] = tmp2 / tmp3
+            else:
+                t[i - 1][c] = 1 - tmp1 / tmp3
+
+    x = [0.0] * (n + 1)
+    j = k + 1
+    sm, pr = 0.0, 1.0
+    for i in range(n - 1, 0, -1):
+        e = 1 if rng.random() <= t[i][j] else 0
+        sx = rng.random() ** (1 / i)
+        sm += (1 - sx) * pr * s / (i + 1)
+        pr *= sx
+        x[n - i] = sm + pr * e
+        s -= e
+        j -= e
+    x[n] = sm + pr * s
+
+    values = [(high - low) * v + low for v in x[1:]]
+    rng.shuffle(values)
+    return values
+
+
+def log_uniform_periods(n: int, low: int, high: int, rng: random.Random, granularity: int = 1):
+    """Períodos log-uniformes em [low, high], arredondados para múltiplos de granularity.
+
+    Uma granularidade maior mantém o hiperperíodo pequeno.
+    """
+    periods = []
+    for _ in range(n):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+        periods.append(max(granularity, round(value / granularity) * granularity))
+    return periods
+
+
+def generate_task_set(n: int, utilization: float, rng: random.Random, period_range=(10, 1000),
+                      method: str = "uunifast", granularity: int = 1, deadlines: str = "implicit",
+                      offsets: bool = False, quantum: int = 1):
+    """Gera n tarefas (dicts no formato de read_tasks_from_json).
+
+    deadlines: "implicit" (D = T) ou "constrained" (D uniforme em [C, T]).
+    Como o simulador é discreto, C = max(1, round(u * T)).
+    """
+    if method == "uunifast":
+        utilizations = uunifast(n, utilization, rng)
+    elif method == "randfixedsum":
+        utilizations = randfixedsum(n, utilization, rng)
+    else:
+        raise ValueError(f"Método de utilização desconhecido: {method}")
+    periods = log_uniform_periods(n, period_range[0], period_range[1], rng, granularity)
+
+    tasks = []
+    for u, period in zip(utilizations, periods):
+        computation = max(1, round(u * period))
+        deadline = period if deadlines == "implicit" else rng.randint(min(computation, period), period)
+        tasks.append({
+            "offset": rng.randrange(period) if offsets else 0,
+            "computation_time": computation,
+            "period_time": period,
+            "quantum": quantum,
+            "deadline": deadline
+        })
+    return tasks
+
+
+def write_task_set(path: str, tasks, simulation_time: int, scheduler_name: str):
+    with open(path, "w") as f:
+        json.dump({
+            "simulation_time": simulation_time,
+            "scheduler_name": scheduler_name,
+            "tasks_number": len(tasks),
+            "tasks": tasks
+        }, f, indent=4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera conjuntos de tarefas sintéticos no formato de entrada do simulador.")
+    parser.add_argument("-o", "--output", required=True, help="diretório de saída")
+    parser.add_argument("-n", "--tasks", type=int, default=10, help="tarefas por conjunto")
+    parser.add_argument("-u", "--utilization", type=float, default=0.7, help="utilização total")
+    parser.add_argument("--count", type=int, default=1, help="número de conjuntos")
+    parser.add_argument("--horizon", type=int, default=10000, help="simulation_time gravado nos arquivos")
+    parser.add_argument("--scheduler", default="RM", help="scheduler_name gravado nos arquivos")
+    parser.add_argument("--method", choices=["uunifast", "randfixedsum"], default="uunifast")
+    parser.add_argument("--periods", type=int, nargs=2, default=[10, 1000], metavar=("MIN", "MAX"))
+    parser.add_argument("--granularity", type=int, default=1)
+    parser.add_argument("--deadlines", choices=["implicit", "constrained"], default="implicit")
+    parser.add_argument("--offsets", action="store_true", help="offsets aleatórios em [0, T)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(args.output, exist_ok=True)
+    for k in range(args.count):
+        tasks = generate_task_set(args.tasks, args.utilization, rng, tuple(args.periods), args.method,
+                                  args.granularity, args.deadlines, args.offsets)
+        write_task_set(os.path.join(args.output, f"taskset_{k:05d}.json"), tasks, args.horizon, args.scheduler)
+    print(f"{args.count} conjuntos gravados em {args.output}")